@@ -0,0 +1,508 @@
+"""
+价格提醒规则引擎
+
+支持的规则:
+    cross   价格突破/跌破指定价位
+    close   相对昨日收盘的涨跌幅
+    tick    相对上一个 tick 的涨跌幅（原 price_change_threshold 提醒）
+    window  滚动时间窗口内的涨跌幅（相对窗口内最低/最高价）
+    sigma   偏离滚动窗口均值的标准差倍数
+
+每类规则按 (指标, 窗口, 方向) 分组放入有序阈值索引，每个 tick 只需二分定位
+触发区间，代价为 O(log n + 命中数)。发出提醒的规则移入“待复位”索引，指标回落到
+阈值减去回滞量之后才重新生效（回滞）；每条规则另有冷却时间，避免提醒风暴。
+冷却期内或超出每 tick 上限而未发出的规则保持生效，之后指标仍在阈值之上时再次触发，
+提醒不会因此丢失。窗口类指标以当前 tick 之前的窗口样本计算，评估后再写入当前价格。
+tick 规则的指标是每个 tick 的变化量，没有“持续在阈值之上”的状态：连续大幅波动
+每次都触发（与原 price_change_threshold 提醒一致），只受冷却时间限制。
+"""
+
+import bisect
+import itertools
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from history import RollingWindow
+from log import get_logger
+from tick import PriceTick, format_cents
+
+log = get_logger("alerts")
+
+KINDS = ("cross", "close", "tick", "window", "sigma")
+UP = "up"
+DOWN = "down"
+
+_ids = itertools.count(1)
+
+
+class AlertRule:
+    """
+    单条提醒规则
+
+    Args:
+        kind: 规则类型，见 KINDS
+        threshold: 阈值；cross 为价格（元），sigma 为标准差倍数，其余为百分比
+        direction: "up"（突破/上涨）或 "down"（跌破/下跌）
+        window: 时间窗口（秒），仅 window/sigma 使用
+        hysteresis: 回滞量（与阈值同单位），指标回落超过该值后才重新生效
+        cooldown: 冷却时间（秒），期间再次触发不发提醒
+    """
+
+    __slots__ = (
+        "id",
+        "kind",
+        "threshold",
+        "direction",
+        "window",
+        "hysteresis",
+        "cooldown",
+        "key",
+        "last_fired",
+        "fired",
+        "suppressed",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        threshold: float,
+        direction: str = UP,
+        window: Optional[float] = None,
+        hysteresis: float = 0.0,
+        cooldown: float = 0.0,
+        rule_id: Optional[str] = None,
+    ):
+        if kind not in KINDS:
+            raise ValueError(f"未知的提醒规则类型: {kind}")
+        if direction not in (UP, DOWN):
+            raise ValueError(f"未知的提醒方向: {direction}")
+        if kind in ("window", "sigma") and not window:
+            raise ValueError(f"{kind} 规则需要指定 window")
+        self.id = rule_id or f"{kind}-{next(_ids)}"
+        self.kind = kind
+        self.threshold = float(threshold)
+        self.direction = direction
+        self.window = float(window) if kind in ("window", "sigma") else None
+        self.hysteresis = abs(float(hysteresis))
+        self.cooldown = float(cooldown)
+        self.last_fired: Optional[float] = None
+        self.fired = 0
+        self.suppressed = 0
+
+        # 索引键：统一为“指标上升到键值即触发”
+        if kind == "cross":
+            # 价格以整数分比较；跌破规则对价格取负
+            cents = round(self.threshold * 100)
+            self.hysteresis = round(self.hysteresis * 100)
+            self.key = cents if direction == UP else -cents
+        else:
+            self.key = self.threshold
+
+    @property
+    def index_key(self) -> Tuple[str, Optional[float], str]:
+        return (self.kind, self.window, self.direction)
+
+    @property
+    def definition(self) -> Tuple[Any, ...]:
+        """规则定义（不含触发状态），用于判断重新加载的规则是否变化"""
+        return (
+            self.kind,
+            self.threshold,
+            self.direction,
+            self.window,
+            self.hysteresis,
+            self.cooldown,
+        )
+
+    def describe(self) -> str:
+        up = self.direction == UP
+        if self.kind == "cross":
+            return f"金价{'突破' if up else '跌破'} ¥{self.threshold:.2f}"
+        verb = "上涨" if up else "下跌"
+        if self.kind == "close":
+            return f"较昨收{verb} {self.threshold:.2f}%"
+        if self.kind == "tick":
+            return f"价格{verb} {self.threshold:.2f}%"
+        if self.kind == "window":
+            return f"{_window_text(self.window)}内{verb} {self.threshold:.2f}%"
+        side = "高于" if up else "低于"
+        return f"{side}{_window_text(self.window)}均值 {self.threshold:g}σ"
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "AlertRule":
+        """
+        从配置字典创建规则
+
+        如 {"kind": "cross", "threshold": 780, "direction": "up"}；未指定 id 时按定义命名
+        （如 cross-up-780），配置重新加载后仍对应同一条规则
+        """
+        rule = cls(
+            kind=spec["kind"],
+            threshold=spec["threshold"],
+            direction=spec.get("direction", UP),
+            window=spec.get("window"),
+            hysteresis=spec.get("hysteresis", 0.0),
+            cooldown=spec.get("cooldown", 0.0),
+            rule_id=spec.get("id"),
+        )
+        if not spec.get("id"):
+            parts = [rule.kind, rule.direction, f"{rule.threshold:g}"]
+            if rule.window is not None:
+                parts.append(f"{rule.window:g}")
+            rule.id = "-".join(parts)
+        return rule
+
+
+def _window_text(seconds: float) -> str:
+    if seconds % 3600 == 0:
+        return f"{int(seconds // 3600)}小时"
+    if seconds % 60 == 0:
+        return f"{int(seconds // 60)}分钟"
+    return f"{seconds:g}秒"
+
+
+class Alert(NamedTuple):
+    """一次触发的提醒"""
+
+    rule: AlertRule
+    value: float  # 触发时的指标值（cross 为价格，sigma 为标准差倍数，其余为百分比）
+    tick: PriceTick
+
+    @property
+    def subtitle(self) -> str:
+        rule = self.rule
+        if rule.kind == "cross":
+            return rule.describe()
+        if rule.kind == "sigma":
+            return f"{rule.describe()}（当前 {self.value:.1f}σ）"
+        return f"{rule.describe()}（实际 {self.value:.2f}%）"
+
+    @property
+    def message(self) -> str:
+        return f"当前价格: ¥{format_cents(self.tick.price_cents)}"
+
+
+class ThresholdIndex:
+    """
+    有序阈值索引（一组同指标、同方向的规则）
+
+    生效规则按键值升序存放：指标上升到 v 时，键值 <= v 的规则恰好是一个前缀，
+    一次切片取出；调用方发出提醒后通过 disarm() 按 键值 - 回滞量 放入待复位索引，
+    指标低于该值时（待复位索引的一个后缀）重新插回生效索引。
+
+    Args:
+        prime: 为 True 时首个指标值只用于确定初始状态，不触发提醒
+            （价位类指标启动时已在阈值之上不算“穿越”）
+        latch: 为 False 时触发后立即重新生效，不经过待复位索引
+            （指标本身是增量，每个值都是一次新的变化）
+    """
+
+    def __init__(self, prime: bool = True, latch: bool = True):
+        self.prime = prime
+        self.latch = latch
+        self._armed_keys: List[float] = []
+        self._armed: List[AlertRule] = []
+        self._rearm_keys: List[float] = []
+        self._rearm: List[AlertRule] = []
+        self.value: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._armed) + len(self._rearm)
+
+    def _insert_armed(self, rule: AlertRule):
+        i = bisect.bisect_right(self._armed_keys, rule.key)
+        self._armed_keys.insert(i, rule.key)
+        self._armed.insert(i, rule)
+
+    def _insert_rearm(self, rule: AlertRule):
+        key = rule.key - rule.hysteresis
+        i = bisect.bisect_right(self._rearm_keys, key)
+        self._rearm_keys.insert(i, key)
+        self._rearm.insert(i, rule)
+
+    def add(self, rule: AlertRule):
+        """指标当前已在阈值之上的规则需先回落才会触发（只对“穿越”提醒）"""
+        if self.latch and self.value is not None and self.value >= rule.key:
+            self._insert_rearm(rule)
+        else:
+            self._insert_armed(rule)
+
+    def remove(self, rule: AlertRule) -> bool:
+        for keys, rules, key in (
+            (self._armed_keys, self._armed, rule.key),
+            (self._rearm_keys, self._rearm, rule.key - rule.hysteresis),
+        ):
+            i = bisect.bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key:
+                if rules[i] is rule:
+                    del keys[i]
+                    del rules[i]
+                    return True
+                i += 1
+        return False
+
+    def update(self, value: float) -> List[AlertRule]:
+        """
+        推进指标值，返回本次触发的规则
+
+        触发的规则仍留在生效索引中，由调用方对实际发出提醒的规则调用 disarm()；
+        未发出的规则在指标仍在阈值之上时下一次会再次返回。
+        """
+        initial = self.prime and self.value is None
+        self.value = value
+
+        # 触发：生效索引中键值 <= value 的前缀
+        end = bisect.bisect_right(self._armed_keys, value)
+        fired = self._armed[:end]
+        if initial:
+            # 首个值只确定初始状态：已在阈值之上的规则直接等待复位
+            for rule in fired:
+                self.disarm(rule)
+            fired = []
+        if not self.latch:
+            return fired
+
+        # 复位：待复位索引中键值 > value 的后缀
+        start = bisect.bisect_right(self._rearm_keys, value)
+        if start < len(self._rearm):
+            rearmed = self._rearm[start:]
+            del self._rearm_keys[start:]
+            del self._rearm[start:]
+            for rule in rearmed:
+                self._insert_armed(rule)
+
+        return fired
+
+    def disarm(self, rule: AlertRule):
+        """已发出提醒的规则移入待复位索引（不锁定的索引保持生效）"""
+        if not self.latch:
+            return
+        i = bisect.bisect_left(self._armed_keys, rule.key)
+        while i < len(self._armed_keys) and self._armed_keys[i] == rule.key:
+            if self._armed[i] is rule:
+                del self._armed_keys[i]
+                del self._armed[i]
+                self._insert_rearm(rule)
+                return
+            i += 1
+
+
+class AlertEngine:
+    """
+    提醒规则引擎（非线程安全，需在同一线程中调用 evaluate）
+
+    Args:
+        max_alerts_per_tick: 每个 tick 最多返回的提醒数，其余计入 suppressed 并保持生效
+        sigma_min_samples: 窗口样本数达到该值后 sigma 规则才参与计算
+        clock: 冷却时间使用的时钟
+    """
+
+    def __init__(
+        self,
+        max_alerts_per_tick: int = 3,
+        sigma_min_samples: int = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_alerts_per_tick = max_alerts_per_tick
+        self.sigma_min_samples = max(int(sigma_min_samples), 2)
+        self.clock = clock
+        self.rules: Dict[str, AlertRule] = {}
+        self.indexes: Dict[Tuple[str, Optional[float], str], ThresholdIndex] = {}
+        self.windows: Dict[float, RollingWindow] = {}
+        self._last_price: Optional[int] = None
+
+        # 统计
+        self.ticks = 0
+        self.fired = 0
+        self.suppressed = 0
+
+    def add_rule(self, rule: AlertRule) -> AlertRule:
+        if rule.id in self.rules:
+            self.remove_rule(rule.id)
+        self.rules[rule.id] = rule
+        index = self.indexes.get(rule.index_key)
+        if index is None:
+            # 逐 tick 涨跌幅每次都是新的变化量：首个值也参与触发，触发后立即重新生效
+            incremental = rule.kind == "tick"
+            index = self.indexes[rule.index_key] = ThresholdIndex(
+                prime=not incremental, latch=not incremental
+            )
+        if rule.window is not None and rule.window not in self.windows:
+            self.windows[rule.window] = RollingWindow(rule.window)
+        index.add(rule)
+        return rule
+
+    def add_rules(self, specs: Iterable[Dict[str, Any]]):
+        for spec in specs:
+            self.add_rule(AlertRule.from_dict(spec))
+
+    def remove_rule(self, rule_id: str) -> bool:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        index = self.indexes.get(rule.index_key)
+        return index.remove(rule) if index is not None else False
+
+    def replace_rules(self, rules: Iterable[AlertRule]):
+        """
+        整体替换规则集合（配置重新加载时使用）
+
+        id 与定义都未变化的规则沿用原对象，锁定状态、上次触发时间与计数保持不变；
+        定义变化的规则按新定义重新加入（当前已在阈值之上时等待复位），
+        并继承上次触发时间，冷却期不会因重新加载而被重置。
+        """
+        incoming = {rule.id: rule for rule in rules}
+        for rule_id in [i for i in self.rules if i not in incoming]:
+            self.remove_rule(rule_id)
+        for rule_id, rule in incoming.items():
+            current = self.rules.get(rule_id)
+            if current is not None:
+                if current.definition == rule.definition:
+                    continue
+                rule.last_fired = current.last_fired
+                rule.fired = current.fired
+                rule.suppressed = current.suppressed
+            self.add_rule(rule)
+        # 不再使用的窗口不再逐 tick 维护
+        used = {rule.window for rule in self.rules.values()}
+        for window in [w for w in self.windows if w not in used]:
+            del self.windows[window]
+
+    def configure(self, config):
+        """按配置更新引擎参数与规则，未变化的规则保留状态（需在 evaluate 所在线程调用）"""
+        self.max_alerts_per_tick = int(config.get("max_alerts_per_tick") or 3)
+        self.sigma_min_samples = max(
+            int(config.get("alert_sigma_min_samples") or 30), 2
+        )
+        self.replace_rules(rules_from_config(config))
+
+    def _metric(self, kind, window, direction, tick: PriceTick) -> Optional[float]:
+        """计算某个索引对应的指标值（统一为“越大越接近触发”）"""
+        up = direction == UP
+        price = tick.price_cents
+        if kind == "cross":
+            return price if up else -price
+        if kind == "close":
+            return tick.rate if up else -tick.rate
+        if kind == "tick":
+            last = self._last_price
+            if not last:
+                return None
+            move = (price - last) * 100 / last
+            return move if up else -move
+
+        stats = self.windows[window]
+        if kind == "window":
+            if up:
+                low = stats.min
+                return (price - low) * 100 / low if low else None
+            high = stats.max
+            return (high - price) * 100 / high if high else None
+
+        # sigma
+        stddev = stats.stddev
+        if stats.count < self.sigma_min_samples or not stddev:
+            return None
+        z = (price - stats.mean) / stddev
+        return z if up else -z
+
+    def evaluate(self, tick: PriceTick) -> List[Alert]:
+        """
+        处理一个新 tick
+
+        Returns:
+            List[Alert]: 本次需要发出的提醒（已去除冷却期内的规则）
+        """
+        self.ticks += 1
+        receive_time = tick.receive_ms / 1000
+        # 窗口指标以当前价格之前的样本计算（sigma 的均值与标准差不含当前价格），
+        # 先淘汰窗口外的旧样本，评估后再写入当前价格
+        for stats in self.windows.values():
+            stats.expire(receive_time)
+
+        now = self.clock()
+        candidates = []
+        for (kind, window, direction), index in self.indexes.items():
+            if not len(index):
+                continue
+            value = self._metric(kind, window, direction, tick)
+            if value is None:
+                continue
+            for rule in index.update(value):
+                if (
+                    rule.last_fired is not None
+                    and now - rule.last_fired < rule.cooldown
+                ):
+                    # 冷却期内不发出也不锁定：冷却结束后仍在阈值之上时再次触发
+                    rule.suppressed += 1
+                    self.suppressed += 1
+                    continue
+                shown = value
+                if kind == "cross":
+                    shown = abs(value) / 100
+                elif direction == DOWN:
+                    shown = -value
+                candidates.append((index, rule, shown))
+
+        if len(candidates) > self.max_alerts_per_tick:
+            # 超出上限的规则保持生效，下一个 tick 再发出
+            self.suppressed += len(candidates) - self.max_alerts_per_tick
+            candidates = candidates[: self.max_alerts_per_tick]
+
+        alerts: List[Alert] = []
+        for index, rule, shown in candidates:
+            index.disarm(rule)
+            rule.last_fired = now
+            rule.fired += 1
+            alerts.append(Alert(rule, shown, tick))
+
+        for stats in self.windows.values():
+            stats.push(receive_time, tick.price_cents)
+        self._last_price = tick.price_cents
+        self.fired += len(alerts)
+        return alerts
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "rules": len(self.rules),
+            "indexes": len(self.indexes),
+            "ticks": self.ticks,
+            "fired": self.fired,
+            "suppressed": self.suppressed,
+        }
+
+
+def rules_from_config(config) -> List[AlertRule]:
+    """
+    按配置生成规则列表
+
+    alert_rules 中的规则全部加载（无效规则记录错误后忽略）；show_price_change_alerts
+    开启时，price_change_threshold 作为相对上一个 tick 的双向涨跌幅规则加入。
+    """
+    rules = []
+    if config.get("show_price_change_alerts"):
+        threshold = float(config.get("price_change_threshold") or 0)
+        if threshold > 0:
+            for direction in (UP, DOWN):
+                rules.append(
+                    AlertRule("tick", threshold, direction, rule_id=f"tick-{direction}")
+                )
+    for spec in config.get("alert_rules") or ():
+        try:
+            rules.append(AlertRule.from_dict(spec))
+        except (KeyError, TypeError, ValueError) as e:
+            log.error("忽略无效的提醒规则", rule=spec, error=e)
+    return rules
+
+
+def create_alert_engine(
+    config, clock: Callable[[], float] = time.monotonic
+) -> AlertEngine:
+    """
+    根据配置创建提醒引擎（规则见 rules_from_config）
+
+    回放时传入虚拟时钟，冷却时间按录制时间计算。
+    """
+    engine = AlertEngine(clock=clock)
+    engine.configure(config)
+    return engine
@@ -0,0 +1,4 @@
+"""
+性能基准测试包
+在仓库根目录通过 `python -m benchmarks.<模块名>` 运行
+"""
@@ -0,0 +1,186 @@
+"""
+提醒规则引擎基准：大量规则下每个 tick 的评估耗时，对比逐条扫描的朴素实现
+
+价格以 1 秒间隔随机游走（虚拟时钟，不实际等待），规则以突破/跌破价位为主，
+混合昨收涨跌幅、窗口涨跌幅与 sigma 规则。两种实现的触发总数应当一致。
+
+用法:
+    python -m benchmarks.alerts --rules 10000 --ticks 3600
+"""
+
+import argparse
+import json
+import random
+import time
+
+from alerts import UP, AlertEngine, AlertRule
+from tick import PriceTick
+
+WINDOWS = (60.0, 300.0, 3600.0)
+
+
+class LinearScanEngine:
+    """朴素实现：每个 tick 对每条规则单独计算指标并判断"""
+
+    def __init__(self, rules, clock):
+        # 复用 AlertEngine 的窗口与指标计算，只替换规则匹配方式
+        self.metrics = AlertEngine(max_alerts_per_tick=len(rules), clock=clock)
+        for window in {rule.window for rule in rules if rule.window}:
+            self.metrics.add_rule(AlertRule("window", 1e9, window=window))
+        self.clock = clock
+        # 每条规则：[规则, 是否生效, 是否已见过指标值, 上次触发时间]
+        self.states = [[rule, True, False, None] for rule in rules]
+        self.fired = 0
+
+    def evaluate(self, tick):
+        engine = self.metrics
+        receive_time = tick.receive_ms / 1000
+        for stats in engine.windows.values():
+            stats.expire(receive_time)
+        now = self.clock()
+        fired = 0
+        for state in self.states:
+            rule, armed, seen, last = state
+            value = engine._metric(rule.kind, rule.window, rule.direction, tick)
+            if value is None:
+                continue
+            if armed and value >= rule.key:
+                if not seen and rule.kind != "tick":
+                    # 首个值已在阈值之上：不算穿越，等待复位
+                    state[1] = False
+                elif last is None or now - last >= rule.cooldown:
+                    # 只有发出提醒时才锁定；tick 规则的指标是逐 tick 变化量，始终生效
+                    state[1] = rule.kind == "tick"
+                    state[3] = now
+                    fired += 1
+            elif not armed and value < rule.key - rule.hysteresis:
+                state[1] = True
+            state[2] = True
+        for stats in engine.windows.values():
+            stats.push(receive_time, tick.price_cents)
+        engine._last_price = tick.price_cents
+        self.fired += fired
+        return fired
+
+
+def make_rules(count, price, rng):
+    """约 70% 价位规则，其余为昨收/逐 tick/窗口/sigma 规则"""
+    rules = []
+    for i in range(count):
+        direction = UP if rng.random() < 0.5 else "down"
+        roll = rng.random()
+        if roll < 0.7:
+            rule = AlertRule(
+                "cross",
+                round(price + rng.uniform(-20, 20), 2),
+                direction,
+                hysteresis=rng.choice((0, 0.5, 1.0)),
+                cooldown=rng.choice((0, 60, 300)),
+            )
+        elif roll < 0.8:
+            rule = AlertRule("close", rng.uniform(0.1, 2.0), direction, hysteresis=0.05)
+        elif roll < 0.85:
+            rule = AlertRule(
+                "tick", rng.uniform(0.01, 0.05), direction, cooldown=rng.choice((0, 5))
+            )
+        elif roll < 0.9:
+            rule = AlertRule(
+                "window",
+                rng.uniform(0.1, 1.5),
+                direction,
+                window=rng.choice(WINDOWS),
+                hysteresis=0.05,
+            )
+        else:
+            rule = AlertRule(
+                "sigma",
+                rng.uniform(1.5, 4.0),
+                direction,
+                window=rng.choice(WINDOWS),
+                hysteresis=0.5,
+            )
+        rule.id = f"bench-{i}"
+        rules.append(rule)
+    return rules
+
+
+def make_ticks(count, price, rng, start=1760000000.0):
+    yesterday = round(price * 100)
+    cents = yesterday
+    ticks = []
+    for i in range(count):
+        cents = max(1, cents + round(rng.gauss(0, 15)))
+        receive_ms = int((start + i) * 1000)
+        change = cents - yesterday
+        ticks.append(
+            PriceTick(
+                cents,
+                yesterday,
+                change,
+                round(change * 100 / yesterday, 2),
+                receive_ms,
+                "bench",
+                receive_ms,
+            )
+        )
+    return ticks
+
+
+def _run(engine, ticks, now):
+    samples = []
+    for tick in ticks:
+        now[0] = tick.receive_ms / 1000
+        start = time.perf_counter()
+        engine.evaluate(tick)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(int(len(samples) * 0.99), len(samples) - 1)] * 1e6,
+        "fired": engine.fired,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提醒规则引擎基准")
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=3600, help="1 秒间隔的 tick 数")
+    parser.add_argument("--price", type=float, default=768.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rule_specs = make_rules(args.rules, args.price, rng)
+    ticks = make_ticks(args.ticks, args.price, rng)
+
+    now = [0.0]
+    indexed = AlertEngine(max_alerts_per_tick=args.rules, clock=lambda: now[0])
+    for rule in rule_specs:
+        indexed.add_rule(rule)
+    indexed_result = _run(indexed, ticks, now)
+
+    # 规则对象带有触发状态，朴素实现使用同一种子重新生成
+    rng = random.Random(args.seed)
+    linear = LinearScanEngine(make_rules(args.rules, args.price, rng), lambda: now[0])
+    linear_result = _run(linear, ticks, now)
+
+    results = {
+        "rules": args.rules,
+        "ticks": args.ticks,
+        "indexes": len(indexed.indexes),
+        "indexed": indexed_result,
+        "linear_scan": linear_result,
+        "speedup": linear_result["mean_us"] / indexed_result["mean_us"],
+        "consistent": indexed_result["fired"] == linear_result["fired"],
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+熔断器基准：上游故障期间的请求数与等待时间，以及状态机检查
+
+模拟按 1 秒间隔轮询的上游在中间一段时间内挂起（每个请求都等到超时），
+对比不熔断（每个 tick 都等待超时）与熔断（打开后立即拒绝、到期后单个请求探测）两种情况。
+时间轴使用虚拟时钟，请求耗时为真实的 asyncio 等待。
+同时检查 half_open 状态下并发请求只有一个到达上游、恢复后回到 closed，检查失败时退出码为 1。
+
+用法:
+    python -m benchmarks.breaker --ticks 600 --outage 120:420
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from client import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgedPriceFetcher,
+    PriceProvider,
+)
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Quote:
+    price = "768.00"
+
+
+class FlakyProvider(PriceProvider):
+    """down 为 True 时请求挂起直到被超时取消"""
+
+    name = "flaky"
+
+    def __init__(self, latency: float = 0.001):
+        super().__init__()
+        self.latency = latency
+        self.down = False
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        if self.down:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.latency)
+        return Quote()
+
+
+async def _simulate(breaker, ticks, outage, timeout):
+    clock = breaker.clock
+    provider = FlakyProvider()
+    fetcher = HedgedPriceFetcher([provider], breaker=breaker)
+    outage_calls = 0
+    outage_wait = 0.0
+    recovered_at = None
+    for i in range(ticks):
+        clock.now = float(i)
+        provider.down = outage[0] <= i < outage[1]
+        before = provider.calls
+        start = time.perf_counter()
+        ok = False
+        try:
+            await fetcher.fetch(timeout=timeout)
+            ok = True
+        except (CircuitOpenError, asyncio.TimeoutError):
+            pass
+        if provider.down:
+            outage_calls += provider.calls - before
+            outage_wait += time.perf_counter() - start
+        elif ok and i >= outage[1] and recovered_at is None:
+            recovered_at = i
+    return {
+        "outage_upstream_requests": outage_calls,
+        "outage_wait_ms": outage_wait * 1000,
+        "recovery_delay_ticks": None
+        if recovered_at is None
+        else recovered_at - outage[1],
+        "breaker": breaker.snapshot(),
+    }
+
+
+async def _check_single_probe():
+    """half_open 时并发的 10 个请求只有 1 个到达上游，探测成功后回到 closed"""
+    clock = VirtualClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=5, clock=clock)
+    provider = FlakyProvider(latency=0.01)
+    fetcher = HedgedPriceFetcher([provider], breaker=breaker)
+    provider.down = True
+    for _ in range(2):
+        try:
+            await fetcher.fetch(timeout=0.01)
+        except asyncio.TimeoutError:
+            pass
+    opened = breaker.state == OPEN
+    calls = provider.calls
+    rejected = await asyncio.gather(fetcher.fetch(timeout=0.01), return_exceptions=True)
+    rejected_while_open = isinstance(rejected[0], CircuitOpenError)
+    no_request_while_open = provider.calls == calls
+
+    clock.now = 5.0
+    half_open = breaker.state == HALF_OPEN
+    provider.down = False
+    results = await asyncio.gather(
+        *(fetcher.fetch(timeout=1) for _ in range(10)), return_exceptions=True
+    )
+    probes = provider.calls - calls
+    return {
+        "opened_after_threshold": opened,
+        "rejected_while_open": rejected_while_open,
+        "no_request_while_open": no_request_while_open,
+        "half_open_after_timeout": half_open,
+        "single_probe": probes == 1
+        and sum(isinstance(r, CircuitOpenError) for r in results) == 9,
+        "closed_after_probe": breaker.state == CLOSED,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="熔断器基准")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--outage", default="120:420", help="故障区间 起:止（tick）")
+    parser.add_argument(
+        "--timeout", type=float, default=0.02, help="单次抓取超时（秒）"
+    )
+    parser.add_argument("--threshold", type=int, default=3)
+    parser.add_argument("--reset-timeout", type=float, default=5.0)
+    parser.add_argument("--max-reset-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+    outage = tuple(int(x) for x in args.outage.split(":"))
+
+    def make(threshold):
+        return CircuitBreaker(
+            failure_threshold=threshold,
+            reset_timeout=args.reset_timeout,
+            max_reset_timeout=args.max_reset_timeout,
+            clock=VirtualClock(),
+        )
+
+    async def run():
+        return {
+            "ticks": args.ticks,
+            "outage_ticks": outage[1] - outage[0],
+            "no_breaker": await _simulate(
+                make(args.ticks + 1), args.ticks, outage, args.timeout
+            ),
+            "breaker": await _simulate(
+                make(args.threshold), args.ticks, outage, args.timeout
+            ),
+            "checks": await _check_single_probe(),
+        }
+
+    results = asyncio.run(run())
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if all(results["checks"].values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+K 线聚合基准：逐 tick 聚合耗时、内存占用，以及不同区间长度下降采样查询的耗时
+
+以 1 秒间隔的随机游走 tick 填充多周期 K 线，再对 1小时/1天/7天/全部 区间请求固定点数的序列，
+对比“在原始 tick 上直接 LTTB”的朴素做法。查询耗时应基本不随区间长度增长。
+
+用法:
+    python -m benchmarks.candles --days 7 --points 120
+"""
+
+import argparse
+import json
+import random
+import time
+
+from candles import DAY, HOUR, CandleAggregator, lttb
+
+
+def _memory_bytes(aggregator):
+    total = 0
+    for series in aggregator.series.values():
+        for column in (
+            series.start,
+            series.open,
+            series.high,
+            series.low,
+            series.close,
+            series.count,
+        ):
+            total += column.itemsize * len(column)
+    return total
+
+
+def _time_call(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K 线聚合与降采样基准")
+    parser.add_argument("--days", type=float, default=7.0, help="模拟的 tick 天数")
+    parser.add_argument("--points", type=int, default=120)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ticks = int(args.days * DAY)
+    start_time = 1760000000.0
+    times = [start_time + i for i in range(ticks)]
+    prices = []
+    price = 768.0
+    for _ in range(ticks):
+        price = max(1.0, price + rng.gauss(0, 0.15))
+        prices.append(round(price, 2))
+
+    aggregator = CandleAggregator(utc_offset=8 * HOUR)
+    begin = time.perf_counter()
+    for t, p in zip(times, prices):
+        aggregator.update(t, p)
+    update_seconds = time.perf_counter() - begin
+
+    end_time = times[-1] + 1
+    queries = {}
+    for name, length in (
+        ("1h", HOUR),
+        ("1d", DAY),
+        ("7d", 7 * DAY),
+        ("all", end_time - start_time),
+    ):
+        if length > end_time - start_time:
+            continue
+        query_start = end_time - length
+        seconds, (resolution, series) = _time_call(
+            lambda start=query_start: aggregator.downsample(
+                start, end_time, args.points
+            ),
+            args.repeat,
+        )
+        lo = int(query_start - start_time)
+        raw_seconds, _ = _time_call(
+            lambda lo=lo: lttb(times[lo:], prices[lo:], args.points), args.repeat
+        )
+        queries[name] = {
+            "resolution": resolution,
+            "points": len(series),
+            "query_ms": seconds * 1000,
+            "raw_lttb_ms": raw_seconds * 1000,
+        }
+
+    results = {
+        "ticks": ticks,
+        "update_us_per_tick": update_seconds / ticks * 1e6,
+        "memory_bytes": _memory_bytes(aggregator),
+        "raw_tick_bytes": ticks * 16,
+        "candles": aggregator.stats(),
+        "queries": queries,
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+tick 解码微基准：AdDict + 字符串字典路径 vs 快速解码 + PriceTick 路径
+
+分别统计每个 tick 的解码耗时与内存分配次数（tracemalloc 分配块数）。
+
+用法:
+    python -m benchmarks.decode --iterations 20000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from usepy.dict import AdDict
+
+from decode import BACKEND, decode_latest_price
+from tick import PriceTick
+
+# 模拟真实响应：datas 之外还有若干无关字段
+PAYLOAD = json.dumps(
+    {
+        "resultCode": 0,
+        "resultMsg": "操作成功",
+        "resultData": {
+            "status": "SUCCESS",
+            "code": "0",
+            "msg": "",
+            "datas": {
+                "id": 168,
+                "productSku": "1961543816",
+                "price": "768.52",
+                "yesterdayPrice": "765.10",
+                "upAndDownRate": "+0.45%",
+                "upAndDownAmt": "3.42",
+                "time": "1760000000000",
+                "demode": False,
+                "productName": "积存金",
+            },
+        },
+        "channelEncrypt": 0,
+    },
+    ensure_ascii=False,
+).encode()
+
+
+def addict_path(content: bytes):
+    """旧路径：json → AdDict → 逐字段 str() 成字典"""
+    gold_data = AdDict(json.loads(content)).resultData.datas
+    return {
+        "price": str(gold_data.price),
+        "yesterday_price": str(gold_data.yesterdayPrice),
+        "up_and_down_rate": str(gold_data.upAndDownRate),
+        "up_and_down_amt": str(gold_data.upAndDownAmt),
+        "time": str(gold_data.time),
+        "product_sku": str(gold_data.productSku),
+        "update_time": datetime.now().strftime("%H:%M:%S"),
+    }
+
+
+def fast_path(content: bytes):
+    """快速路径：直接解码并一次性解析为 PriceTick"""
+    return PriceTick.from_data(decode_latest_price(content))
+
+
+def measure(fn, iterations: int) -> dict:
+    for _ in range(100):
+        fn(PAYLOAD)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(PAYLOAD)
+    elapsed = time.perf_counter() - start
+
+    # 分配统计：单独跑少量迭代，避免 tracemalloc 开销影响计时
+    samples = min(iterations, 1000)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    keep = [fn(PAYLOAD) for _ in range(samples)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del keep
+
+    return {
+        "ns_per_tick": elapsed / iterations * 1e9,
+        "retained_blocks_per_tick": blocks / samples,
+        "retained_bytes_per_tick": size / samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tick 解码微基准")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {
+        "backend": BACKEND,
+        "addict": measure(addict_path, args.iterations),
+        "fast": measure(fast_path, args.iterations),
+    }
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+抓取模型基准：每次抓取新建线程 vs 单事件循环引擎
+
+两种模型的总 CPU 时间基本持平（主要花在 httpx 请求本身），
+区别在于线程数量以及调用线程（状态栏应用中即 UI 线程）上每次发起抓取的派发耗时。
+
+用法:
+    python -m benchmarks.fetch_engine --ticks 500 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+import httpx
+
+from client import ApiClient, AsyncApiClient, AsyncJdjrApi, JdjrApi
+from engine import FetchEngine
+
+PAYLOAD = {
+    "resultData": {
+        "datas": {
+            "price": "768.52",
+            "yesterdayPrice": "765.10",
+            "upAndDownRate": "+0.45%",
+            "upAndDownAmt": "3.42",
+            "time": "1760000000000",
+            "productSku": "1961543816",
+        }
+    }
+}
+
+
+def _count_thread_starts():
+    """包装 threading.Thread.start 以统计线程创建次数"""
+    counter = {"started": 0}
+    original = threading.Thread.start
+
+    def start(self, *args, **kwargs):
+        counter["started"] += 1
+        return original(self, *args, **kwargs)
+
+    threading.Thread.start = start
+    return counter, lambda: setattr(threading.Thread, "start", original)
+
+
+def _dispatch_stats(samples: list) -> dict:
+    """调用线程上发起一次抓取的耗时（微秒）"""
+    samples = sorted(samples)
+    return {
+        "dispatch_us_mean": statistics.fmean(samples) * 1e6,
+        "dispatch_us_p99": samples[int(len(samples) * 0.99) - 1] * 1e6,
+    }
+
+
+def bench_thread_per_tick(ticks: int, latency: float, interval: float) -> dict:
+    """旧模型：每个 tick 启动一个线程执行同步请求"""
+
+    def handler(request):
+        time.sleep(latency)
+        return httpx.Response(200, json=PAYLOAD)
+
+    api = JdjrApi(ApiClient("http://stub/", transport=httpx.MockTransport(handler)))
+    counter, restore = _count_thread_starts()
+    done = threading.Semaphore(0)
+    peak_threads = threading.active_count()
+
+    def _fetch():
+        api.get_latest_gold_price()
+        done.release()
+
+    dispatch = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            threading.Thread(target=_fetch, daemon=True).start()
+            dispatch.append(time.perf_counter() - start)
+            peak_threads = max(peak_threads, threading.active_count())
+            if interval:
+                time.sleep(interval)
+        for _ in range(ticks):
+            done.acquire()
+    finally:
+        restore()
+    return {
+        "model": "thread_per_tick",
+        "ticks": ticks,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "threads_started": counter["started"],
+        "peak_threads": peak_threads,
+        **_dispatch_stats(dispatch),
+    }
+
+
+def bench_event_loop(ticks: int, latency: float, interval: float) -> dict:
+    """新模型：所有抓取作为常驻事件循环上的任务执行"""
+
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=PAYLOAD)
+
+    api = AsyncJdjrApi(
+        AsyncApiClient("http://stub/", transport=httpx.MockTransport(handler))
+    )
+    counter, restore = _count_thread_starts()
+    peak_threads = threading.active_count()
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    engine = FetchEngine(name="bench-loop")
+    try:
+        engine.start()
+        futures = []
+        dispatch = []
+        for _ in range(ticks):
+            start = time.perf_counter()
+            futures.append(engine.submit(api.get_latest_gold_price()))
+            dispatch.append(time.perf_counter() - start)
+            peak_threads = max(peak_threads, threading.active_count())
+            if interval:
+                time.sleep(interval)
+        for future in futures:
+            future.result()
+        engine.run(api.api_client.aclose())
+    finally:
+        engine.stop()
+        restore()
+    return {
+        "model": "event_loop",
+        "ticks": ticks,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "threads_started": counter["started"],
+        "peak_threads": peak_threads,
+        **_dispatch_stats(dispatch),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取模型基准")
+    parser.add_argument("--ticks", type=int, default=500, help="模拟抓取次数")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="模拟上游延迟（秒）"
+    )
+    parser.add_argument("--interval", type=float, default=0.0, help="抓取间隔（秒）")
+    args = parser.parse_args()
+
+    results = [
+        bench_thread_per_tick(args.ticks, args.latency, args.interval),
+        bench_event_loop(args.ticks, args.latency, args.interval),
+    ]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
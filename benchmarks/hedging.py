@@ -0,0 +1,68 @@
+"""
+对冲请求基准：单数据源 vs 双数据源对冲，对比展示价格的尾延迟
+
+用法:
+    python -m benchmarks.hedging --ticks 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.stub_server import StubConfig, StubServer
+from client import create_price_fetcher
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def _run(base_urls, ticks):
+    fetcher = create_price_fetcher(base_urls, default_hedge_delay=0.1)
+    samples = []
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            await fetcher.fetch()
+            samples.append(time.perf_counter() - start)
+    finally:
+        await fetcher.aclose()
+    return {
+        "providers": len(base_urls),
+        "latency": _percentiles(samples),
+        "hedges_sent": fetcher.hedges_sent,
+        "provider_stats": fetcher.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对冲请求基准")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="长尾请求比例")
+    args = parser.parse_args()
+
+    def config(seed):
+        return StubConfig(
+            latency=0.02,
+            jitter=0.005,
+            slow_rate=args.slow_rate,
+            slow_latency=1.0,
+            seed=seed,
+        )
+
+    with StubServer(config(1)) as primary, StubServer(config(2)) as secondary:
+        results = [
+            asyncio.run(_run([primary.base_url], args.ticks)),
+            asyncio.run(_run([primary.base_url, secondary.base_url], args.ticks)),
+        ]
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
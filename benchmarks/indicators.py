@@ -0,0 +1,152 @@
+"""
+技术指标基准与一致性检查：逐个增量 update vs NumPy 批量计算
+
+对一天的随机游走价格（默认 86400 个 tick）分别用两种方式计算 SMA/EMA/布林带/RSI，
+报告逐点最大误差、启动重建耗时与单 tick 增量更新耗时。误差超过容差时退出码为 1，可用于 CI。
+
+用法:
+    python -m benchmarks.indicators --ticks 86400
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+
+from indicators import (
+    EMA,
+    HAS_NUMPY,
+    RSI,
+    SMA,
+    Bollinger,
+    IndicatorSet,
+    bollinger_batch,
+    ema_batch,
+    rsi_batch,
+    sma_batch,
+)
+
+
+def _random_walk(count, price, rng):
+    prices = []
+    for _ in range(count):
+        price = max(1.0, price + rng.gauss(0, 0.15))
+        prices.append(round(price, 2))
+    return prices
+
+
+def _incremental(indicator, prices, pick=lambda v: v):
+    out = []
+    for price in prices:
+        value = indicator.update(price)
+        out.append(math.nan if value is None else pick(value))
+    return out
+
+
+def _max_error(expected, actual):
+    """逐点最大绝对误差；两侧未就绪（NaN）的位置必须一致"""
+    worst = 0.0
+    for a, b in zip(expected, actual):
+        if math.isnan(a) or math.isnan(b):
+            if math.isnan(a) != math.isnan(b):
+                return math.inf
+            continue
+        worst = max(worst, abs(a - b))
+    return worst
+
+
+def _snapshot_error(a, b):
+    worst = 0.0
+    for key in a:
+        if (a[key] is None) != (b[key] is None):
+            return math.inf
+        if a[key] is not None:
+            worst = max(worst, abs(a[key] - b[key]))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技术指标增量/批量一致性与耗时基准")
+    parser.add_argument("--ticks", type=int, default=86400)
+    parser.add_argument("--price", type=float, default=768.0)
+    parser.add_argument("--period", type=int, default=20)
+    parser.add_argument("--rsi-period", type=int, default=14)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print(
+            json.dumps({"error": "需要安装 numpy 才能运行批量路径"}, ensure_ascii=False)
+        )
+        sys.exit(1)
+
+    prices = _random_walk(args.ticks, args.price, random.Random(args.seed))
+    n = args.period
+
+    errors = {
+        "sma": _max_error(_incremental(SMA(n), prices), sma_batch(prices, n).tolist()),
+        "ema": _max_error(_incremental(EMA(n), prices), ema_batch(prices, n).tolist()),
+        "rsi": _max_error(
+            _incremental(RSI(args.rsi_period), prices),
+            rsi_batch(prices, args.rsi_period).tolist(),
+        ),
+    }
+    bands = bollinger_batch(prices, n)
+    for i, name in enumerate(("boll_middle", "boll_upper", "boll_lower")):
+        errors[name] = _max_error(
+            _incremental(Bollinger(n), prices, lambda v, i=i: v[i]), bands[i].tolist()
+        )
+
+    # 启动重建：批量路径 vs 逐个回放
+    def make_set():
+        return IndicatorSet((n, n * 3), (n,), n, 2.0, args.rsi_period)
+
+    replayed = make_set()
+    start = time.perf_counter()
+    for price in prices:
+        replayed.update(price)
+    replay_seconds = time.perf_counter() - start
+
+    rebuilt = make_set()
+    start = time.perf_counter()
+    rebuilt.rebuild(prices)
+    rebuild_seconds = time.perf_counter() - start
+    errors["rebuild_snapshot"] = _snapshot_error(
+        replayed.snapshot(), rebuilt.snapshot()
+    )
+
+    # 重建后继续增量更新，结果仍应与一直增量更新的一致
+    tail = _random_walk(1000, prices[-1], random.Random(args.seed + 1))
+    start = time.perf_counter()
+    for price in tail:
+        rebuilt.update(price)
+    update_seconds = time.perf_counter() - start
+    for price in tail:
+        replayed.update(price)
+    errors["after_rebuild"] = _snapshot_error(replayed.snapshot(), rebuilt.snapshot())
+
+    results = {
+        "ticks": args.ticks,
+        "period": n,
+        "max_abs_error": errors,
+        "rebuild_ms": {
+            "numpy_batch": rebuild_seconds * 1000,
+            "incremental_replay": replay_seconds * 1000,
+        },
+        "update_us_per_tick": update_seconds / len(tail) * 1e6,
+        "consistent": all(e <= args.tolerance for e in errors.values()),
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if results["consistent"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+端到端流水线基准：在独立进程中运行 latestPrice 桩服务，无界面驱动
+ApiClient/JdjrApi、AsyncJdjrApi 以及 GoldPriceService + 更新流水线（变更检测 → 标题 → 详情）
+
+每个场景输出 ticks/sec、端到端延迟 p50/p95/p99、每 tick CPU 时间与内存分配，
+结果为 JSON，可用 --compare 与之前保存的结果对比。
+
+用法:
+    python -m benchmarks.pipeline --ticks 500 --latency 0.005 --output result.json
+    python -m benchmarks.pipeline --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+SCENARIOS = ("api", "async_api", "service")
+
+# 对比时数值越小越好的指标
+LOWER_IS_BETTER = (
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "cpu_us_per_tick",
+    "alloc_peak_bytes_per_tick",
+    "retained_bytes_per_tick",
+)
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubProcess:
+    """在子进程中运行桩服务，避免其 CPU 与内存分配计入被测进程"""
+
+    def __init__(self, args):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}/"
+        self.command = [
+            sys.executable,
+            "-m",
+            "benchmarks.stub_server",
+            "--port",
+            str(self.port),
+            "--latency",
+            str(args.latency),
+            "--jitter",
+            str(args.jitter),
+            "--error-rate",
+            str(args.error_rate),
+            "--change-rate",
+            str(args.change_rate),
+            "--seed",
+            str(args.seed),
+        ]
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.2).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        self.process.kill()
+        raise RuntimeError("桩服务启动超时")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(5)
+
+
+class Recorder:
+    """逐 tick 记录墙钟延迟、CPU 时间与分配"""
+
+    def __init__(self, trace_allocations: bool):
+        self.trace_allocations = trace_allocations
+        self.latencies = []
+        self.cpu = 0.0
+        self.errors = 0
+        self.alloc_peak = 0
+        self.retained = 0
+
+    def begin(self):
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            self._mem = tracemalloc.get_traced_memory()[0]
+        self._cpu = time.thread_time()
+        self._start = time.perf_counter()
+
+    def end(self, ok: bool):
+        elapsed = time.perf_counter() - self._start
+        self.cpu += time.thread_time() - self._cpu
+        if self.trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            self.alloc_peak += peak - self._mem
+            self.retained += current - self._mem
+        if ok:
+            self.latencies.append(elapsed)
+        else:
+            self.errors += 1
+
+
+def _summary(recorder: Recorder, wall: float) -> dict:
+    ordered = sorted(recorder.latencies)
+    total = len(ordered) + recorder.errors
+    result = {
+        "ticks": len(ordered),
+        "errors": recorder.errors,
+        "ticks_per_sec": len(ordered) / wall if wall else 0.0,
+    }
+    for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        value = _percentile(ordered, q)
+        result[name] = value * 1000 if value is not None else None
+    result["cpu_us_per_tick"] = recorder.cpu / total * 1e6 if total else None
+    return result
+
+
+def _allocations(recorder: Recorder) -> dict:
+    total = len(recorder.latencies) + recorder.errors
+    return {
+        "alloc_peak_bytes_per_tick": recorder.alloc_peak / total if total else None,
+        "retained_bytes_per_tick": recorder.retained / total if total else None,
+    }
+
+
+def _update_pipeline(service, tick):
+    """与状态栏应用一致的更新流程：只在 tick 变化时重新生成标题与详情"""
+    changes = service.diff_tick(tick)
+    if changes is None:
+        return
+    service.format_price_display(tick)
+    service.get_detailed_info(tick)
+
+
+def _bench_api(base_url, ticks, warmup, recorder):
+    from client import ApiClient, JdjrApi
+    from tick import PriceTick
+
+    api = JdjrApi(ApiClient(base_url))
+
+    def once():
+        try:
+            PriceTick.from_data(api.get_latest_gold_price())
+            return True
+        except Exception:
+            return False
+
+    for _ in range(warmup):
+        once()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        recorder.begin()
+        recorder.end(once())
+    wall = time.perf_counter() - start
+    api.api_client.client.close()
+    return wall
+
+
+def _bench_async_api(base_url, ticks, warmup, recorder):
+    from client import AsyncApiClient, AsyncJdjrApi
+    from tick import PriceTick
+
+    async def run():
+        api = AsyncJdjrApi(AsyncApiClient(base_url))
+
+        async def once():
+            try:
+                PriceTick.from_data(await api.get_latest_gold_price())
+                return True
+            except Exception:
+                return False
+
+        try:
+            for _ in range(warmup):
+                await once()
+            start = time.perf_counter()
+            for _ in range(ticks):
+                recorder.begin()
+                recorder.end(await once())
+            return time.perf_counter() - start
+        finally:
+            await api.api_client.aclose()
+
+    return asyncio.run(run())
+
+
+def _bench_service(base_url, ticks, warmup, recorder):
+    from service import GoldPriceService
+
+    async def run():
+        service = GoldPriceService()
+
+        async def once():
+            tick = await service.get_latest_gold_price()
+            if tick is None:
+                return False
+            _update_pipeline(service, tick)
+            return True
+
+        try:
+            for _ in range(warmup):
+                await once()
+            start = time.perf_counter()
+            for _ in range(ticks):
+                recorder.begin()
+                recorder.end(await once())
+            return time.perf_counter() - start
+        finally:
+            await service.price_fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+BENCHES = {
+    "api": _bench_api,
+    "async_api": _bench_async_api,
+    "service": _bench_service,
+}
+
+
+def run_scenario(name, base_url, args) -> dict:
+    bench = BENCHES[name]
+
+    # 计时轮：不开启 tracemalloc，避免其开销影响延迟与 CPU 统计
+    recorder = Recorder(trace_allocations=False)
+    wall = bench(base_url, args.ticks, args.warmup, recorder)
+    result = _summary(recorder, wall)
+
+    # 分配轮：单独跑少量 tick
+    recorder = Recorder(trace_allocations=True)
+    tracemalloc.start()
+    try:
+        bench(base_url, args.alloc_ticks, args.warmup, recorder)
+    finally:
+        tracemalloc.stop()
+    result.update(_allocations(recorder))
+    return result
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """计算各指标相对基线的变化百分比（正数表示变差）"""
+    report = {}
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        deltas = {}
+        for metric, value in current.items():
+            old = previous.get(metric)
+            if not isinstance(value, (int, float)) or not old:
+                continue
+            change = (value - old) / old * 100
+            if metric == "ticks_per_sec":
+                change = -change
+            elif metric not in LOWER_IS_BETTER:
+                continue
+            deltas[metric] = round(change, 2)
+        report[name] = deltas
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端流水线基准")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--alloc-ticks", type=int, default=100, help="分配统计轮 tick 数"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="桩服务基础延迟（秒）"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.002, help="桩服务延迟抖动（秒）"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 错误比例")
+    parser.add_argument(
+        "--change-rate", type=float, default=0.5, help="每次请求价格变化的概率"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="只运行指定场景"
+    )
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    args = parser.parse_args()
+
+    with StubProcess(args) as stub:
+        # 服务按环境变量读取配置：指向桩服务，不写入用户的 tick 存储，
+        # 也不参与共享内存主进程选举（否则会向正在运行的应用发布桩价格，
+        # 或在应用已是主进程时只测到共享内存读取）
+        os.environ["GOLD_PROVIDER_URLS"] = stub.base_url
+        os.environ["GOLD_TICK_STORE"] = "false"
+        os.environ["GOLD_SHARED_TICK"] = "false"
+
+        from decode import BACKEND
+
+        results = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "decode_backend": BACKEND,
+            "stub": {
+                "latency": args.latency,
+                "jitter": args.jitter,
+                "error_rate": args.error_rate,
+                "change_rate": args.change_rate,
+            },
+            "scenarios": {
+                name: run_scenario(name, stub.base_url, args)
+                for name in args.scenario or SCENARIOS
+            },
+        }
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            results["compare"] = compare(results, json.load(f))
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
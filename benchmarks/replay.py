@@ -0,0 +1,108 @@
+"""
+回放基准：以最快速度把一天的录制 tick 送入实时流水线
+
+在临时 tick 存储中写入一天的随机游走 tick（1 秒间隔，含重复价格），然后：
+1. 以最快速度回放两次，报告 ticks/sec 与各阶段每 tick 耗时，并检查两次的提醒序列与格式化输出摘要一致；
+2. 以 100 倍速回放开头一段，检查实际耗时与录制时长 / 100 相符。
+任一检查失败时退出码为 1。
+
+用法:
+    python -m benchmarks.replay --ticks 86400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+
+from config import get_app_config
+from replay import TickReplayer
+from store import TickStore
+
+
+def _record_day(path, ticks, seed):
+    rng = random.Random(seed)
+    store = TickStore(path, flush_interval=0)
+    start = 1760000000.0
+    yesterday = 768.0
+    price = yesterday
+    for i in range(ticks):
+        if rng.random() < 0.7:
+            price = max(1.0, round(price + rng.gauss(0, 0.15), 2))
+        t = start + i
+        store.append(int(t * 1000), price, yesterday, price - yesterday, t + 0.05)
+    records = list(store.iter_records())
+    store.close()
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tick 回放基准")
+    parser.add_argument("--ticks", type=int, default=86400)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--paced-ticks", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    config = get_app_config().snapshot().to_dict()
+    config.update(
+        show_price_change_alerts=True,
+        price_change_threshold=args.threshold,
+        alert_rules=[
+            {
+                "id": "drop-1h",
+                "kind": "window",
+                "threshold": 0.3,
+                "direction": "down",
+                "window": 3600,
+            },
+            {
+                "id": "spike",
+                "kind": "sigma",
+                "threshold": 3,
+                "direction": "up",
+                "window": 300,
+            },
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        records = _record_day(os.path.join(tmp, "ticks.dat"), args.ticks, args.seed)
+
+    runs = [asyncio.run(TickReplayer(records, config).run()) for _ in range(2)]
+    paced = records[: args.paced_ticks]
+    paced_report = asyncio.run(TickReplayer(paced, config, speed=100).run())
+    expected_wall = paced_report["recorded_seconds"] / 100
+
+    checks = {
+        "deterministic": runs[0]["digest"] == runs[1]["digest"],
+        "all_ticks_replayed": runs[0]["ticks"] == len(records),
+        "no_failures": runs[0]["failed"] == 0,
+        "paced_100x": expected_wall * 0.9
+        <= paced_report["wall_seconds"]
+        <= expected_wall * 1.5 + 0.05,
+    }
+    results = {
+        "max_speed": runs[0],
+        "speed_100x": {
+            "ticks": paced_report["ticks"],
+            "recorded_seconds": paced_report["recorded_seconds"],
+            "wall_seconds": paced_report["wall_seconds"],
+            "expected_wall_seconds": expected_wall,
+        },
+        "checks": checks,
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
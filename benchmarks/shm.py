@@ -0,0 +1,169 @@
+"""
+共享内存 tick 通道基准与一致性检查
+
+1. 读取耗时：单进程内反复 read()，报告每次读取的微秒数，对比向本地守护进程请求 /snapshot 的量级；
+2. 撕裂读取：子进程以最快速度连续发布 tick（价格 = 昨收 + 涨跌额，上游时间 = 接收时间），
+   主进程同时反复读取，每个快照都必须满足这两个等式；
+3. 主进程选举：子进程持有选举锁后被 SIGKILL，本进程应在下一次尝试时接替，并从段中读到前任发布的 tick。
+任一检查失败时退出码为 1。
+
+用法:
+    python -m benchmarks.shm --reads 200000
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from shm import LeaderLock, SharedTickReader, SharedTickWriter, unlink_segment
+from tick import PriceTick
+
+WRITER_SCRIPT = """
+import sys, time
+from shm import SharedTickWriter
+from tick import PriceTick
+writer = SharedTickWriter(sys.argv[1])
+deadline = time.monotonic() + float(sys.argv[2])
+i = 0
+while time.monotonic() < deadline:
+    i += 1
+    yesterday = 76800 + i % 997
+    change = i % 1000 - 500
+    writer.publish(PriceTick(yesterday + change, yesterday, change, 0.0, i, "sku", i))
+print(i)
+"""
+
+LEADER_SCRIPT = """
+import sys, time
+from shm import LeaderLock, SharedTickWriter
+from tick import PriceTick
+lock = LeaderLock(sys.argv[2])
+assert lock.acquire()
+SharedTickWriter(sys.argv[1]).publish(PriceTick(76900, 76800, 100, 0.13, 42, "", 42))
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+def _consistent(tick: PriceTick) -> bool:
+    return (
+        tick.price_cents == tick.yesterday_cents + tick.change_cents
+        and tick.time_ms == tick.receive_ms
+    )
+
+
+def _read_latency(name, reads):
+    writer = SharedTickWriter(name)
+    writer.publish(PriceTick(76852, 76800, 52, 0.07, 1, "", 1))
+    reader = SharedTickReader(name)
+    reader.read()
+    start = time.perf_counter()
+    for _ in range(reads):
+        reader.read()
+    elapsed = time.perf_counter() - start
+    reader.close()
+    writer.close()
+    return elapsed / reads * 1e6
+
+
+def _torn_reads(name, seconds):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    proc = subprocess.Popen(
+        [sys.executable, "-c", WRITER_SCRIPT, name, str(seconds)],
+        stdout=subprocess.PIPE,
+        env=env,
+        text=True,
+    )
+    reader = SharedTickReader(name)
+    reads = inconsistent = misses = 0
+    seqs = set()
+    while proc.poll() is None:
+        shared = reader.read()
+        if shared is None:
+            misses += 1
+            continue
+        reads += 1
+        seqs.add(shared.seq)
+        if not _consistent(shared.tick):
+            inconsistent += 1
+    published = int(proc.communicate()[0].strip() or 0)
+    reader.close()
+    return {
+        "published": published,
+        "reads": reads,
+        "distinct_snapshots": len(seqs),
+        "inconsistent": inconsistent,
+        "read_retries": reader.retries,
+        "misses": misses,
+    }
+
+
+def _failover(name, lock_path):
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    proc = subprocess.Popen(
+        [sys.executable, "-c", LEADER_SCRIPT, name, lock_path],
+        stdout=subprocess.PIPE,
+        env=env,
+        text=True,
+    )
+    proc.stdout.readline()
+    lock = LeaderLock(lock_path)
+    blocked_while_alive = not lock.acquire()
+    os.kill(proc.pid, signal.SIGKILL)
+    proc.wait()
+    start = time.perf_counter()
+    acquired = lock.acquire()
+    takeover_ms = (time.perf_counter() - start) * 1000
+    reader = SharedTickReader(name)
+    shared = reader.read()
+    reader.close()
+    lock.release()
+    return {
+        "blocked_while_leader_alive": blocked_while_alive,
+        "acquired_after_kill": acquired,
+        "takeover_ms": takeover_ms,
+        "segment_survived_leader": shared is not None and shared.tick.time_ms == 42,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享内存 tick 通道基准")
+    parser.add_argument("--reads", type=int, default=200000)
+    parser.add_argument("--stress-seconds", type=float, default=2.0)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    name = f"gold_bench_{os.getpid()}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {
+                "read_us": _read_latency(name, args.reads),
+                "torn_reads": _torn_reads(name, args.stress_seconds),
+                "failover": _failover(name, os.path.join(tmp, "leader.lock")),
+            }
+    finally:
+        unlink_segment(name)
+
+    torn = results["torn_reads"]
+    failover = results["failover"]
+    results["checks"] = {
+        "no_torn_reads": torn["inconsistent"] == 0 and torn["reads"] > 0,
+        "blocked_while_leader_alive": failover["blocked_while_leader_alive"],
+        "acquired_after_kill": failover["acquired_after_kill"],
+        "segment_survived_leader": failover["segment_survived_leader"],
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if all(results["checks"].values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
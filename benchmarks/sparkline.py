@@ -0,0 +1,131 @@
+"""
+走势图渲染基准：按 K 线时间桶缓存 vs 每个 tick 重绘
+
+以 1 秒间隔的随机游走 tick 模拟若干小时的行情，统计两种方式的重绘次数与每 tick CPU 时间；
+同时检查渲染输出是确定的（同一输入在复用缓冲区多次绘制后得到相同的 PNG 字节）、
+内容未变化时复用上次的图像、缓存目录中每个图表只有一个文件，任一检查失败时退出码为 1。
+无需 AppKit，可在 Linux 上运行。
+
+用法:
+    python -m benchmarks.sparkline --hours 6
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+from candles import HOUR, CandleAggregator
+from sparkline import CHART_STYLE, ChartRenderer, IntradayCharts
+
+
+def _decode_pixels(png: bytes) -> bytes:
+    """从本模块生成的 PNG（单个 IDAT、无滤波）中取回像素"""
+    start = png.index(b"IDAT") + 4
+    length = int.from_bytes(png[start - 8 : start - 4], "big")
+    raw = zlib.decompress(png[start : start + length])
+    return raw
+
+
+def _check_deterministic(rng):
+    renderer = ChartRenderer(CHART_STYLE)
+    a = [768 + rng.gauss(0, 1) for _ in range(200)]
+    b = [768 + rng.gauss(0, 1) for _ in range(200)]
+    first = renderer.render(a, min(a), max(a))
+    renderer.render(b, min(b), max(b))
+    again = renderer.render(a, min(a), max(a))
+    fresh = ChartRenderer(CHART_STYLE).render(a, min(a), max(a))
+    stride = renderer.buffer.width * 4 + 1
+    pixels = _decode_pixels(first)
+    return {
+        "sha256": hashlib.sha256(first).hexdigest(),
+        "reused_buffer_identical": first == again,
+        "fresh_renderer_identical": first == fresh,
+        "png_matches_buffer": len(pixels) == stride * renderer.buffer.height,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="走势图渲染与缓存基准")
+    parser.add_argument("--hours", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ticks = int(args.hours * HOUR)
+    start_time = 1760000000.0
+    prices = []
+    price = 768.0
+    for _ in range(ticks):
+        price = max(1.0, price + rng.gauss(0, 0.15))
+        prices.append(round(price, 2))
+
+    # 缓存路径：每个 tick 调用 update，只在新 K 线开始时渲染，PNG 写入临时目录
+    aggregator = CandleAggregator(utc_offset=8 * HOUR)
+    with tempfile.TemporaryDirectory() as directory:
+        charts = IntradayCharts(directory=directory)
+        cached_cpu = 0.0
+        for i, p in enumerate(prices):
+            aggregator.update(start_time + i, p)
+            begin = time.thread_time()
+            charts.update(aggregator)
+            cached_cpu += time.thread_time() - begin
+        files = sorted(os.listdir(directory))
+
+        # 同一时间桶强制重新取数：内容未变化，应直接复用上次的图像
+        renders = charts.sparkline.renders + charts.chart.renders
+        charts._bucket = None
+        reused = charts.update(aggregator)
+        content_hit = (
+            reused is not None
+            and charts.sparkline.renders + charts.chart.renders == renders
+        )
+
+    # 朴素路径：每个 tick 都重新取数并重绘两张图（取样避免耗时过长）
+    sample = min(ticks, 300)
+    naive = IntradayCharts()
+    begin = time.thread_time()
+    for _ in range(sample):
+        naive._bucket = None
+        naive.cache.clear()
+        naive.update(aggregator)
+    naive_cpu_per_tick = (time.thread_time() - begin) / sample
+
+    determinism = _check_deterministic(rng)
+    checks = {
+        "reused_buffer_identical": determinism["reused_buffer_identical"],
+        "fresh_renderer_identical": determinism["fresh_renderer_identical"],
+        "png_matches_buffer": determinism["png_matches_buffer"],
+        "identical_content_reused": content_hit,
+        "one_file_per_chart": files == ["chart.png", "sparkline.png"],
+    }
+    results = {
+        "ticks": ticks,
+        "cached": {
+            "cpu_us_per_tick": cached_cpu / ticks * 1e6,
+            **charts.stats(),
+            "files": files,
+        },
+        "redraw_every_tick": {
+            "cpu_us_per_tick": naive_cpu_per_tick * 1e6,
+            "renders": ticks,
+        },
+        "png_sha256": determinism["sha256"],
+        "checks": checks,
+    }
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
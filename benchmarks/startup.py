@@ -0,0 +1,169 @@
+"""
+冷启动基准：用 -X importtime 统计首次绘制前需要导入的模块耗时，并与预算比较
+
+首次绘制只需要配置、日志、指标、主线程调度器、tick 存储读取与 tick 类型；
+httpx / usepy / asyncio 等重模块应在状态栏显示后才加载（延迟加载阶段单独统计）。
+超出预算或首次绘制阶段导入了重模块时退出码为 1，可用于 CI。
+
+用法:
+    python -m benchmarks.startup --runs 7 --budget-ms 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# main.py 在首次绘制前导入的本项目模块（rumps/PyObjC 属于系统框架，不计入）
+FIRST_PAINT_MODULES = ("config", "log", "metrics", "dispatcher", "store", "tick")
+# 状态栏显示后才加载的模块
+DEFERRED_MODULES = ("engine", "scheduler", "service")
+# 首次绘制阶段不允许出现的重模块
+HEAVY_MODULES = (
+    "httpx",
+    "httpcore",
+    "usepy",
+    "asyncio",
+    "logging",
+    "msgspec",
+    "numpy",
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAINT_SCRIPT = """
+import json, sys, time
+_start = time.perf_counter()
+{imports}
+from store import read_last_record
+from tick import PriceTick
+record = read_last_record({path!r})
+title = PriceTick.from_record(record).title_text() if record else None
+_elapsed = time.perf_counter() - _start
+print(json.dumps({{
+    "elapsed": _elapsed,
+    "painted": title is not None,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def _run_importtime(code: str):
+    """执行代码并返回 (importtime 行列表, stdout)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        # 名称前的缩进表示嵌套层级（去掉分隔符后的一个空格）
+        rows.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return rows, result.stdout
+
+
+def _startup_modules():
+    """解释器自身启动（site 等）与测量脚本本身导入的模块，统计时排除"""
+    rows, _ = _run_importtime("import json, sys, time")
+    return {name.strip() for name, _, _ in rows}
+
+
+def _measure(code: str, baseline):
+    rows, stdout = _run_importtime(code)
+    rows = [row for row in rows if row[0].strip() not in baseline]
+    # 只累加顶层导入（名称无缩进）的累计耗时，避免重复计算
+    total = sum(cumulative for name, _, cumulative in rows if not name.startswith(" "))
+    return total / 1000, rows, stdout
+
+
+def _slowest(rows, limit=8):
+    ordered = sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+    return [{"module": name.strip(), "self_ms": us / 1000} for name, us, _ in ordered]
+
+
+def _write_sample_store(path: str):
+    """写入一条记录，让首次绘制走完整的读取路径"""
+    sys.path.insert(0, ROOT)
+    from store import TickStore
+
+    store = TickStore(path, flush_interval=0)
+    store.append(1760000000000, 768.52, 765.10, 3.42, 1760000000.5)
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动导入耗时基准")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument(
+        "--budget-ms", type=float, default=30.0, help="首次绘制阶段导入耗时预算"
+    )
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args()
+
+    baseline = _startup_modules()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, "ticks.dat")
+        _write_sample_store(store_path)
+
+        paint_code = PAINT_SCRIPT.format(
+            imports="\n".join(f"import {m}" for m in FIRST_PAINT_MODULES),
+            path=store_path,
+            heavy=HEAVY_MODULES,
+        )
+        deferred_code = "\n".join(f"import {m}" for m in DEFERRED_MODULES)
+
+        paint_times, paint_elapsed, deferred_times = [], [], []
+        paint_rows = deferred_rows = []
+        heavy = []
+        painted = False
+        for _ in range(args.runs):
+            total, paint_rows, stdout = _measure(paint_code, baseline)
+            report = json.loads(stdout)
+            paint_times.append(total)
+            paint_elapsed.append(report["elapsed"] * 1000)
+            heavy = report["heavy"]
+            painted = report["painted"]
+
+            total, deferred_rows, _ = _measure(deferred_code, baseline)
+            deferred_times.append(total)
+
+    first_paint_ms = statistics.median(paint_times)
+    results = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "budget_ms": args.budget_ms,
+        "first_paint": {
+            "modules": list(FIRST_PAINT_MODULES),
+            "import_ms": first_paint_ms,
+            "wall_ms": statistics.median(paint_elapsed),
+            "painted_from_store": painted,
+            "heavy_modules_loaded": heavy,
+            "slowest": _slowest(paint_rows),
+        },
+        "deferred": {
+            "modules": list(DEFERRED_MODULES),
+            "import_ms": statistics.median(deferred_times),
+            "slowest": _slowest(deferred_rows),
+        },
+        "within_budget": first_paint_ms <= args.budget_ms and not heavy,
+    }
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    sys.exit(0 if results["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
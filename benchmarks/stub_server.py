@@ -0,0 +1,174 @@
+"""
+京东 latestPrice 接口的本地桩服务
+
+用法:
+    python -m benchmarks.stub_server --port 8765 --latency 0.05 --jitter 0.02
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATEST_PRICE_PATH = "/gw/generic/hj/h5/m/latestPrice"
+
+
+class StubConfig:
+    """桩服务行为配置"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        change_rate: float = 1.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate  # 长尾请求比例
+        self.slow_latency = slow_latency
+        self.change_rate = change_rate  # 每次请求价格发生变化的概率
+        self.random = random.Random(seed)
+        self.price = 768.52
+        self.yesterday_price = 765.10
+        self.tick_time = int(time.time() * 1000)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if self.slow_rate and self.random.random() < self.slow_rate:
+            return self.slow_latency
+        return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+
+    def advance(self):
+        """按 change_rate 随机游走价格；价格不变时上游时间也保持不变"""
+        with self._lock:
+            self.requests += 1
+            if self.random.random() < self.change_rate:
+                step = self.random.choice((-1, 1)) * self.random.randint(1, 50) / 100
+                self.price = max(round(self.price + step, 2), 0.01)
+                self.tick_time = max(int(time.time() * 1000), self.tick_time + 1)
+
+    def payload(self) -> dict:
+        amt = self.price - self.yesterday_price
+        rate = amt / self.yesterday_price * 100
+        return {
+            "resultCode": 0,
+            "resultData": {
+                "datas": {
+                    "price": f"{self.price:.2f}",
+                    "yesterdayPrice": f"{self.yesterday_price:.2f}",
+                    "upAndDownRate": f"{rate:+.2f}%",
+                    "upAndDownAmt": f"{amt:.2f}",
+                    "time": str(self.tick_time),
+                    "productSku": "1961543816",
+                }
+            },
+        }
+
+
+def _make_handler(config: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 响应头与响应体分两次写出，关闭 Nagle 以免与延迟 ACK 叠加出约 40ms 的额外延迟
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            # 兼容客户端 base_url 末尾斜杠导致的双斜杠路径
+            path = "/" + self.path.split("?", 1)[0].lstrip("/")
+            if path != LATEST_PRICE_PATH:
+                self.send_error(404)
+                return
+            config.advance()
+            time.sleep(config.delay())
+            if config.error_rate and config.random.random() < config.error_rate:
+                self.send_error(503)
+                return
+            body = json.dumps(config.payload()).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 客户端取消对冲请求会导致断开连接，属于预期行为
+        pass
+
+
+class StubServer:
+    """在后台线程运行的桩服务"""
+
+    def __init__(
+        self, config: StubConfig = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.config = config or StubConfig()
+        self.httpd = _QuietHTTPServer((host, port), _make_handler(self.config))
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="latestPrice 桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 错误比例")
+    parser.add_argument(
+        "--change-rate", type=float, default=1.0, help="每次请求价格变化的概率"
+    )
+    parser.add_argument("--seed", type=int, help="随机种子")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        change_rate=args.change_rate,
+        seed=args.seed,
+    )
+    server = StubServer(config, args.host, args.port)
+    print(f"桩服务已启动: {server.base_url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+金价缓存模块
+stale-while-revalidate：新鲜期内直接返回缓存；过期但仍在容忍窗口内时返回缓存并触发一次后台刷新；
+超出容忍窗口视为无数据，由调用方进入错误状态。每个缓存结果都带有年龄，便于界面显示。
+"""
+
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from tick import PriceTick
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+class CachedTick(NamedTuple):
+    """带年龄的缓存 tick"""
+
+    tick: PriceTick
+    age: float  # 距离抓取成功的秒数
+    state: str  # FRESH / STALE / EXPIRED
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.state == FRESH
+
+    def age_text(self) -> str:
+        return format_age(self.age)
+
+
+def format_age(seconds: float) -> str:
+    """将缓存年龄格式化为“N秒前/N分钟前/N小时前”"""
+    if seconds < 1:
+        return "刚刚"
+    if seconds < 60:
+        return f"{int(seconds)}秒前"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}分钟前"
+    return f"{int(seconds // 3600)}小时前"
+
+
+class PriceCache:
+    """
+    带新鲜期与容忍窗口的单值缓存
+
+    Args:
+        ttl: 新鲜期（秒），期内读取不发起请求
+        stale_window: 新鲜期之后仍可返回旧值的时长（秒）
+        clock: 单调时钟，便于测试与回放注入
+    """
+
+    def __init__(
+        self,
+        ttl: float = 2.0,
+        stale_window: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_window = stale_window
+        self.clock = clock
+        self._tick: Optional[PriceTick] = None
+        self._stored_at = 0.0
+        self._lock = threading.Lock()
+
+        # 统计
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def put(self, tick: PriceTick, age: float = 0.0):
+        """
+        写入一次成功抓取的 tick
+
+        Args:
+            age: 写入时 tick 已有的年龄（秒），如从共享内存读到的主进程 tick
+        """
+        with self._lock:
+            self._tick = tick
+            self._stored_at = self.clock() - max(age, 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._tick = None
+
+    def peek(self) -> Optional[CachedTick]:
+        """读取缓存及其状态（不计入统计）；从未写入时返回 None"""
+        with self._lock:
+            tick = self._tick
+            age = self.clock() - self._stored_at
+        if tick is None:
+            return None
+        if age <= self.ttl:
+            state = FRESH
+        elif age <= self.ttl + self.stale_window:
+            state = STALE
+        else:
+            state = EXPIRED
+        return CachedTick(tick, age, state)
+
+    def lookup(self) -> Optional[CachedTick]:
+        """
+        按 stale-while-revalidate 规则读取
+
+        Returns:
+            CachedTick: 新鲜或可容忍的旧值；无缓存或已超出容忍窗口时返回 None
+        """
+        cached = self.peek()
+        if cached is None or cached.state == EXPIRED:
+            self.misses += 1
+            return None
+        if cached.state == FRESH:
+            self.fresh_hits += 1
+        else:
+            self.stale_hits += 1
+        return cached
+
+    def stats(self):
+        cached = self.peek()
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "age": cached.age if cached else None,
+            "state": cached.state if cached else None,
+        }
@@ -0,0 +1,324 @@
+"""
+K 线聚合模块
+将 tick 增量聚合为 1分钟/5分钟/1小时/1天 的 OHLC K 线，每个周期保存在定长环形缓冲区中，
+超过保留数量后覆盖最旧的 K 线，内存占用与运行时长无关。
+
+区间查询按 K 线起始时间二分定位；降采样先选取区间内 K 线数不超过目标点数若干倍的最细周期，
+再用 LTTB（Largest-Triangle-Three-Buckets）压缩到目标点数，代价只与点数相关、与区间长度无关。
+"""
+
+import threading
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+# 默认周期（秒）与保留 K 线数：1分钟 7天、5分钟 30天、1小时 1年、1天 10年
+DEFAULT_RETENTION: Dict[int, int] = {
+    MINUTE: 7 * 1440,
+    5 * MINUTE: 30 * 288,
+    HOUR: 365 * 24,
+    DAY: 3650,
+}
+
+
+class Candle(NamedTuple):
+    """一根 K 线（start 为周期起始的 epoch 秒）"""
+
+    start: float
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int
+
+    def to_dict(self) -> Dict[str, float]:
+        return self._asdict()
+
+
+def _local_utc_offset() -> int:
+    """本地时区相对 UTC 的偏移（秒），日 K 线按本地日期切分"""
+    return time.localtime().tm_gmtoff or 0
+
+
+class CandleSeries:
+    """
+    单一周期的 K 线序列
+
+    Args:
+        resolution: 周期（秒）
+        capacity: 保留的 K 线数
+        utc_offset: 周期边界相对 UTC 的偏移（秒）
+    """
+
+    def __init__(self, resolution: int, capacity: int, utc_offset: int = 0):
+        self.resolution = int(resolution)
+        self.capacity = max(int(capacity), 1)
+        self.utc_offset = utc_offset
+        zeros = bytes(8 * self.capacity)
+        self.start = array("d", zeros)
+        self.open = array("d", zeros)
+        self.high = array("d", zeros)
+        self.low = array("d", zeros)
+        self.close = array("d", zeros)
+        self.count = array("q", zeros)
+        self._head = 0  # 下一根 K 线的写入位置
+        self._size = 0
+        self._last_time: Optional[float] = None
+        self.out_of_order = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def bucket(self, t: float) -> float:
+        """t 所在周期的起始时间"""
+        r = self.resolution
+        offset = self.utc_offset
+        return (t + offset) // r * r - offset
+
+    def _slot(self, offset: int) -> int:
+        """按时间顺序的偏移量转换为缓冲区下标"""
+        return (self._head - self._size + offset) % self.capacity
+
+    def update(self, t: float, price: float) -> bool:
+        """
+        追加一个 tick，O(1)
+
+        Returns:
+            bool: 是否开启了一根新的 K 线
+        """
+        last = self._last_time
+        if last is not None and t <= last:
+            # 时间不前进的重复 tick 不计数；更早的 tick 已无法归入已结束的 K 线
+            if t < last:
+                self.out_of_order += 1
+            return False
+        self._last_time = t
+
+        start = self.bucket(t)
+        if self._size:
+            i = (self._head - 1) % self.capacity
+            if self.start[i] == start:
+                if price > self.high[i]:
+                    self.high[i] = price
+                if price < self.low[i]:
+                    self.low[i] = price
+                self.close[i] = price
+                self.count[i] += 1
+                return False
+
+        i = self._head
+        self.start[i] = start
+        self.open[i] = self.high[i] = self.low[i] = self.close[i] = price
+        self.count[i] = 1
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        return True
+
+    def get(self, offset: int) -> Candle:
+        """按时间顺序的第 offset 根 K 线（支持负数下标）"""
+        if offset < 0:
+            offset += self._size
+        if not 0 <= offset < self._size:
+            raise IndexError(offset)
+        i = self._slot(offset)
+        return Candle(
+            self.start[i],
+            self.open[i],
+            self.high[i],
+            self.low[i],
+            self.close[i],
+            self.count[i],
+        )
+
+    def last(self) -> Optional[Candle]:
+        return self.get(-1) if self._size else None
+
+    def first_start(self) -> Optional[float]:
+        return self.start[self._slot(0)] if self._size else None
+
+    def _bisect(self, t: float) -> int:
+        """第一根起始时间 >= t 的 K 线偏移量"""
+        lo, hi = 0, self._size
+        start = self.start
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if start[self._slot(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def span(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """与 [start, end) 有交集的 K 线偏移量区间，O(log n)"""
+        lo = 0 if start is None else self._bisect(self.bucket(start))
+        hi = self._size if end is None else self._bisect(end)
+        return lo, max(lo, hi)
+
+    def candles(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> List[Candle]:
+        lo, hi = self.span(start, end)
+        return [self.get(k) for k in range(lo, hi)]
+
+    def closes(self, lo: int, hi: int) -> Tuple[List[float], List[float]]:
+        """偏移量区间内的 (起始时间, 收盘价) 两列"""
+        slots = [self._slot(k) for k in range(lo, hi)]
+        start = self.start
+        close = self.close
+        return [start[i] for i in slots], [close[i] for i in slots]
+
+
+def lttb(
+    xs: Sequence[float], ys: Sequence[float], points: int
+) -> List[Tuple[float, float]]:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    保留首尾两点，中间每个桶选出与前一个选中点、下一个桶均值点构成三角形面积最大的点，
+    在压缩点数的同时保留峰谷形状。O(len(xs))。
+    """
+    n = len(xs)
+    if points >= n or points < 3:
+        if points >= n:
+            return list(zip(xs, ys))
+        return [(xs[0], ys[0]), (xs[-1], ys[-1])][:points] if n else []
+
+    sampled = [(xs[0], ys[0])]
+    every = (n - 2) / (points - 2)
+    a = 0
+    for i in range(points - 2):
+        # 下一个桶的均值点
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # 当前桶中面积最大的点
+        ax, ay = xs[a], ys[a]
+        best = -1.0
+        chosen = a
+        for j in range(int(i * every) + 1, next_start):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best:
+                best = area
+                chosen = j
+        sampled.append((xs[chosen], ys[chosen]))
+        a = chosen
+
+    sampled.append((xs[-1], ys[-1]))
+    return sampled
+
+
+class CandleAggregator:
+    """
+    多周期 K 线聚合器
+
+    Args:
+        retention: {周期秒数: 保留 K 线数}
+        utc_offset: 周期边界偏移（秒），默认使用本地时区，使日 K 线按本地日期切分
+    """
+
+    def __init__(
+        self,
+        retention: Optional[Dict[int, int]] = None,
+        utc_offset: Optional[int] = None,
+    ):
+        if utc_offset is None:
+            utc_offset = _local_utc_offset()
+        retention = retention or DEFAULT_RETENTION
+        self.series: Dict[int, CandleSeries] = {
+            int(resolution): CandleSeries(int(resolution), int(capacity), utc_offset)
+            for resolution, capacity in sorted(
+                retention.items(), key=lambda item: int(item[0])
+            )
+        }
+        self._lock = threading.Lock()
+
+    @property
+    def resolutions(self) -> List[int]:
+        return list(self.series)
+
+    def update(self, t: float, price: float):
+        """追加一个 tick（t 为 epoch 秒），O(周期数)"""
+        with self._lock:
+            for series in self.series.values():
+                series.update(t, price)
+
+    def candles(
+        self,
+        resolution: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Candle]:
+        series = self.series.get(int(resolution))
+        if series is None:
+            raise ValueError(f"不支持的 K 线周期: {resolution}")
+        with self._lock:
+            return series.candles(start, end)
+
+    def _choose(self, start: Optional[float], end: Optional[float], budget: int):
+        """
+        选择区间内 K 线数不超过 budget 且覆盖区间起点的最细周期
+
+        细周期保留时长较短，起点早于其最早 K 线时改用更粗的周期；都不满足时用最粗的周期。
+        """
+        ordered = list(self.series.values())
+        for series in ordered:
+            first = series.first_start()
+            if first is None:
+                continue
+            if start is not None and first > series.bucket(start):
+                continue
+            lo, hi = series.span(start, end)
+            if hi - lo <= budget:
+                return series, lo, hi
+        series = ordered[-1]
+        return (series,) + series.span(start, end)
+
+    def downsample(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        points: int = 120,
+        oversample: int = 4,
+    ) -> Tuple[int, List[Tuple[float, float]]]:
+        """
+        返回区间内至多 points 个 (时间, 收盘价) 点
+
+        Args:
+            oversample: 参与 LTTB 的 K 线数上限为 points * oversample
+
+        Returns:
+            (使用的周期秒数, 点列表)
+        """
+        if not self.series:
+            return 0, []
+        with self._lock:
+            series, lo, hi = self._choose(start, end, max(points, 1) * oversample)
+            xs, ys = series.closes(lo, hi)
+        return series.resolution, lttb(xs, ys, points)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                str(resolution): {
+                    "candles": len(series),
+                    "capacity": series.capacity,
+                    "out_of_order": series.out_of_order,
+                }
+                for resolution, series in self.series.items()
+            }
+
+
+def create_candle_aggregator(config) -> CandleAggregator:
+    """根据配置创建 K 线聚合器（candle_retention 的键为周期秒数，可为字符串）"""
+    retention = config.get("candle_retention") or DEFAULT_RETENTION
+    return CandleAggregator({int(k): int(v) for k, v in retention.items()})
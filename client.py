@@ -2,41 +2,215 @@
 HTTP 客户端模块
 """
 
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
 import httpx
-from usepy.dict import AdDict
+
+from decode import decode_latest_price
+from latency import AdaptiveTimeout
+from log import get_logger
+from metrics import metrics
+
+log = get_logger("client")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
+}
+
+
+# httpcore trace 事件 → 指标阶段（connect_tcp 包含 DNS 解析，httpcore 不单独上报 DNS）
+_TRACE_STAGES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "receive_response_headers": "ttfb",
+    "receive_response_body": "body",
+}
+
+
+class RequestTimer:
+    """通过 httpcore trace 扩展记录单次请求各阶段耗时，并反馈给自适应超时"""
+
+    __slots__ = (
+        "policy",
+        "connect_timeout",
+        "read_timeout",
+        "connect",
+        "read",
+        "_marks",
+    )
+
+    def __init__(
+        self,
+        policy: Optional[AdaptiveTimeout] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+    ):
+        self.policy = policy
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.connect = 0.0
+        self.read = None
+        self._marks = {}
+
+    def trace(self, event_name, info):
+        now = time.perf_counter()
+        step, _, phase = event_name.rpartition(".")
+        stage = _TRACE_STAGES.get(step.rpartition(".")[2])
+        if stage is None:
+            return
+        if phase == "started":
+            self._marks[stage] = now
+        elif phase == "complete":
+            elapsed = now - self._marks.get(stage, now)
+            metrics.observe(stage, elapsed)
+            if stage == "ttfb":
+                self.read = elapsed
+            elif stage != "body":
+                # TCP 建连与 TLS 握手合计为建连耗时
+                self.connect += elapsed
+
+    async def atrace(self, event_name, info):
+        """异步客户端要求 trace 回调为协程函数"""
+        self.trace(event_name, info)
+
+    def finish(self):
+        """请求成功：将耗时写入直方图（复用连接时不记录建连耗时）"""
+        if self.policy is None:
+            return
+        if "connect" in self._marks:
+            self.policy.connect.record(self.connect)
+        if self.read is not None:
+            self.policy.read.record(self.read)
+
+    def fail(self, error: Exception):
+        """请求超时：按超时值记一个样本，使分位数向上调整"""
+        if self.policy is None:
+            return
+        if isinstance(error, httpx.ConnectTimeout):
+            self.policy.connect.record(self.connect_timeout)
+        elif isinstance(error, httpx.ReadTimeout):
+            self.policy.read.record(self.read_timeout)
+
+
+def _on_request(request):
+    metrics.inc("requests_total")
+
+
+def _on_response(response):
+    metrics.inc("responses_total", status=str(response.status_code))
+
+
+async def _on_request_async(request):
+    _on_request(request)
+
+
+async def _on_response_async(response):
+    _on_response(response)
+
+
+class EndpointTimeouts:
+    """按端点维护自适应超时；network_timeout 作为上限"""
+
+    def __init__(self, max_timeout: float = 10, adaptive: bool = True, **policy_kwargs):
+        self.max_timeout = max_timeout
+        self.adaptive = adaptive
+        self.policy_kwargs = policy_kwargs
+        self.policies: Dict[str, AdaptiveTimeout] = {}
+
+    def set_max_timeout(self, value: float):
+        self.max_timeout = value
+        for policy in self.policies.values():
+            policy.max_timeout = value
+
+    def start(self, endpoint: str, is_async: bool = False):
+        """
+        为一次请求生成 httpx 参数
+
+        Returns:
+            tuple: (请求关键字参数, RequestTimer)
+        """
+        if not self.adaptive:
+            # 不调整超时，仅挂载 trace 以记录阶段耗时
+            timer = RequestTimer()
+            trace = timer.atrace if is_async else timer.trace
+            return {"extensions": {"trace": trace}}, timer
+        policy = self.policies.get(endpoint)
+        if policy is None:
+            policy = AdaptiveTimeout(max_timeout=self.max_timeout, **self.policy_kwargs)
+            self.policies[endpoint] = policy
+        connect, read = policy.timeouts()
+        timer = RequestTimer(policy, connect, read)
+        options = {
+            "timeout": httpx.Timeout(read, connect=connect),
+            "extensions": {"trace": timer.atrace if is_async else timer.trace},
+        }
+        return options, timer
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {endpoint: p.snapshot() for endpoint, p in self.policies.items()}
 
 
 class ApiClient:
-    def __init__(self, base_url, timeout=10):
+    def __init__(self, base_url, timeout=10, transport=None, adaptive_timeout=True):
         self.base_url = base_url
-        self.timeout = timeout
+        self._timeout = timeout
+        self.timeouts = EndpointTimeouts(timeout, adaptive=adaptive_timeout)
 
         # 创建 httpx 客户端
         self.client = httpx.Client(
             timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
-            },
+            headers=DEFAULT_HEADERS,
+            transport=transport,
+            event_hooks={"request": [_on_request], "response": [_on_response]},
         )
 
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        """修改超时会同步到已创建的 httpx 客户端和自适应超时上限"""
+        self._timeout = value
+        self.client.timeout = httpx.Timeout(value)
+        self.timeouts.set_max_timeout(value)
+
     def _response_to_dict(self, response):
-        return AdDict(response.json())
+        return _to_addict(response.json())
 
-    def get(self, endpoint, params=None):
+    def _send(self, method, endpoint, **kwargs):
         url = f"{self.base_url}{endpoint}"
-        response = self.client.get(url, params=params)
+        options, timer = self.timeouts.start(endpoint)
+        try:
+            response = self.client.request(method, url, **kwargs, **options)
+        except httpx.TimeoutException as e:
+            timer.fail(e)
+            raise
+        timer.finish()
         response.raise_for_status()
+        return response
+
+    def get(self, endpoint, params=None):
+        response = self._send("GET", endpoint, params=params)
         return self._response_to_dict(response)
 
+    def get_bytes(self, endpoint, params=None) -> bytes:
+        """返回原始响应字节，交给调用方按需解码"""
+        return self._send("GET", endpoint, params=params).content
+
     def post(self, endpoint, data=None, json=None, headers=None):
-        url = f"{self.base_url}{endpoint}"
         # 合并额外的 headers
         request_headers = {}
         if headers:
             request_headers.update(headers)
 
-        response = self.client.post(url, data=data, json=json, headers=request_headers)
-        response.raise_for_status()
+        response = self._send(
+            "POST", endpoint, data=data, json=json, headers=request_headers
+        )
         return self._response_to_dict(response)
 
     def __del__(self):
@@ -45,15 +219,476 @@ class ApiClient:
             self.client.close()
 
 
+LATEST_PRICE_ENDPOINT = "/gw/generic/hj/h5/m/latestPrice"
+
+
 class JdjrApi:
-    def __init__(self, api_client: ApiClient):
+    def __init__(self, api_client: ApiClient, fast_decode: bool = True):
         self.api_client = api_client
+        self.fast_decode = fast_decode
 
     def get_latest_gold_price(self):
         """获取实时金价"""
-        resp = self.api_client.get("/gw/generic/hj/h5/m/latestPrice")
-        return resp.resultData.datas
+        if self.fast_decode:
+            # 快速路径：直接从响应字节解码 datas，不构造 AdDict
+            content = self.api_client.get_bytes(LATEST_PRICE_ENDPOINT)
+            with metrics.timer("decode"):
+                return decode_latest_price(content)
+        response = self.api_client._send("GET", LATEST_PRICE_ENDPOINT)
+        with metrics.timer("decode"):
+            return self.api_client._response_to_dict(response).resultData.datas
+
+
+class AsyncApiClient:
+    """异步 HTTP 客户端，需在同一个常驻事件循环中使用"""
+
+    def __init__(self, base_url, timeout=10, transport=None, adaptive_timeout=True):
+        self.base_url = base_url
+        self._timeout = timeout
+        self.timeouts = EndpointTimeouts(timeout, adaptive=adaptive_timeout)
+
+        # 创建 httpx 异步客户端（连接池绑定到首次使用它的事件循环）
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            headers=DEFAULT_HEADERS,
+            transport=transport,
+            event_hooks={
+                "request": [_on_request_async],
+                "response": [_on_response_async],
+            },
+        )
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        """修改超时会同步到已创建的 httpx 客户端和自适应超时上限"""
+        self._timeout = value
+        self.client.timeout = httpx.Timeout(value)
+        self.timeouts.set_max_timeout(value)
+
+    def _response_to_dict(self, response):
+        return _to_addict(response.json())
+
+    async def _send(self, method, endpoint, **kwargs):
+        url = f"{self.base_url}{endpoint}"
+        options, timer = self.timeouts.start(endpoint, is_async=True)
+        try:
+            response = await self.client.request(method, url, **kwargs, **options)
+        except httpx.TimeoutException as e:
+            timer.fail(e)
+            raise
+        timer.finish()
+        response.raise_for_status()
+        return response
+
+    async def get(self, endpoint, params=None):
+        response = await self._send("GET", endpoint, params=params)
+        return self._response_to_dict(response)
+
+    async def get_bytes(self, endpoint, params=None) -> bytes:
+        """返回原始响应字节，交给调用方按需解码"""
+        response = await self._send("GET", endpoint, params=params)
+        return response.content
+
+    async def post(self, endpoint, data=None, json=None, headers=None):
+        # 合并额外的 headers
+        request_headers = {}
+        if headers:
+            request_headers.update(headers)
+
+        response = await self._send(
+            "POST", endpoint, data=data, json=json, headers=request_headers
+        )
+        return self._response_to_dict(response)
+
+    async def aclose(self):
+        """关闭连接池"""
+        await self.client.aclose()
+
+
+class AsyncJdjrApi:
+    def __init__(self, api_client: AsyncApiClient, fast_decode: bool = True):
+        self.api_client = api_client
+        self.fast_decode = fast_decode
+
+    async def get_latest_gold_price(self):
+        """获取实时金价"""
+        if self.fast_decode:
+            # 快速路径：直接从响应字节解码 datas，不构造 AdDict
+            content = await self.api_client.get_bytes(LATEST_PRICE_ENDPOINT)
+            with metrics.timer("decode"):
+                return decode_latest_price(content)
+        response = await self.api_client._send("GET", LATEST_PRICE_ENDPOINT)
+        with metrics.timer("decode"):
+            return self.api_client._response_to_dict(response).resultData.datas
+
+
+class ProviderStats:
+    """单个数据源的请求统计"""
+
+    def __init__(self, window: int = 256):
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.cancelled = 0
+        self.latencies = deque(maxlen=window)  # 最近成功请求的耗时（秒）
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """最近样本的分位数，样本不足时返回 None"""
+        if len(self.latencies) < 5:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(q * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "wins": self.wins,
+            "cancelled": self.cancelled,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+        }
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，请求未发往上游"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"上游熔断中，{retry_after:.1f} 秒后重试")
+        self.retry_after = retry_after
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    上游请求熔断器
+
+    closed：正常放行，连续失败 failure_threshold 次后打开；
+    open：直接拒绝请求（抛出 CircuitOpenError），reset_timeout 秒后转为 half_open；
+    half_open：只放行一个探测请求，成功则关闭，失败则重新打开并将等待时间加倍（不超过上限）。
+
+    Args:
+        failure_threshold: 打开熔断所需的连续失败次数
+        reset_timeout: 打开后首次探测前的等待时间（秒）
+        max_reset_timeout: 连续探测失败时等待时间的上限（秒）
+        clock: 单调时钟，便于回放与测试时替换
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_timeout = max(float(reset_timeout), 0.0)
+        self.max_reset_timeout = max(float(max_reset_timeout), self.reset_timeout)
+        self.clock = clock
+        self._state = CLOSED
+        self._timeout = self.reset_timeout
+        self._opened_at = 0.0
+        self._probing = False
+        self.consecutive_failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态；打开时间已满的熔断器报告为 half_open"""
+        if self._state == OPEN and self.retry_after() <= 0:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """距离允许探测还需等待的秒数（非 open 状态为 0）"""
+        if self._state != OPEN:
+            return 0.0
+        return max(self._opened_at + self._timeout - self.clock(), 0.0)
+
+    def allow(self) -> bool:
+        """
+        请求前调用：是否放行本次请求
+
+        half_open 时只有第一个调用方获得探测资格，探测结束前其余请求仍被拒绝。
+        """
+        if self._state == CLOSED:
+            return True
+        if self._state == OPEN:
+            if self.retry_after() > 0:
+                self.rejected += 1
+                return False
+            self._state = HALF_OPEN
+        if self._probing:
+            self.rejected += 1
+            return False
+        self._probing = True
+        self.probes += 1
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._probing = False
+        self._timeout = self.reset_timeout
+        if self._state != CLOSED:
+            self._state = CLOSED
+            log.info("上游熔断已恢复")
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN:
+            # 探测失败：重新打开，等待时间加倍
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif (
+            self._state == CLOSED
+            and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def release(self):
+        """请求被取消、没有结论：归还探测资格，不改变状态"""
+        self._probing = False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+        self.opened += 1
+        log.warning(
+            "上游连续失败，熔断打开",
+            failures=self.consecutive_failures,
+            retry_after=round(self._timeout, 1),
+        )
+
+    def reset(self):
+        """手动恢复到 closed 状态"""
+        self._state = CLOSED
+        self._probing = False
+        self._timeout = self.reset_timeout
+        self.consecutive_failures = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after": round(self.retry_after(), 3),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "probes": self.probes,
+        }
+
+
+class PriceProvider(ABC):
+    """金价数据源接口：fetch 返回包含 price/yesterdayPrice 等字段的对象"""
+
+    name = "provider"
+
+    def __init__(self):
+        self.stats = ProviderStats()
+
+    @abstractmethod
+    async def fetch(self):
+        """请求一次最新金价"""
+
+    def is_valid(self, data) -> bool:
+        """校验返回数据是否可用"""
+        try:
+            return data is not None and float(data.price) > 0
+        except (AttributeError, TypeError, ValueError):
+            return False
+
+    async def aclose(self):
+        pass
+
+
+class JdjrProvider(PriceProvider):
+    """京东金融 latestPrice 接口数据源（可指向不同网关或本地桩服务）"""
+
+    def __init__(self, name: str, api: AsyncJdjrApi):
+        super().__init__()
+        self.name = name
+        self.api = api
+
+    async def fetch(self):
+        return await self.api.get_latest_gold_price()
+
+    async def aclose(self):
+        await self.api.api_client.aclose()
+
+
+class HedgedPriceFetcher:
+    """
+    对冲请求：先请求首选数据源，若超过其 p95 耗时仍未返回，
+    再向下一个数据源发出请求，采用最先返回的有效结果并取消其余请求。
+    某个请求失败时立即启用下一个数据源。
+
+    所有数据源共用一个熔断器：整次抓取（含对冲）失败才计为一次失败。
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[PriceProvider],
+        default_hedge_delay: float = 0.3,
+        min_hedge_delay: float = 0.05,
+        max_hedge_delay: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if not providers:
+            raise ValueError("至少需要一个金价数据源")
+        self.providers: List[PriceProvider] = list(providers)
+        self.breaker = breaker or CircuitBreaker()
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.hedges_sent = 0
+
+    def hedge_delay(self, provider: PriceProvider) -> float:
+        """根据数据源的 p95 耗时计算对冲延迟"""
+        p95 = provider.stats.percentile(0.95)
+        if p95 is None:
+            return self.default_hedge_delay
+        return min(max(p95, self.min_hedge_delay), self.max_hedge_delay)
+
+    def _ordered_providers(self) -> List[PriceProvider]:
+        """按 p50 耗时排序，没有样本的数据源保持配置顺序"""
+
+        def key(item):
+            index, provider = item
+            p50 = provider.stats.percentile(0.5)
+            return (p50 is None, p50 or 0.0, index)
+
+        return [p for _, p in sorted(enumerate(self.providers), key=key)]
+
+    async def _timed_fetch(self, provider: PriceProvider):
+        provider.stats.requests += 1
+        start = time.perf_counter()
+        try:
+            data = await provider.fetch()
+        except asyncio.CancelledError:
+            provider.stats.cancelled += 1
+            raise
+        except Exception:
+            provider.stats.errors += 1
+            raise
+        if not provider.is_valid(data):
+            provider.stats.errors += 1
+            raise ValueError(f"{provider.name} 返回无效数据")
+        provider.stats.record(time.perf_counter() - start)
+        return data
+
+    async def fetch(self, timeout: Optional[float] = None):
+        """
+        经熔断器获取最先返回的有效金价数据
+
+        Args:
+            timeout: 整次抓取的超时（秒），超时计为一次失败
+
+        Raises:
+            CircuitOpenError: 熔断打开，未发出请求
+        """
+        breaker = self.breaker
+        if not breaker.allow():
+            metrics.inc("circuit_rejections_total")
+            raise CircuitOpenError(breaker.retry_after())
+        try:
+            data = await asyncio.wait_for(self._fetch(), timeout=timeout)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return data
+
+    async def _fetch(self):
+        queue = self._ordered_providers()
+        pending: Dict[asyncio.Task, PriceProvider] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            provider = queue.pop(0)
+            task = asyncio.ensure_future(self._timed_fetch(provider))
+            pending[task] = provider
+            return provider
+
+        current = launch()
+        try:
+            while pending:
+                timeout = self.hedge_delay(current) if queue else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 超过对冲延迟仍无结果：向下一个数据源发出对冲请求
+                    self.hedges_sent += 1
+                    current = launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        provider.stats.wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                if queue:
+                    # 有请求失败，立即启用下一个数据源
+                    current = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise last_error or RuntimeError("所有金价数据源均失败")
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """各数据源的胜出次数与耗时统计"""
+        return {p.name: p.stats.snapshot() for p in self.providers}
+
+    async def aclose(self):
+        for provider in self.providers:
+            await provider.aclose()
+
+
+def create_price_fetcher(
+    base_urls: Sequence[str],
+    timeout: float = 10,
+    adaptive_timeout: bool = True,
+    fast_decode: bool = True,
+    **kwargs,
+) -> HedgedPriceFetcher:
+    """根据网关地址列表创建对冲抓取器（首个地址为首选数据源）"""
+    providers = []
+    for url in base_urls:
+        api_client = AsyncApiClient(
+            base_url=url, timeout=timeout, adaptive_timeout=adaptive_timeout
+        )
+        api = AsyncJdjrApi(api_client, fast_decode=fast_decode)
+        parsed = httpx.URL(url)
+        name = f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host or url
+        providers.append(JdjrProvider(name, api))
+    return HedgedPriceFetcher(providers, **kwargs)
+
+
+BASE_URL = "https://api.jdjygold.com/"
+
 
+def _to_addict(payload):
+    """旧版解码路径：usepy 仅在关闭 fast_decode 时才导入"""
+    from usepy.dict import AdDict
 
-api_client = ApiClient(base_url="https://api.jdjygold.com/")
-client = JdjrApi(api_client)
+    return AdDict(payload)
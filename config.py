@@ -1,10 +1,227 @@
 """
 状态栏应用配置文件
 管理应用的各种设置和错误处理配置
+
+配置按 默认值 < 配置文件（TOML/JSON）< 环境变量 < 运行时修改 合并，校验后发布为不可变快照。
+配置文件变化时由 ConfigWatcher 重新加载并整体替换快照，读取方不需要加锁。
 """
 
+import itertools
+import json
 import os
-from typing import Dict, Any
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Mapping
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from log import get_logger
+
+log = get_logger("config")
+
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python 3.10
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_DIR = "~/.gold-panel"
+
+# 修改后需要重新配置日志的项
+LOG_KEYS = frozenset(
+    {
+        "enable_logging",
+        "log_level",
+        "log_file_path",
+        "log_max_bytes",
+        "log_backup_count",
+    }
+)
+
+_TRUE_VALUES = ("true", "1", "yes", "on")
+_FALSE_VALUES = ("false", "0", "no", "off", "")
+
+
+def _default_config_path() -> str:
+    """已存在的 config.toml / config.json，都不存在时为 config.toml"""
+    directory = os.path.expanduser(CONFIG_DIR)
+    for name in ("config.toml", "config.json"):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return os.path.join(directory, "config.toml")
+
+
+def _freeze(value: Any) -> Any:
+    """列表转为元组、字典转为只读映射"""
+    if isinstance(value, dict):
+        return MappingProxyType({str(k): _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _coerce(key: str, value: Any, default: Any) -> Any:
+    """按默认值的类型转换配置值（环境变量为字符串，文件中为 JSON/TOML 类型）"""
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE_VALUES:
+            return True
+        if text in _FALSE_VALUES:
+            return False
+        raise ValueError(f"不是布尔值: {value!r}")
+    if isinstance(default, int):
+        if isinstance(value, bool):
+            raise TypeError("需要整数")
+        return int(value)
+    if isinstance(default, float):
+        if isinstance(value, bool):
+            raise TypeError("需要数值")
+        return float(value)
+    if isinstance(default, (list, tuple)):
+        if isinstance(value, str):
+            text = value.strip()
+            if text.startswith("["):
+                value = json.loads(text)
+            else:
+                value = [item.strip() for item in text.split(",") if item.strip()]
+        if not isinstance(value, (list, tuple)):
+            raise TypeError("需要列表")
+        return list(value)
+    if isinstance(default, (dict, Mapping)):
+        if isinstance(value, str):
+            value = json.loads(value)
+        if not isinstance(value, (dict, Mapping)):
+            raise TypeError("需要表/对象")
+        return dict(value)
+    if isinstance(default, str) and not isinstance(value, str):
+        raise TypeError("需要字符串")
+    return value
+
+
+def _validate(config: Dict[str, Any], problem: Callable[..., None]):
+    """跨字段校验，原地修正越界的值"""
+    low = max(int(config["min_update_interval"]), 1)
+    high = max(int(config["max_update_interval"]), low)
+    config["update_interval"] = min(max(int(config["update_interval"]), low), high)
+    for key, value in config.items():
+        if (
+            isinstance(value, (int, float))
+            and not isinstance(value, bool)
+            and value < 0
+        ):
+            problem("配置项不能为负数，使用默认值", key=key, value=value)
+            config[key] = AppConfig.DEFAULT_CONFIG[key]
+    if not 0 <= config["serve_port"] <= 65535:
+        config["serve_port"] = AppConfig.DEFAULT_CONFIG["serve_port"]
+    if not config["price_provider_urls"]:
+        config["price_provider_urls"] = list(
+            AppConfig.DEFAULT_CONFIG["price_provider_urls"]
+        )
+
+
+class ConfigSnapshot(Mapping):
+    """
+    不可变的配置快照
+
+    列表与字典在创建时冻结为元组与只读映射；每次重新加载都会生成新的快照对象，
+    已取出的快照永远不会变化。支持 snapshot["key"]、snapshot.get("key") 与 snapshot.key。
+    """
+
+    __slots__ = ("_data", "version", "source")
+
+    def __init__(self, data: Dict[str, Any], version: int = 0, source: str = ""):
+        object.__setattr__(self, "_data", {k: _freeze(v) for k, v in data.items()})
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "source", source)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot 是只读的")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default=None) -> Any:
+        return self._data.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可修改、可序列化的副本"""
+        return {k: _thaw(v) for k, v in self._data.items()}
+
+
+class ConfigWatcher:
+    """
+    配置文件监视器
+
+    后台线程按间隔比较文件的 (mtime, size)，变化时调用 config.reload()。
+    每次检查只有一次 stat 系统调用；文件不存在时同样可以检测到之后的创建。
+    """
+
+    def __init__(self, config: "AppConfig", interval: float = 2.0):
+        self.config = config
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.config.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def check(self) -> bool:
+        """检查一次，文件变化且配置有更新时返回 True"""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return self.config.reload()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                log.error("检查配置文件失败", error=e)
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="gold-config-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
 
 
 class AppConfig:
@@ -16,83 +233,282 @@ class AppConfig:
         "update_interval": 1,  # 默认1秒更新一次
         "min_update_interval": 1,  # 最小更新间隔
         "max_update_interval": 600,  # 最大更新间隔（10分钟）
+        "closed_update_interval": 300,  # 休市时的更新间隔（秒）
+        "max_requests_per_minute": 60,  # 每分钟请求上限（含重试退避）
+        "max_backoff_delay": 60,  # 错误退避的最大等待时间（秒）
+        # 交易日历（上海黄金交易所时段，夜盘跨越午夜）
+        "trading_timezone": "Asia/Shanghai",
+        "trading_sessions": ["09:00-11:30", "13:30-15:30", "20:00-02:30"],
+        "trading_weekdays": [0, 1, 2, 3, 4],
+        "trading_holidays": [],  # 休市日期，如 "2026-10-01"
+        # 配置文件检查间隔（秒），0 表示不自动重新加载
+        "config_watch_interval": 2.0,
         # 错误处理设置
-        "max_error_count": 3,  # 最大连续错误次数
-        "error_retry_delay": 5,  # 错误重试延迟（秒）
-        "network_timeout": 10,  # 网络请求超时时间
+        "max_error_count": 3,  # 连续失败多少次后熔断
+        "error_retry_delay": 5,  # 熔断打开后首次探测前的等待时间（秒）
+        "circuit_max_reset_timeout": 60.0,  # 探测连续失败时等待时间的上限（秒）
+        "network_timeout": 10,  # 网络请求超时时间（自适应超时的上限）
+        "adaptive_timeout": True,  # 是否按实测延迟 p99 自适应调整超时
+        "fast_decode": True,  # 直接从响应字节解码 tick（跳过 AdDict）
+        "fetch_retries": 1,  # 单次抓取失败后的重试次数
+        "fetch_retry_delay": 0.5,  # 抓取重试间隔（秒）
+        # 数据源网关（首个为首选，其余用于对冲请求）。默认只有已验证的接口；
+        # 对冲网关需提供相同的 latestPrice 接口，按需添加
+        "price_provider_urls": ["https://api.jdjygold.com/"],
+        "hedge_delay": 0.3,  # 无耗时样本时的对冲延迟（秒）
+        # 缓存设置（stale-while-revalidate）
+        "cache_ttl": 2.0,  # 缓存新鲜期（秒），期内读取不请求上游
+        "cache_stale_window": 60.0,  # 新鲜期后仍可返回旧值并后台刷新的时长（秒）
+        # 历史记录设置
+        "history_capacity": 86400,  # 内存中保留的 tick 数（1秒轮询约1天）
+        "rolling_windows": [60, 300, 3600],  # 滚动统计窗口（秒）
+        # 技术指标（周期均以 tick 数计，1秒轮询时约等于秒数）
+        "sma_periods": [20, 60],  # 简单移动平均周期
+        "ema_periods": [20],  # 指数移动平均周期
+        "bollinger_period": 20,  # 布林带周期（0 表示不计算）
+        "bollinger_k": 2.0,  # 布林带标准差倍数
+        "rsi_period": 14,  # RSI 周期（0 表示不计算）
+        # K 线周期（秒）与保留数量：1分钟 7天、5分钟 30天、1小时 1年、1天 10年
+        "candle_retention": {"60": 10080, "300": 8640, "3600": 8760, "86400": 3650},
+        "enable_tick_store": True,  # 是否持久化 tick 到磁盘
+        "tick_store_path": "~/.gold-panel/ticks.dat",  # tick 存储文件路径
+        "tick_store_flush_interval": 30,  # 后台刷盘间隔（秒）
+        # 本机多进程共享最新 tick（需显式开启）：选举一个主进程轮询上游，其余进程读共享内存
+        "shared_tick": False,
+        "shared_tick_name": "gold_panel_tick",  # 共享内存段名称
+        "leader_lock_path": "~/.gold-panel/leader.lock",  # 主进程选举锁文件
+        # 从进程可接受的共享 tick 最大年龄（秒），超过时本次直接请求上游；0 表示不限制
+        "shared_tick_max_age": 30.0,
+        # 守护进程设置（python -m service --serve）
+        "serve_host": "127.0.0.1",  # 监听地址
+        "serve_port": 8686,  # 监听端口
+        "subscriber_buffer": 32,  # 每个订阅者的缓冲 tick 数，写满即断开
         # 显示设置
         "show_notifications": True,  # 是否显示通知
         "show_price_change_alerts": True,  # 是否显示价格变化提醒
         "price_change_threshold": 0.5,  # 价格变化提醒阈值（百分比）
+        # 提醒规则，如 {"kind": "cross", "threshold": 780, "direction": "up"}，见 alerts.py
+        "alert_rules": [],
+        "max_alerts_per_tick": 3,  # 单个 tick 最多发出的提醒数
+        "alert_sigma_min_samples": 30,  # sigma 规则生效所需的最少窗口样本数
         # 界面设置
+        "show_sparkline": True,  # 状态栏显示日内迷你走势图，菜单显示大图
+        "chart_cache_dir": "~/.gold-panel/charts",  # 走势图 PNG 目录（每个图表一个文件）
         "menu_max_items": 10,  # 菜单最大项目数
         "title_max_length": 20,  # 标题最大长度
         # 日志设置
         "enable_logging": True,  # 是否启用日志
         "log_level": "INFO",  # 日志级别
-        "log_file_path": None,  # 日志文件路径（None表示不写文件）
+        "log_file_path": None,  # 日志文件路径（None表示输出到 stderr）
+        "log_max_bytes": 5 * 1024 * 1024,  # 单个日志文件大小上限，超过后轮转
+        "log_backup_count": 3,  # 保留的轮转日志文件数
     }
 
-    def __init__(self):
-        self.config = self.DEFAULT_CONFIG.copy()
+    # 环境变量与配置项的对应关系（环境变量优先于配置文件）
+    ENV_MAPPINGS = {
+        "GOLD_UPDATE_INTERVAL": "update_interval",
+        "GOLD_CLOSED_INTERVAL": "closed_update_interval",
+        "GOLD_MAX_RPM": "max_requests_per_minute",
+        "GOLD_MAX_ERRORS": "max_error_count",
+        "GOLD_RETRY_DELAY": "error_retry_delay",
+        "GOLD_TIMEOUT": "network_timeout",
+        "GOLD_ADAPTIVE_TIMEOUT": "adaptive_timeout",
+        "GOLD_FETCH_RETRIES": "fetch_retries",
+        "GOLD_CACHE_TTL": "cache_ttl",
+        "GOLD_CACHE_STALE": "cache_stale_window",
+        "GOLD_PROVIDER_URLS": "price_provider_urls",
+        "GOLD_HISTORY_CAPACITY": "history_capacity",
+        "GOLD_TICK_STORE": "enable_tick_store",
+        "GOLD_SHARED_TICK": "shared_tick",
+        "GOLD_TICK_STORE_PATH": "tick_store_path",
+        "GOLD_NOTIFICATIONS": "show_notifications",
+        "GOLD_SPARKLINE": "show_sparkline",
+        "GOLD_PRICE_ALERTS": "show_price_change_alerts",
+        "GOLD_ALERT_THRESHOLD": "price_change_threshold",
+        "GOLD_ALERT_RULES": "alert_rules",
+        "GOLD_LOGGING": "enable_logging",
+        "GOLD_LOG_LEVEL": "log_level",
+        "GOLD_LOG_FILE": "log_file_path",
+        "GOLD_SERVE_HOST": "serve_host",
+        "GOLD_SERVE_PORT": "serve_port",
+    }
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: 配置文件路径（.toml 或 .json），默认取 GOLD_CONFIG 或 ~/.gold-panel/config.toml
+        """
+        self.path = os.path.expanduser(path or os.getenv("GOLD_CONFIG") or "") or (
+            _default_config_path()
+        )
+        self._lock = threading.Lock()
+        self._snapshot = ConfigSnapshot(self.DEFAULT_CONFIG, 0, "defaults")
+        self._file_data: Dict[str, Any] = {}
+        self._overrides: Dict[str, Any] = {}
+        self._subscribers: List[
+            Callable[[ConfigSnapshot, ConfigSnapshot, set], None]
+        ] = []
+        self.reloads = 0
+        self.rejected = 0
+        # 加载过程中发现的问题；首次加载时日志模块可能尚未配置（其配置正来自这里），
+        # 先暂存，由 report_problems() 在配置可用后输出
+        self._problems: List[tuple] = []
+        self._ready = False
         self.load_config()
+        self._ready = True
 
-    def load_config(self):
-        """加载配置（可以从文件或环境变量加载）"""
-        # 从环境变量加载配置
-        env_mappings = {
-            "GOLD_UPDATE_INTERVAL": "update_interval",
-            "GOLD_MAX_ERRORS": "max_error_count",
-            "GOLD_RETRY_DELAY": "error_retry_delay",
-            "GOLD_TIMEOUT": "network_timeout",
-            "GOLD_NOTIFICATIONS": "show_notifications",
-            "GOLD_PRICE_ALERTS": "show_price_change_alerts",
-            "GOLD_ALERT_THRESHOLD": "price_change_threshold",
-            "GOLD_LOG_LEVEL": "log_level",
-        }
+    def _problem(self, event: str, **fields):
+        self._problems.append((event, fields))
+
+    def report_problems(self):
+        """输出暂存的加载问题"""
+        problems, self._problems = self._problems, []
+        for event, fields in problems:
+            log.warning(event, **fields)
+
+    @property
+    def config(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def snapshot(self) -> ConfigSnapshot:
+        """
+        当前配置快照（不可变）
 
-        for env_key, config_key in env_mappings.items():
+        热路径每个 tick 只取一次快照，之后的读取都在这个对象上进行，
+        不会读到重新加载过程中的中间状态。
+        """
+        return self._snapshot
+
+    def load_config(self) -> bool:
+        """
+        从配置文件与环境变量加载配置，校验后以新快照整体替换
+
+        Returns:
+            bool: 配置是否发生了变化
+        """
+        file_data = self._read_file()
+        if file_data is None:
+            # 文件存在但无法解析：保留当前快照
+            self.rejected += 1
+            if self._ready:
+                self.report_problems()
+            return False
+
+        env_data = {}
+        for env_key, config_key in self.ENV_MAPPINGS.items():
             env_value = os.getenv(env_key)
             if env_value is not None:
-                # 类型转换
-                if config_key in [
-                    "update_interval",
-                    "max_error_count",
-                    "error_retry_delay",
-                    "network_timeout",
-                    "menu_max_items",
-                    "title_max_length",
-                ]:
-                    try:
-                        self.config[config_key] = int(env_value)
-                    except ValueError:
-                        pass
-                elif config_key in ["price_change_threshold"]:
-                    try:
-                        self.config[config_key] = float(env_value)
-                    except ValueError:
-                        pass
-                elif config_key in [
-                    "show_notifications",
-                    "show_price_change_alerts",
-                    "enable_logging",
-                ]:
-                    self.config[config_key] = env_value.lower() in (
-                        "true",
-                        "1",
-                        "yes",
-                        "on",
+                env_data[config_key] = env_value
+
+        with self._lock:
+            # 文件中改动过的项以文件为准，覆盖此前在菜单中做的修改
+            for key in list(self._overrides):
+                if file_data.get(key) != self._file_data.get(key):
+                    del self._overrides[key]
+            self._file_data = file_data
+            published = self._publish(env_data, "file" if file_data else "env")
+        if self._ready:
+            self.report_problems()
+        return self._notify(published)
+
+    def reload(self) -> bool:
+        """重新读取配置文件（由 ConfigWatcher 在文件变化时调用）"""
+        changed = self.load_config()
+        if changed:
+            self.reloads += 1
+        return changed
+
+    def _read_file(self) -> Optional[Dict[str, Any]]:
+        """读取配置文件；文件不存在时返回空字典，解析失败时返回 None"""
+        path = self.path
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            self._problem("读取配置文件失败", path=path, error=e)
+            return None
+        try:
+            if path.endswith(".toml"):
+                if tomllib is None:
+                    self._problem(
+                        "读取 TOML 配置需要 Python 3.11+ 或安装 tomli", path=path
                     )
-                else:
-                    self.config[config_key] = env_value
+                    return None
+                data = tomllib.loads(content.decode("utf-8"))
+            else:
+                data = json.loads(content or b"{}")
+        except ValueError as e:
+            self._problem("配置文件格式错误，保留当前配置", path=path, error=e)
+            return None
+        if not isinstance(data, dict):
+            self._problem("配置文件顶层必须是表/对象", path=path)
+            return None
+        return data
+
+    def _publish(self, env_data: Dict[str, Any], source: str):
+        """按 默认值 < 配置文件 < 环境变量 < 运行时修改 合并、校验并发布（需持有锁）"""
+        merged = dict(self.DEFAULT_CONFIG)
+        for layer in (self._file_data, env_data, self._overrides):
+            for key, value in layer.items():
+                if key not in self.DEFAULT_CONFIG:
+                    self._problem("忽略未知配置项", key=key)
+                    continue
+                try:
+                    merged[key] = _coerce(key, value, self.DEFAULT_CONFIG[key])
+                except (TypeError, ValueError) as e:
+                    self._problem("忽略无效配置项", key=key, value=value, error=e)
+        _validate(merged, self._problem)
+
+        old = self._snapshot
+        new = ConfigSnapshot(merged, old.version + 1, source)
+        changed = {key for key in new if new[key] != old.get(key)}
+        if not changed and old.version:
+            return None
+        # 单次引用赋值即完成替换，读取方拿到的要么是旧快照，要么是新快照
+        self._snapshot = new
+        return old, new, changed
+
+    def _notify(self, published) -> bool:
+        """在锁外通知订阅者（回调中可以再次读取或修改配置）"""
+        if published is None:
+            return False
+        old, new, changed = published
+        if not old.version:
+            return True
+        log.info("配置已更新", version=new.version, changed=",".join(sorted(changed)))
+        for callback in list(self._subscribers):
+            try:
+                callback(old, new, changed)
+            except Exception as e:
+                log.error("配置变更回调失败", error=e)
+        return True
+
+    def subscribe(
+        self, callback: Callable[["ConfigSnapshot", "ConfigSnapshot", set], None]
+    ):
+        """注册配置变更回调 callback(old, new, changed_keys)，在发布新快照的线程中调用"""
+        with self._lock:
+            self._subscribers.append(callback)
 
     def get(self, key: str, default=None) -> Any:
-        """获取配置值"""
-        return self.config.get(key, default)
+        """获取配置值（读取当前快照；同一 tick 内多次读取请先取 snapshot()）"""
+        return self._snapshot.get(key, default)
 
     def set(self, key: str, value: Any):
-        """设置配置值"""
-        self.config[key] = value
+        """运行时修改配置值（如菜单中的更新间隔），发布新快照"""
+        with self._lock:
+            self._overrides[key] = value
+            env_data = {
+                config_key: os.environ[env_key]
+                for env_key, config_key in self.ENV_MAPPINGS.items()
+                if env_key in os.environ
+            }
+            published = self._publish(env_data, "runtime")
+            # 文件与环境变量中的问题已在加载时输出过
+            self._problems.clear()
+        self._notify(published)
 
     def get_update_intervals(self) -> Dict[str, int]:
         """获取可选的更新间隔"""
@@ -121,13 +537,28 @@ class AppConfig:
 
 
 class ErrorHandler:
-    """错误处理类"""
+    """
+    错误处理类
+
+    错误历史保存在定长环形缓冲区中，并按错误类型计数；上游是否健康由
+    client.CircuitBreaker 判断（attach_breaker 之后），这里的 error_count
+    只表示界面上自上次成功更新以来连续出现的错误次数。
+    """
+
+    HISTORY_SIZE = 100
 
     def __init__(self, config: AppConfig):
         self.config = config
         self.error_count = 0
+        self.total_errors = 0
         self.last_error_time = None
-        self.error_history = []
+        self.error_history: deque = deque(maxlen=self.HISTORY_SIZE)
+        self.error_types: Counter = Counter()
+        self.breaker = None
+
+    def attach_breaker(self, breaker):
+        """使用上游熔断器判断服务健康（服务加载完成后调用）"""
+        self.breaker = breaker
 
     def handle_error(self, error: Exception, context: str = "") -> bool:
         """
@@ -138,78 +569,94 @@ class ErrorHandler:
             context: 错误上下文
 
         Returns:
-            bool: 是否应该继续重试
+            bool: 服务是否仍然健康（熔断器未打开）
         """
-        import time
-        from datetime import datetime
-
         self.error_count += 1
+        self.total_errors += 1
         self.last_error_time = time.time()
-
-        # 记录错误历史
-        error_record = {
-            "time": datetime.now(),
-            "error": str(error),
-            "context": context,
-            "count": self.error_count,
-        }
-        self.error_history.append(error_record)
-
-        # 保持错误历史记录不超过100条
-        if len(self.error_history) > 100:
-            self.error_history = self.error_history[-100:]
-
-        # 打印错误信息
-        if self.config.get("enable_logging"):
-            print(f"[ERROR] {context}: {error} (错误次数: {self.error_count})")
-
-        # 判断是否超过最大错误次数
-        max_errors = self.config.get("max_error_count")
-        return self.error_count < max_errors
+        error_type = type(error).__name__
+        self.error_types[error_type] += 1
+
+        # 记录错误历史（环形缓冲区，超出容量时自动丢弃最旧的记录）
+        self.error_history.append(
+            {
+                "time": datetime.now(),
+                "error": str(error),
+                "type": error_type,
+                "context": context,
+                "count": self.error_count,
+            }
+        )
+
+        # 记录错误日志（级别与开关由日志模块按配置过滤）
+        log.error(
+            context or "错误",
+            error=error,
+            type=error_type,
+            count=self.error_count,
+        )
+
+        return self.is_service_healthy()
 
     def reset_error_count(self):
         """重置错误计数"""
         self.error_count = 0
         self.last_error_time = None
 
-    def get_retry_delay(self) -> int:
-        """获取重试延迟时间"""
-        base_delay = self.config.get("error_retry_delay")
-        # 根据错误次数增加延迟时间
-        return min(base_delay * (2 ** min(self.error_count - 1, 3)), 60)
+    def get_retry_delay(self) -> float:
+        """获取重试延迟时间：熔断打开时为距离下一次探测的时间"""
+        if self.breaker is not None and self.breaker.retry_after() > 0:
+            return self.breaker.retry_after()
+        return float(self.config.get("error_retry_delay") or 0)
 
     def is_service_healthy(self) -> bool:
         """检查服务是否健康"""
-        max_errors = self.config.get("max_error_count")
-        return self.error_count < max_errors
+        if self.breaker is not None:
+            return self.breaker.state == "closed"  # client.CLOSED，此处不导入 httpx
+        # 服务加载前没有熔断器，按连续错误次数判断
+        return self.error_count < self.config.get("max_error_count")
 
     def get_error_summary(self) -> str:
         """获取错误摘要"""
-        if not self.error_history:
+        if not self.total_errors:
             return "无错误记录"
 
-        recent_errors = self.error_history[-5:]  # 最近5个错误
-        summary = f"总错误次数: {len(self.error_history)}\n"
-        summary += f"当前连续错误: {self.error_count}\n\n"
-        summary += "最近错误:\n"
-
-        for i, error_record in enumerate(recent_errors, 1):
-            time_str = error_record["time"].strftime("%H:%M:%S")
-            summary += f"{i}. [{time_str}] {error_record['context']}: {error_record['error']}\n"
-
-        return summary
-
-
-# 创建全局配置实例
-app_config = AppConfig()
-error_handler = ErrorHandler(app_config)
+        lines = [
+            f"总错误次数: {self.total_errors}",
+            f"当前连续错误: {self.error_count}",
+        ]
+        if self.breaker is not None:
+            lines.append(f"上游熔断: {self.breaker.state}")
+        lines.append(
+            "错误类型: "
+            + "，".join(f"{name} {n}" for name, n in self.error_types.most_common(5))
+        )
+        lines.append("")
+        lines.append("最近错误:")
+        recent = list(itertools.islice(reversed(self.error_history), 5))
+        for i, record in enumerate(reversed(recent), 1):
+            time_str = record["time"].strftime("%H:%M:%S")
+            lines.append(f"{i}. [{time_str}] {record['context']}: {record['error']}")
+        return "\n".join(lines) + "\n"
+
+
+# 全局配置实例（首次获取时创建，导入本模块不读取环境变量）
+app_config: Optional[AppConfig] = None
+error_handler: Optional[ErrorHandler] = None
 
 
 def get_app_config() -> AppConfig:
     """获取应用配置实例"""
+    global app_config
+    if app_config is None:
+        app_config = AppConfig()
+        app_config.report_problems()
     return app_config
 
 
 def get_error_handler() -> ErrorHandler:
     """获取错误处理实例"""
+    global error_handler
+    if error_handler is None:
+        error_handler = ErrorHandler(get_app_config())
     return error_handler
@@ -0,0 +1,97 @@
+"""
+latestPrice 响应快速解码模块
+直接从响应字节中只解析 resultData.datas，得到带类型的 tick 对象，不经过 AdDict。
+优先使用 msgspec（按结构解码，跳过无关字段），其次 orjson，最后回退到标准库 json。
+"""
+
+import json
+from typing import Any, NamedTuple, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+Scalar = Union[str, int, float, None]
+
+
+class LatestPriceData(NamedTuple):
+    """latestPrice 接口的 datas 字段（属性名与上游保持一致）"""
+
+    price: Scalar = None
+    yesterdayPrice: Scalar = None
+    upAndDownRate: Scalar = None
+    upAndDownAmt: Scalar = None
+    time: Scalar = None
+    productSku: Scalar = None
+
+
+FIELDS = LatestPriceData._fields
+
+
+if msgspec is not None:
+
+    class _Datas(msgspec.Struct, gc=False):
+        price: Scalar  # 必需字段：缺失时与回退路径一样拒绝
+        yesterdayPrice: Scalar = None
+        upAndDownRate: Scalar = None
+        upAndDownAmt: Scalar = None
+        time: Scalar = None
+        productSku: Scalar = None
+
+    class _ResultData(msgspec.Struct, gc=False):
+        datas: Optional[_Datas] = None
+
+    class _Envelope(msgspec.Struct, gc=False):
+        resultData: Optional[_ResultData] = None
+
+    _decoder = msgspec.json.Decoder(_Envelope)
+
+    def _decode(content: bytes) -> Any:
+        result = _decoder.decode(content).resultData
+        return result.datas if result is not None else None
+
+    BACKEND = "msgspec"
+
+else:
+    _loads = orjson.loads if orjson is not None else json.loads
+
+    def _decode(content: bytes) -> Any:
+        payload = _loads(content)
+        datas = (payload.get("resultData") or {}).get("datas")
+        if not datas:
+            return None
+        return LatestPriceData(*[datas.get(field) for field in FIELDS])
+
+    BACKEND = "orjson" if orjson is not None else "json"
+
+
+def decode_latest_price(content: bytes):
+    """
+    解码 latestPrice 响应
+
+    Args:
+        content: 原始响应字节
+
+    Returns:
+        具有 price/yesterdayPrice/upAndDownRate/upAndDownAmt/time/productSku 属性的对象
+
+    Raises:
+        ValueError: 响应中没有 resultData.datas，或 datas 中没有价格
+    """
+    try:
+        datas = _decode(content)
+    except Exception as e:
+        raise ValueError(f"latestPrice 响应解码失败: {e}") from e
+    if datas is None:
+        raise ValueError("latestPrice 响应缺少 resultData.datas")
+    # 各解码后端对不完整 datas 的处理保持一致：没有价格的 tick 不可用
+    if datas.price is None:
+        raise ValueError("latestPrice 响应缺少 resultData.datas.price")
+    return datas
@@ -0,0 +1,96 @@
+"""
+主线程调度模块
+按 UI 目标分槽的合并调度器：新任务覆盖同槽位的待执行任务，只在有任务到达时唤醒主线程
+"""
+
+import itertools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class CoalescingDispatcher:
+    """
+    最新值优先的调度器
+
+    Args:
+        waker: 接收一个无参回调并将其安排到主线程执行的函数，
+               例如 PyObjCTools.AppHelper.callAfter
+        on_error: 任务抛出异常时在主线程调用的处理函数
+    """
+
+    def __init__(
+        self,
+        waker: Callable[[Callable[[], None]], Any],
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.waker = waker
+        self.on_error = on_error
+        self._slots: Dict[Hashable, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._wake_pending = False
+        self._seq = itertools.count()
+
+        # 统计
+        self.posted = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.wakeups = 0
+        self.idle_wakeups = 0
+        self.max_depth = 0
+
+    def post(self, fn: Callable[[], None], key: Optional[Hashable] = None):
+        """
+        投递任务
+
+        Args:
+            fn: 在主线程执行的函数
+            key: UI 目标槽位；同一槽位只保留最新的任务。为 None 时不参与合并
+        """
+        if key is None:
+            key = ("once", next(self._seq))
+        with self._lock:
+            self.posted += 1
+            if self._slots.pop(key, None) is not None:
+                self.coalesced += 1
+            self._slots[key] = fn
+            self.max_depth = max(self.max_depth, len(self._slots))
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        self.waker(self.drain)
+
+    def drain(self):
+        """在主线程执行所有待处理槽位（由 waker 调用）"""
+        with self._lock:
+            slots = self._slots
+            self._slots = {}
+            self._wake_pending = False
+            self.wakeups += 1
+            if not slots:
+                self.idle_wakeups += 1
+                return
+
+        for fn in slots.values():
+            self.executed += 1
+            try:
+                fn()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+
+    @property
+    def depth(self) -> int:
+        """当前待执行任务数"""
+        return len(self._slots)
+
+    def stats(self) -> Dict[str, int]:
+        """获取调度统计"""
+        return {
+            "posted": self.posted,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+            "wakeups": self.wakeups,
+            "idle_wakeups": self.idle_wakeups,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+        }
@@ -0,0 +1,102 @@
+"""
+异步抓取引擎模块
+在一个常驻后台线程中运行唯一的 asyncio 事件循环，所有抓取、重试和超时都作为该循环上的任务执行
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class FetchEngine:
+    """常驻事件循环引擎"""
+
+    def __init__(self, name: str = "gold-fetch-loop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run_loop(self):
+        """后台线程入口：创建并永久运行事件循环"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # 取消残留任务后关闭循环
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def start(self) -> "FetchEngine":
+        """启动事件循环线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop, name=self.name, daemon=True
+            )
+            self._thread.start()
+        self._ready.wait()
+        return self
+
+    def is_running(self) -> bool:
+        """事件循环是否在运行"""
+        return self.loop is not None and self.loop.is_running()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """
+        从任意线程提交协程到事件循环
+
+        Returns:
+            Future: 线程安全的结果对象，可通过 add_done_callback 获取结果
+        """
+        if not self.is_running():
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None):
+        """提交协程并阻塞等待结果"""
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, fn, *args):
+        """在事件循环线程中调度普通回调"""
+        if not self.is_running():
+            self.start()
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self, timeout: float = 2.0):
+        """停止事件循环并等待线程退出"""
+        loop = self.loop
+        if loop is None or not loop.is_running():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.loop = None
+
+
+# 创建全局引擎实例
+fetch_engine = FetchEngine()
+
+
+def get_fetch_engine() -> FetchEngine:
+    """
+    获取抓取引擎实例（首次调用时启动事件循环线程）
+
+    Returns:
+        FetchEngine: 抓取引擎实例
+    """
+    return fetch_engine.start()
@@ -14,16 +14,29 @@ a = Analysis(
     pathex=[project_root],
     binaries=[],
     datas=[],
+    # 以下模块在状态栏显示后才在函数内导入，显式列出以确保被打包
     hiddenimports=[
         'rumps',
         'httpx',
+        'alerts',
+        'sparkline',
+        'shm',
+        'engine',
+        'scheduler',
+        'service',
+        'client',
         'usepy',
         'setuptools',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # 状态栏应用用不到的重模块，避免打包与启动时解压
+    excludes=[
+        'tkinter',
+        'pydoc',
+        'benchmarks',
+    ],
     noarchive=False,
     optimize=0,
 )
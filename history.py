@@ -0,0 +1,218 @@
+"""
+金价历史记录模块
+定长环形缓冲区保存最近的 tick，并以增量方式维护滚动统计量
+"""
+
+import math
+import threading
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class RollingWindow:
+    """
+    基于时间窗口的滚动统计
+
+    最小值/最大值使用单调队列维护，均值/方差使用增量累加和，
+    每次 push 的均摊复杂度为 O(1)，不会重新扫描窗口。
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._values = deque()  # (t, x)
+        self._min = deque()  # (t, x)，x 单调递增
+        self._max = deque()  # (t, x)，x 单调递减
+        # 以首个值为偏移量累加，减小大数相减带来的精度损失
+        self._offset: Optional[float] = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def push(self, t: float, x: float):
+        """追加一个样本并淘汰窗口外的旧样本"""
+        if self._offset is None:
+            self._offset = x
+
+        d = x - self._offset
+        self._values.append((t, x))
+        self._sum += d
+        self._sumsq += d * d
+
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((t, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((t, x))
+
+        self._evict(t - self.seconds)
+
+    def expire(self, t: float):
+        """淘汰截至时刻 t 已在窗口外的样本（不追加样本）"""
+        self._evict(t - self.seconds)
+
+    def _evict(self, cutoff: float):
+        """淘汰时间早于 cutoff 的样本"""
+        values = self._values
+        while values and values[0][0] <= cutoff:
+            _, old = values.popleft()
+            d = old - self._offset
+            self._sum -= d
+            self._sumsq -= d * d
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+        if not values:
+            self._offset = None
+            self._sum = 0.0
+            self._sumsq = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        n = len(self._values)
+        if not n:
+            return None
+        return self._offset + self._sum / n
+
+    @property
+    def variance(self) -> Optional[float]:
+        """总体方差"""
+        n = len(self._values)
+        if not n:
+            return None
+        mean_d = self._sum / n
+        return max(self._sumsq / n - mean_d * mean_d, 0.0)
+
+    @property
+    def stddev(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """导出当前窗口统计量"""
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "variance": self.variance,
+        }
+
+
+class TickHistory:
+    """
+    定长 tick 历史
+
+    价格、上游时间、接收时间分别存放在预分配的 array('d') 列中，
+    写满后覆盖最旧的记录，内存占用恒定为 capacity * 24 字节。
+    """
+
+    def __init__(
+        self, capacity: int = 86400, windows: Iterable[float] = (60, 300, 3600)
+    ):
+        self.capacity = max(int(capacity), 1)
+        zeros = bytes(8 * self.capacity)
+        self.price = array("d", zeros)
+        self.upstream_time = array("d", zeros)
+        self.receive_time = array("d", zeros)
+        self._head = 0  # 下一个写入位置
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.windows: Dict[float, RollingWindow] = {
+            float(seconds): RollingWindow(float(seconds)) for seconds in windows
+        }
+
+        # 当日行情（按接收时间的本地日期切换）
+        self._session_date = None
+        self.session_open: Optional[float] = None
+        self.session_high: Optional[float] = None
+        self.session_low: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, upstream_time: float, receive_time: float):
+        """追加一个 tick，O(1)"""
+        with self._lock:
+            i = self._head
+            self.price[i] = price
+            self.upstream_time[i] = upstream_time
+            self.receive_time[i] = receive_time
+            self._head = (i + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+            for window in self.windows.values():
+                window.push(receive_time, price)
+
+            self._update_session(price, receive_time)
+
+    def _update_session(self, price: float, receive_time: float):
+        """维护当日开盘/最高/最低"""
+        date = datetime.fromtimestamp(receive_time).date()
+        if date != self._session_date:
+            self._session_date = date
+            self.session_open = price
+            self.session_high = price
+            self.session_low = price
+            return
+        if price > self.session_high:
+            self.session_high = price
+        if price < self.session_low:
+            self.session_low = price
+
+    def _index(self, offset: int) -> int:
+        """将按时间顺序的偏移量转换为缓冲区下标"""
+        return (self._head - self._size + offset) % self.capacity
+
+    def last(self) -> Optional[Tuple[float, float, float]]:
+        """最新的 (price, upstream_time, receive_time)"""
+        with self._lock:
+            if not self._size:
+                return None
+            i = (self._head - 1) % self.capacity
+            return self.price[i], self.upstream_time[i], self.receive_time[i]
+
+    def prices(self) -> List[float]:
+        """按时间顺序返回缓冲区内的价格"""
+        with self._lock:
+            return [self.price[self._index(k)] for k in range(self._size)]
+
+    def window(self, seconds: float) -> Optional[RollingWindow]:
+        """获取指定时长的滚动窗口"""
+        return self.windows.get(float(seconds))
+
+    def window_stats(self, seconds: float) -> Optional[Dict[str, Optional[float]]]:
+        """获取指定时长窗口的统计快照"""
+        window = self.window(seconds)
+        if window is None:
+            return None
+        with self._lock:
+            return window.snapshot()
+
+    def session_stats(self) -> Optional[Dict[str, float]]:
+        """当日开盘、最高、最低与振幅"""
+        with self._lock:
+            if self.session_high is None:
+                return None
+            return {
+                "open": self.session_open,
+                "high": self.session_high,
+                "low": self.session_low,
+                "range": self.session_high - self.session_low,
+            }
@@ -0,0 +1,420 @@
+"""
+技术指标模块
+SMA / EMA / 布林带 / RSI 的增量计算：每个 tick 调用一次 update，复杂度 O(1)，不重新扫描历史。
+启动时从历史价格重建状态走批量路径：安装了 NumPy 时向量化计算，否则逐个 update。
+批量函数的结果与逐个 update 得到的序列一致（见 tests/test_indicators.py）。
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class SMA:
+    """简单移动平均（最近 period 个价格）"""
+
+    def __init__(self, period: int):
+        self.period = max(int(period), 1)
+        self._values = deque()
+        self._sum = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        values = self._values
+        values.append(x)
+        self._sum += x
+        if len(values) > self.period:
+            self._sum -= values.popleft()
+        if len(values) == self.period:
+            self.value = self._sum / self.period
+        return self.value
+
+    def restore(self, prices: Sequence[float]):
+        """用历史价格的末尾重建状态"""
+        self._values = deque(prices[-self.period :])
+        self._sum = math.fsum(self._values)
+        self.value = (
+            self._sum / self.period if len(self._values) == self.period else None
+        )
+
+
+class EMA:
+    """
+    指数移动平均
+
+    平滑系数 alpha 默认为 2 / (period + 1)；前 period 个价格的简单平均作为初值。
+    """
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        self.period = max(int(period), 1)
+        self.alpha = alpha if alpha is not None else 2.0 / (self.period + 1)
+        self._count = 0
+        self._seed = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (x - self.value)
+            return self.value
+        self._count += 1
+        self._seed += x
+        if self._count == self.period:
+            self.value = self._seed / self.period
+        return self.value
+
+    def restore(self, value: Optional[float], count: int, seed: float = 0.0):
+        self.value = value
+        self._count = min(count, self.period)
+        self._seed = seed
+
+
+class Bollinger:
+    """
+    布林带：period 个价格的均值 ± k 倍总体标准差
+
+    以首个价格为偏移量累加平方和，避免价格较大时相减造成的精度损失。
+    """
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = max(int(period), 1)
+        self.k = k
+        self._values = deque()
+        self._offset: Optional[float] = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self.value: Optional[Tuple[float, float, float]] = None
+
+    def update(self, x: float) -> Optional[Tuple[float, float, float]]:
+        """返回 (中轨, 上轨, 下轨)"""
+        if self._offset is None:
+            self._offset = x
+        d = x - self._offset
+        values = self._values
+        values.append(d)
+        self._sum += d
+        self._sumsq += d * d
+        if len(values) > self.period:
+            old = values.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+        if len(values) == self.period:
+            mean = self._sum / self.period
+            width = self.k * math.sqrt(
+                max(self._sumsq / self.period - mean * mean, 0.0)
+            )
+            middle = mean + self._offset
+            self.value = (middle, middle + width, middle - width)
+        return self.value
+
+    def restore(self, prices: Sequence[float]):
+        tail = list(prices[-self.period :])
+        self._offset = tail[0] if tail else None
+        self._values = deque(x - self._offset for x in tail)
+        self._sum = math.fsum(self._values)
+        self._sumsq = math.fsum(d * d for d in self._values)
+        self.value = None
+        if len(tail) == self.period:
+            mean = self._sum / self.period
+            width = self.k * math.sqrt(
+                max(self._sumsq / self.period - mean * mean, 0.0)
+            )
+            middle = mean + self._offset
+            self.value = (middle, middle + width, middle - width)
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 50.0 if avg_gain == 0 else 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class RSI:
+    """
+    相对强弱指数（Wilder 平滑）
+
+    前 period 个涨跌的简单平均作为初值，之后按 alpha = 1 / period 指数平滑。
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = max(int(period), 1)
+        self._last: Optional[float] = None
+        self._count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        last = self._last
+        self._last = x
+        if last is None:
+            return None
+        change = x - last
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self._count < self.period:
+            self._count += 1
+            self.avg_gain += gain
+            self.avg_loss += loss
+            if self._count < self.period:
+                return None
+            self.avg_gain /= self.period
+            self.avg_loss /= self.period
+        else:
+            n = self.period
+            self.avg_gain += (gain - self.avg_gain) / n
+            self.avg_loss += (loss - self.avg_loss) / n
+        self.value = _rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def restore(self, last: float, avg_gain: float, avg_loss: float):
+        """用批量计算得到的平滑均值恢复为已就绪状态"""
+        self._last = last
+        self._count = self.period
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self.value = _rsi(avg_gain, avg_loss)
+
+
+# ---------------------------------------------------------------------------
+# NumPy 批量路径：输入为价格序列，输出与逐个 update 对齐的数组（未就绪处为 NaN）
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("批量指标计算需要安装 numpy")
+
+
+def sma_batch(prices, period: int):
+    _require_numpy()
+    x = np.asarray(prices, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        csum = np.cumsum(np.concatenate(([0.0], x)))
+        out[period - 1 :] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def _ewm(x, alpha: float, initial: float):
+    """
+    y[i] = y[i-1] + alpha * (x[i] - y[i-1])，y[-1] = initial 的向量化递推
+
+    展开为 y[j] = d^(j+1) * initial + alpha * d^j * cumsum(x[k] * d^-k)，d = 1 - alpha。
+    d^-k 随 k 指数增长，按块计算并保证块内 d^-k 不超过 1e12，以控制舍入误差。
+    """
+    out = np.empty(len(x))
+    d = 1.0 - alpha
+    if d <= 0:
+        out[:] = x
+        return out
+    block = max(int(12 * math.log(10) / -math.log(d)), 1) if d < 1 else len(x)
+    prev = initial
+    for start in range(0, len(x), block):
+        chunk = x[start : start + block]
+        k = np.arange(len(chunk))
+        powers = d**k
+        y = d * powers * prev + alpha * powers * np.cumsum(chunk / powers)
+        out[start : start + len(chunk)] = y
+        prev = y[-1]
+    return out
+
+
+def ema_batch(prices, period: int, alpha: Optional[float] = None):
+    _require_numpy()
+    x = np.asarray(prices, dtype=float)
+    alpha = alpha if alpha is not None else 2.0 / (period + 1)
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        seed = x[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _ewm(x[period:], alpha, seed)
+    return out
+
+
+def bollinger_batch(prices, period: int = 20, k: float = 2.0):
+    """返回 (中轨, 上轨, 下轨) 三个数组"""
+    _require_numpy()
+    x = np.asarray(prices, dtype=float)
+    middle = np.full(len(x), np.nan)
+    upper = middle.copy()
+    lower = middle.copy()
+    if len(x) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(x, period)
+        mean = windows.mean(axis=1)
+        width = k * windows.std(axis=1)
+        middle[period - 1 :] = mean
+        upper[period - 1 :] = mean + width
+        lower[period - 1 :] = mean - width
+    return middle, upper, lower
+
+
+def _rsi_state(prices, period: int):
+    """返回 (RSI 数组, 最终平均涨幅, 最终平均跌幅)"""
+    x = np.asarray(prices, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) <= period:
+        return out, None, None
+    change = np.diff(x)
+    gain = np.where(change > 0, change, 0.0)
+    loss = np.where(change < 0, -change, 0.0)
+    alpha = 1.0 / period
+    avg_gain = np.empty(len(change) - period + 1)
+    avg_loss = np.empty_like(avg_gain)
+    avg_gain[0] = gain[:period].mean()
+    avg_loss[0] = loss[:period].mean()
+    avg_gain[1:] = _ewm(gain[period:], alpha, avg_gain[0])
+    avg_loss[1:] = _ewm(loss[period:], alpha, avg_loss[0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    out[period:] = rsi
+    return out, float(avg_gain[-1]), float(avg_loss[-1])
+
+
+def rsi_batch(prices, period: int = 14):
+    _require_numpy()
+    return _rsi_state(prices, period)[0]
+
+
+class IndicatorSet:
+    """
+    一组按配置创建的指标，随 tick 增量更新
+
+    Args:
+        sma_periods: SMA 周期列表（tick 数）
+        ema_periods: EMA 周期列表
+        bollinger_period: 布林带周期，0 表示不计算
+        bollinger_k: 布林带标准差倍数
+        rsi_period: RSI 周期，0 表示不计算
+    """
+
+    def __init__(
+        self,
+        sma_periods: Iterable[int] = (20,),
+        ema_periods: Iterable[int] = (20,),
+        bollinger_period: int = 20,
+        bollinger_k: float = 2.0,
+        rsi_period: int = 14,
+    ):
+        self.sma_periods = sorted({int(p) for p in sma_periods if int(p) > 0})
+        self.ema_periods = sorted({int(p) for p in ema_periods if int(p) > 0})
+        self.bollinger_period = int(bollinger_period)
+        self.bollinger_k = bollinger_k
+        self.rsi_period = int(rsi_period)
+        self._lock = threading.Lock()
+        self._create()
+
+    def _create(self):
+        self.sma: Dict[int, SMA] = {p: SMA(p) for p in self.sma_periods}
+        self.ema: Dict[int, EMA] = {p: EMA(p) for p in self.ema_periods}
+        self.bollinger = (
+            Bollinger(self.bollinger_period, self.bollinger_k)
+            if self.bollinger_period > 0
+            else None
+        )
+        self.rsi = RSI(self.rsi_period) if self.rsi_period > 0 else None
+
+    def _all(self) -> List:
+        items = list(self.sma.values()) + list(self.ema.values())
+        if self.bollinger is not None:
+            items.append(self.bollinger)
+        if self.rsi is not None:
+            items.append(self.rsi)
+        return items
+
+    def update(self, price: float):
+        """追加一个价格，O(指标数)"""
+        with self._lock:
+            for indicator in self._all():
+                indicator.update(price)
+
+    def rebuild(self, prices: Sequence[float]):
+        """
+        从历史价格重建全部指标状态
+
+        安装了 NumPy 时 EMA/RSI 的递推走向量化批量计算，SMA/布林带只需历史末尾；
+        否则逐个 update 回放。
+        """
+        with self._lock:
+            self._create()
+            if not HAS_NUMPY:
+                indicators = self._all()
+                for price in prices:
+                    for indicator in indicators:
+                        indicator.update(price)
+                return
+
+            x = np.asarray(prices, dtype=float)
+            longest = max([i.period for i in self._all()] + [1])
+            tail = x[-longest:].tolist()
+            for sma in self.sma.values():
+                sma.restore(tail)
+            for period, ema in self.ema.items():
+                if len(x) >= period:
+                    ema.restore(float(ema_batch(x, period, ema.alpha)[-1]), len(x))
+                else:
+                    ema.restore(None, len(x), float(x.sum()))
+            if self.bollinger is not None:
+                self.bollinger.restore(tail)
+            rsi = self.rsi
+            if rsi is not None:
+                if len(x) > rsi.period:
+                    _, avg_gain, avg_loss = _rsi_state(x, rsi.period)
+                    rsi.restore(float(x[-1]), avg_gain, avg_loss)
+                else:
+                    for price in tail[-rsi.period - 1 :]:
+                        rsi.update(price)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """当前指标值，如 {"sma20": ..., "ema20": ..., "boll_upper": ..., "rsi14": ...}"""
+        with self._lock:
+            result: Dict[str, Optional[float]] = {}
+            for period, sma in self.sma.items():
+                result[f"sma{period}"] = sma.value
+            for period, ema in self.ema.items():
+                result[f"ema{period}"] = ema.value
+            if self.bollinger is not None:
+                band = self.bollinger.value
+                result["boll_middle"] = band[0] if band else None
+                result["boll_upper"] = band[1] if band else None
+                result["boll_lower"] = band[2] if band else None
+            if self.rsi is not None:
+                result[f"rsi{self.rsi.period}"] = self.rsi.value
+            return result
+
+    def format_lines(self) -> List[str]:
+        """详情菜单中的指标行（未就绪的指标不显示）"""
+        snapshot = self.snapshot()
+        averages = [
+            f"{name.upper()} ¥{value:.2f}"
+            for name, value in snapshot.items()
+            if name.startswith(("sma", "ema")) and value is not None
+        ]
+        lines = []
+        if averages:
+            lines.append("均线: " + " / ".join(averages))
+        if snapshot.get("boll_upper") is not None:
+            lines.append(
+                f"布林带: ¥{snapshot['boll_lower']:.2f} ~ ¥{snapshot['boll_upper']:.2f}"
+            )
+        if self.rsi is not None and self.rsi.value is not None:
+            lines.append(f"RSI({self.rsi.period}): {self.rsi.value:.1f}")
+        return lines
+
+
+def create_indicator_set(config) -> IndicatorSet:
+    """根据配置创建指标集合"""
+    return IndicatorSet(
+        sma_periods=config.get("sma_periods") or (),
+        ema_periods=config.get("ema_periods") or (),
+        bollinger_period=int(config.get("bollinger_period") or 0),
+        bollinger_k=float(config.get("bollinger_k") or 2.0),
+        rsi_period=int(config.get("rsi_period") or 0),
+    )
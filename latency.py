@@ -0,0 +1,128 @@
+"""
+延迟统计模块
+固定对数分桶的流式延迟直方图，以及据此推导的自适应超时
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+def log_buckets(min_value: float, max_value: float, growth: float) -> List[float]:
+    """生成按比例递增的桶上界"""
+    bounds = []
+    value = min_value
+    while value < max_value:
+        bounds.append(value)
+        value *= growth
+    bounds.append(max_value)
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    流式延迟直方图
+
+    样本落入固定的对数分桶，记录为 O(log 桶数)。为了跟上上游状况的变化，
+    直方图分为当前和上一代两半，每 rotate_every 个样本轮换一次，
+    分位数基于两代样本之和计算，旧样本在两次轮换后自然淘汰。
+    """
+
+    def __init__(
+        self,
+        min_value: float = 0.001,
+        max_value: float = 60.0,
+        growth: float = 1.15,
+        rotate_every: int = 512,
+    ):
+        self.bounds = log_buckets(min_value, max_value, growth)
+        self.rotate_every = rotate_every
+        self._current = [0] * (len(self.bounds) + 1)
+        self._previous = [0] * (len(self.bounds) + 1)
+        self._current_count = 0
+        self._previous_count = 0
+        self._lock = threading.Lock()
+
+    def record(self, value: float):
+        """记录一个样本（秒）"""
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._current[index] += 1
+            self._current_count += 1
+            if self._current_count >= self.rotate_every:
+                self._previous = self._current
+                self._previous_count = self._current_count
+                self._current = [0] * (len(self.bounds) + 1)
+                self._current_count = 0
+
+    @property
+    def count(self) -> int:
+        return self._current_count + self._previous_count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """返回分位数所在桶的上界，无样本时返回 None"""
+        with self._lock:
+            total = self._current_count + self._previous_count
+            if not total:
+                return None
+            rank = max(math.ceil(q * total), 1)
+            seen = 0
+            for index, (a, b) in enumerate(zip(self._current, self._previous)):
+                seen += a + b
+                if seen >= rank:
+                    if index < len(self.bounds):
+                        return self.bounds[index]
+                    return self.bounds[-1]
+        return self.bounds[-1]
+
+
+class AdaptiveTimeout:
+    """
+    单个端点的自适应超时
+
+    分别统计建连耗时和首字节等待耗时，超时取 p99 * multiplier + margin，
+    并限制在 [min, max_timeout] 区间。样本不足时使用 max_timeout。
+    """
+
+    def __init__(
+        self,
+        max_timeout: float = 10.0,
+        min_connect: float = 0.5,
+        min_read: float = 1.0,
+        margin: float = 0.5,
+        multiplier: float = 1.5,
+        min_samples: int = 20,
+    ):
+        self.max_timeout = max_timeout
+        self.min_connect = min_connect
+        self.min_read = min_read
+        self.margin = margin
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.connect = LatencyHistogram()
+        self.read = LatencyHistogram()
+
+    def _derive(self, histogram: LatencyHistogram, floor: float) -> float:
+        if histogram.count < self.min_samples:
+            return self.max_timeout
+        p99 = histogram.quantile(0.99)
+        value = p99 * self.multiplier + self.margin
+        return min(max(value, floor), self.max_timeout)
+
+    def timeouts(self) -> Tuple[float, float]:
+        """当前的 (connect, read) 超时（秒）"""
+        return (
+            self._derive(self.connect, self.min_connect),
+            self._derive(self.read, self.min_read),
+        )
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        connect, read = self.timeouts()
+        return {
+            "connect_timeout": connect,
+            "read_timeout": read,
+            "connect_p99": self.connect.quantile(0.99),
+            "read_p99": self.read.quantile(0.99),
+            "samples": self.read.count,
+        }
@@ -0,0 +1,236 @@
+"""
+日志模块
+非阻塞的结构化日志：调用方只做级别比较与一次入队，格式化和写入都在后台线程完成。
+遵循 enable_logging / log_level / log_file_path 配置，日志文件按大小轮转。
+标准库 logging 只在 configure() 时导入，不计入启动时的导入耗时。
+
+用法:
+    log = get_logger("service")
+    log.info("获取金价成功", price=tick.price_text(), latency_ms=12.5)
+    # 2026-10-17 09:30:00.123 INFO  gold.service 获取金价成功 price=768.52 latency_ms=12.5
+"""
+
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# 与标准库 logging 的级别数值一致
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+CRITICAL = 50
+
+LEVELS = {
+    "DEBUG": DEBUG,
+    "INFO": INFO,
+    "WARNING": WARNING,
+    "WARN": WARNING,
+    "ERROR": ERROR,
+    "CRITICAL": CRITICAL,
+}
+
+# 关闭日志时使用的级别：任何记录都低于它
+_DISABLED = CRITICAL + 1
+
+_STOP = object()
+_SWAP = object()
+
+
+def _format_value(value: Any) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' ="\n'):
+        return (
+            '"'
+            + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            + '"'
+        )
+    return text
+
+
+class StructuredFormatter:
+    """时间 级别 模块 事件 key=value...（满足 logging.Handler 对 formatter 的接口要求）"""
+
+    def format(self, record) -> str:
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+        line = (
+            f"{created}.{int(record.msecs):03d} {record.levelname:<5} "
+            f"{record.name} {record.msg}"
+        )
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(
+                f"{key}={_format_value(value)}" for key, value in fields.items()
+            )
+        return line
+
+
+class LogManager:
+    """
+    日志队列与后台写入线程
+
+    后台线程在第一条达到级别的日志入队时才启动，导入本模块不会创建线程或打开文件。
+    handlers 只由后台线程修改，configure() 通过队列中的切换标记替换输出目标。
+    """
+
+    def __init__(self):
+        self.level = INFO
+        self.handlers: List[Any] = []
+        self.dropped = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._configured = False
+        self._lock = threading.Lock()
+
+    def configure(self, config=None):
+        """
+        按配置设置级别与输出目标（可重复调用以应用新配置）
+
+        Args:
+            config: AppConfig，为 None 时使用全局配置
+        """
+        if config is None:
+            from config import get_app_config
+
+            config = get_app_config()
+
+        import logging
+        import logging.handlers
+
+        if not config.get("enable_logging"):
+            level = _DISABLED
+        else:
+            level = LEVELS.get(str(config.get("log_level") or "INFO").upper(), INFO)
+
+        path = config.get("log_file_path")
+        if path:
+            path = os.path.expanduser(path)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                path,
+                maxBytes=int(config.get("log_max_bytes") or 0),
+                backupCount=int(config.get("log_backup_count") or 0),
+                encoding="utf-8",
+                delay=True,
+            )
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(StructuredFormatter())
+
+        # 输出目标由后台线程按队列顺序切换：此前入队的记录仍写入旧目标，之后的写入新目标
+        self._queue.put((_SWAP, [handler]))
+        with self._lock:
+            self.level = level
+            self._configured = True
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="gold-log-writer", daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def emit(self, level: int, name: str, event: str, fields: Dict[str, Any]):
+        """入队一条日志（调用方线程只做这一步）"""
+        if self._thread is None:
+            if not self._configured:
+                self.configure()
+                if level < self.level:
+                    return
+            self._start()
+        self._queue.put((time.time(), level, name, event, fields))
+
+    def _run(self):
+        import logging
+
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            if item[0] is _SWAP:
+                old_handlers, self.handlers = self.handlers, item[1]
+                for old in old_handlers:
+                    old.close()
+                continue
+            created, level, name, event, fields = item
+            record = logging.LogRecord(name, level, "", 0, event, None, None)
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            record.fields = fields
+            for handler in self.handlers:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    self.dropped += 1
+
+    def stop(self, timeout: float = 2.0):
+        """写完队列中剩余的日志后停止后台线程"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+        for handler in self.handlers:
+            handler.close()
+
+
+class StructuredLogger:
+    """模块级日志对象；级别不足时直接返回，不构造任何字符串"""
+
+    __slots__ = ("name", "manager")
+
+    def __init__(self, name: str, manager: LogManager):
+        self.name = name
+        self.manager = manager
+
+    def is_enabled(self, level: int) -> bool:
+        return level >= self.manager.level
+
+    def log(self, level: int, event: str, **fields):
+        if level >= self.manager.level:
+            self.manager.emit(level, self.name, event, fields)
+
+    def debug(self, event: str, **fields):
+        if DEBUG >= self.manager.level:
+            self.manager.emit(DEBUG, self.name, event, fields)
+
+    def info(self, event: str, **fields):
+        if INFO >= self.manager.level:
+            self.manager.emit(INFO, self.name, event, fields)
+
+    def warning(self, event: str, **fields):
+        if WARNING >= self.manager.level:
+            self.manager.emit(WARNING, self.name, event, fields)
+
+    def error(self, event: str, **fields):
+        if ERROR >= self.manager.level:
+            self.manager.emit(ERROR, self.name, event, fields)
+
+
+# 全局日志管理器
+log_manager = LogManager()
+
+
+def get_log_manager() -> LogManager:
+    """获取全局日志管理器"""
+    return log_manager
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """
+    获取模块日志对象
+
+    Args:
+        name: 模块名，输出为 gold.<name>
+    """
+    return StructuredLogger(f"gold.{name}", log_manager)
@@ -2,16 +2,67 @@
 """
 macOS 状态栏金价监控应用
 使用 rumps 库实现状态栏显示和交互功能
+
+启动时只导入绘制状态栏所需的轻量模块，先用上次持久化的 tick 绘制标题；
+httpx、抓取引擎和金价服务在状态栏显示后再加载。
 """
 
+import os
 import rumps
-import threading
-import time
-import queue
-from typing import Dict, Any
-
-from service import get_gold_price_service
-from config import get_app_config, get_error_handler
+from typing import Hashable, Optional
+
+from PyObjCTools import AppHelper
+
+from dispatcher import CoalescingDispatcher
+from log import get_log_manager, get_logger
+from metrics import get_metrics
+from pipeline import process_tick
+from config import LOG_KEYS, ConfigWatcher, get_app_config, get_error_handler
+from store import read_last_record
+from tick import PriceTick
+
+
+log = get_logger("main")
+
+# 金价 tick 结果（成功渲染或错误）共用的 UI 槽位
+TICK_SLOT = "tick"
+
+# 配置变更时需要重新应用的项
+ALERT_KEYS = frozenset(
+    {
+        "alert_rules",
+        "show_price_change_alerts",
+        "price_change_threshold",
+        "max_alerts_per_tick",
+        "alert_sigma_min_samples",
+    }
+)
+# 创建服务/调度器时读取、运行中不再变化的项
+RESTART_KEYS = frozenset(
+    {
+        "closed_update_interval",
+        "max_requests_per_minute",
+        "trading_timezone",
+        "trading_sessions",
+        "trading_weekdays",
+        "trading_holidays",
+        "price_provider_urls",
+        "history_capacity",
+        "rolling_windows",
+        "candle_retention",
+        "enable_tick_store",
+        "tick_store_path",
+        "show_sparkline",
+        "max_error_count",
+        "error_retry_delay",
+        "circuit_max_reset_timeout",
+        "shared_tick",
+        "shared_tick_name",
+        "leader_lock_path",
+        "shared_tick_max_age",
+    }
+)
+CHART_SLOT = "chart"
 
 
 class GoldPriceStatusBarApp(rumps.App):
@@ -24,13 +75,18 @@ class GoldPriceStatusBarApp(rumps.App):
             quit_button="退出",
         )
 
-        # 初始化配置和服务
+        # 初始化配置；金价服务、抓取引擎与调度器在状态栏显示后加载
         self.config = get_app_config()
         self.error_handler = get_error_handler()
-        self.gold_service = get_gold_price_service()
-
-        self.current_price_info = None
-        self.last_price = None  # 用于价格变化检测
+        self.metrics = get_metrics()
+        self.gold_service = None
+        self.fetch_engine = None
+        self.scheduler = None
+        self.alert_engine = None
+        self.charts = None
+        self.config_watcher = None
+
+        self.current_tick = None
         self.update_interval = self.config.get("update_interval")
         self.is_running = True
 
@@ -38,19 +94,99 @@ class GoldPriceStatusBarApp(rumps.App):
         self.refreshing = False
         self.refresh_watchdog = None
 
-        # 主线程 UI 任务队列与定时处理
-        self.ui_queue = queue.Queue()
-        self.ui_timer = rumps.Timer(self._drain_ui_queue, 0.05)
-        self.ui_timer.start()
+        # 主线程 UI 调度器：有任务时才唤醒主线程，同一 UI 目标只渲染最新的任务
+        self.ui_dispatcher = CoalescingDispatcher(
+            AppHelper.callAfter, on_error=self.handle_update_error
+        )
 
         # 创建菜单项
         self.setup_menu()
 
-        # 启动后台更新线程
-        self.start_background_update()
+        # 先用上次持久化的 tick 绘制标题
+        self.paint_cached_tick()
+
+        # 事件循环运行（状态栏已显示）后再加载服务并开始更新
+        AppHelper.callAfter(self.start_services)
 
-        # 立即获取一次金价
-        self.update_gold_price()
+    def paint_cached_tick(self):
+        """用 tick 存储中的最后一条记录绘制标题，不打开存储、不加载网络模块"""
+        if not self.config.get("enable_tick_store"):
+            return
+        path = self.config.get("tick_store_path")
+        if not path:
+            return
+        record = read_last_record(os.path.expanduser(path))
+        if record is None:
+            return
+        tick = PriceTick.from_record(record)
+        self.title = tick.title_text()
+        self.price_detail_item.title = (
+            f"上次记录 | 金价: ¥{tick.price_text()} | 涨跌幅: {tick.rate_text()}"
+            f" | 记录时间: {tick.update_time_text()}"
+        )
+
+    def start_services(self):
+        """加载金价服务、抓取引擎与调度器，启动后台更新并立即获取一次金价"""
+        try:
+            cfg = self.config.snapshot()
+            get_log_manager().configure(cfg)
+
+            from alerts import create_alert_engine
+            from sparkline import create_intraday_charts
+            from engine import get_fetch_engine
+            from scheduler import create_poll_scheduler
+            from service import get_gold_price_service
+
+            self.gold_service = get_gold_price_service()
+            # 服务健康由客户端层的熔断器统一判断
+            self.error_handler.attach_breaker(self.gold_service.breaker)
+            self.scheduler = create_poll_scheduler(cfg)
+            self.alert_engine = create_alert_engine(cfg)
+            self.charts = create_intraday_charts(cfg)
+            self.fetch_engine = get_fetch_engine()
+
+            # 配置文件变化时重新加载，新快照发布后由 on_config_changed 应用
+            self.config.subscribe(self.on_config_changed)
+            self.config_watcher = ConfigWatcher(
+                self.config, interval=float(cfg.get("config_watch_interval") or 0)
+            )
+            self.config_watcher.start()
+
+            # 启动后台更新任务
+            self.start_background_update()
+
+            # 立即获取一次金价
+            self.update_gold_price()
+        except Exception as e:
+            self.handle_update_error(e)
+
+    def on_config_changed(self, old, new, changed):
+        """
+        应用新的配置快照（在发布快照的线程中调用：监视线程或主线程）
+
+        调度器与提醒引擎只在抓取引擎的事件循环中修改；
+        其余配置项由热路径每个 tick 读取一次快照，自然生效。
+        """
+        if "update_interval" in changed:
+            self.update_interval = new.update_interval
+        if changed & LOG_KEYS:
+            get_log_manager().configure(new)
+        if not self.services_ready:
+            return
+        if "update_interval" in changed:
+            self.fetch_engine.call_soon(
+                self.scheduler.set_interval, new.update_interval
+            )
+        if changed & ALERT_KEYS:
+            # 原地更新规则：未变化的规则保留锁定与冷却状态，不会因重新加载而重复提醒
+            self.fetch_engine.call_soon(self.alert_engine.configure, new)
+        restart = sorted(changed & RESTART_KEYS)
+        if restart:
+            log.info("部分配置需重启后生效", keys=",".join(restart))
+
+    @property
+    def services_ready(self) -> bool:
+        return self.fetch_engine is not None
 
     def setup_menu(self):
         """设置菜单项"""
@@ -58,6 +194,12 @@ class GoldPriceStatusBarApp(rumps.App):
         self.price_detail_item = rumps.MenuItem("获取金价中...")
         self.menu.add(self.price_detail_item)
 
+        # 日内走势图（首根 K 线收盘后显示）
+        self.chart_item = None
+        if self.config.get("show_sparkline"):
+            self.chart_item = rumps.MenuItem("今日走势")
+            self.menu.add(self.chart_item)
+
         # 分隔线
         self.menu.add(rumps.separator)
 
@@ -91,127 +233,200 @@ class GoldPriceStatusBarApp(rumps.App):
         # 分隔线
         self.menu.add(rumps.separator)
 
+        # 诊断菜单
+        diagnostics_item = rumps.MenuItem("诊断", callback=self.show_diagnostics)
+        self.menu.add(diagnostics_item)
+
         # 关于菜单
         about_item = rumps.MenuItem("关于", callback=self.show_about)
         self.menu.add(about_item)
 
-    def update_gold_price(self):
-        """更新金价信息（后台线程获取，主线程更新UI）"""
-        import threading
+    def update_gold_price(self, max_staleness_ms=None):
+        """更新金价信息（在抓取引擎事件循环中获取，主线程更新UI）"""
+        future = self.fetch_engine.submit(self._fetch_and_schedule(max_staleness_ms))
+        future.add_done_callback(self._on_fetch_done)
+
+    def _on_fetch_done(self, future):
+        """抓取任务结束回调：兜底处理未被捕获的异常"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.schedule_on_main(
+                lambda e=error: self.handle_update_error(e), key=TICK_SLOT
+            )
+
+    async def _fetch_and_schedule(
+        self, max_staleness_ms=None, stale_fallback: bool = False
+    ) -> bool:
+        """
+        获取金价并将 UI 更新调度到主线程
+
+        Args:
+            max_staleness_ms: 可接受的缓存最大年龄（毫秒），None 表示总是请求上游
+            stale_fallback: 上游请求失败时回退到容忍窗口内的缓存（后台轮询使用）：
+                继续显示旧价格并标注缓存年龄，而不是立即进入错误状态
+
+        Returns:
+            bool: 是否成功获取到金价
+        """
+        try:
+            # 本次更新只读取这一份配置快照
+            cfg = self.config.snapshot()
+            log.debug("开始获取金价")
+            tick = await self.gold_service.get_latest_gold_price(max_staleness_ms)
+            stale = None
+            if not tick and stale_fallback:
+                stale = self.gold_service.get_cached_price()
+            if tick:
+                self._publish_tick(tick, cfg)
+                return True
+            elif stale is not None:
+                # 标题曾被错误信息覆盖（变更检测已重置）时需要恢复为缓存价格；
+                # 只比较不发布，变更检测状态与去重计数不受影响
+                restore = self.gold_service.differ.would_change(stale.tick)
+                self.schedule_on_main(
+                    lambda: self.show_stale_price(stale, restore), key=TICK_SLOT
+                )
+            else:
+                log.warning("金价数据为空，触发错误处理")
+                self.schedule_on_main(
+                    lambda: self.handle_update_error(Exception("获取金价数据失败")),
+                    key=TICK_SLOT,
+                )
+        except Exception as e:
+            log.error("获取金价异常", error=e, type=type(e).__name__)
+            self.schedule_on_main(
+                lambda e=e: self.handle_update_error(e), key=TICK_SLOT
+            )
+        return False
+
+    def _publish_tick(self, tick, cfg):
+        """在抓取线程上处理一个 tick：走势图、变更检测与提醒，UI 更新调度到主线程"""
+        # 与回放共用同一个处理步骤；走势图只有新的 1 分钟 K 线开始时才取数渲染
+        update = process_tick(tick, self.gold_service, self.alert_engine, self.charts)
+        images = update.charts
+        if images is not None:
+            self.schedule_on_main(lambda: self.apply_charts(*images), key=CHART_SLOT)
+
+        changes = update.changes
+        if changes is None:
+            # 上游 tick 未变化：跳过格式化与提醒，仅在需要时清理错误/刷新状态
+            if self.refreshing or self.error_handler.error_count:
+                self.schedule_on_main(self._finish_update, key=TICK_SLOT)
+            return
 
-        def _fetch():
+        # 提醒规则已在抓取线程上评估，通知不参与合并，避免被新 tick 覆盖
+        alerts = update.alerts
+        if alerts and cfg.show_notifications:
+            self.schedule_on_main(lambda: self.notify_alerts(alerts))
+
+        def _apply():
             try:
-                print("[DEBUG] 开始获取金价...")
-                price_info = self.gold_service.get_latest_gold_price()
-                if price_info:
-
-                    def _apply():
-                        try:
-                            print("[DEBUG] 获取金价成功，更新UI")
-                            # 检查价格变化
-                            self.check_price_change(price_info)
-                            self.current_price_info = price_info
-                            # 更新状态栏标题
-                            display_text = self.gold_service.format_price_display(
-                                price_info
-                            )
-                            self.title = display_text
-                            # 更新详情菜单项
-                            detail_text = self.gold_service.get_detailed_info(
-                                price_info
-                            )
-                            self.price_detail_item.title = detail_text.replace(
-                                "\n", " | "
-                            )
-                            # 重置错误计数
-                            self.error_handler.reset_error_count()
-                            self.update_error_status()
-                            # 完成刷新，清理看门狗
-                            self.refreshing = False
-                            watchdog = getattr(self, "refresh_watchdog", None)
-                            if watchdog is not None:
-                                try:
-                                    watchdog.stop()
-                                except Exception:
-                                    pass
-                                self.refresh_watchdog = None
-                        except Exception as e:
-                            self.handle_update_error(e)
-
-                    # 将 UI 更新调度到主线程队列中
-                    self.schedule_on_main(_apply)
-                else:
-                    print("[DEBUG] 金价数据为空，触发错误处理")
-                    self.schedule_on_main(
-                        lambda: self.handle_update_error(Exception("获取金价数据失败"))
-                    )
+                with self.metrics.timer("apply"):
+                    log.debug("获取金价成功，更新UI", changed=",".join(changes))
+                    self.current_tick = tick
+                    if "price_cents" in changes or "rate" in changes:
+                        # 更新状态栏标题
+                        self.title = self.gold_service.format_price_display(tick)
+                    # 更新详情菜单项
+                    detail_text = self.gold_service.get_detailed_info(tick)
+                    self.price_detail_item.title = detail_text.replace("\n", " | ")
+                self._finish_update()
             except Exception as e:
-                print(f"[DEBUG] 获取金价异常: {e}")
-                self.schedule_on_main(lambda e=e: self.handle_update_error(e))
+                self.handle_update_error(e)
+
+        # 将 UI 更新调度到主线程，覆盖尚未渲染的旧 tick
+        self.schedule_on_main(_apply, key=TICK_SLOT)
+
+    def show_stale_price(self, cached, restore_title: bool):
+        """后台刷新失败但缓存仍在容忍窗口内：标题保持旧价格，详情标注缓存年龄（主线程）"""
+        # 记入错误历史与计数，下一次成功更新时由 _finish_update 清除
+        self.error_handler.handle_error(
+            Exception(f"获取金价数据失败，使用缓存（{cached.age_text()}）"), "金价更新"
+        )
+        if restore_title:
+            self.title = self.gold_service.format_price_display(cached.tick)
+        self.update_detail_with_cached()
+        self.update_error_status()
+
+    def _finish_update(self):
+        """一次成功更新的收尾：重置错误计数并清理看门狗"""
+        self.error_handler.reset_error_count()
+        self.update_error_status()
+        self.refreshing = False
+        watchdog = getattr(self, "refresh_watchdog", None)
+        if watchdog is not None:
+            try:
+                watchdog.stop()
+            except Exception:
+                pass
+            self.refresh_watchdog = None
 
-        threading.Thread(target=_fetch, daemon=True).start()
+    def apply_charts(self, sparkline, chart):
+        """将渲染好的走势图设置到状态栏与菜单（主线程）"""
+        try:
+            if sparkline.path:
+                self._set_status_icon(sparkline.path, sparkline.size)
+            if chart.path and self.chart_item is not None:
+                self.chart_item.set_icon(chart.path, dimensions=chart.size)
+        except Exception as e:
+            log.warning("更新走势图失败", error=e)
+
+    def _set_status_icon(self, path: str, size):
+        """
+        通过公开的 App.icon 设置状态栏图标，并尽量按图像实际比例显示
+
+        rumps 固定将状态栏图标缩放为 20x20，且没有指定尺寸的公开接口；只有在 rumps 的
+        内部属性存在时才重设尺寸，rumps 版本变化导致属性缺失或调用失败时保留默认尺寸。
+        """
+        self.icon = path
+        image = getattr(self, "_icon_nsimage", None)
+        nsapp = getattr(self, "_nsapp", None)
+        if image is None or not hasattr(nsapp, "setStatusBarIcon"):
+            return
+        try:
+            image.setSize_(size)
+            nsapp.setStatusBarIcon()
+        except Exception as e:
+            log.debug("无法调整状态栏图标尺寸，使用 rumps 默认尺寸", error=e)
 
     def update_detail_with_cached(self):
         """在错误时使用缓存数据更新详情显示"""
+        if self.gold_service is None:
+            return
         try:
             cached = self.gold_service.get_cached_price()
             if cached:
-                detail_text = self.gold_service.get_detailed_info(cached)
-                self.price_detail_item.title = "使用缓存 | " + detail_text.replace(
-                    "\n", " | "
+                detail_text = self.gold_service.get_detailed_info(cached.tick)
+                self.price_detail_item.title = (
+                    f"使用缓存（{cached.age_text()}） | "
+                    + detail_text.replace("\n", " | ")
                 )
         except Exception:
             pass
 
-    def schedule_on_main(self, fn):
-        """将函数调度到主线程 UI 队列执行"""
-        try:
-            self.ui_queue.put(fn)
-        except Exception:
-            pass
+    def schedule_on_main(self, fn, key: Optional[Hashable] = None):
+        """
+        将函数调度到主线程执行
 
-    def _drain_ui_queue(self, timer):
-        """主线程定时处理 UI 队列中的任务"""
+        Args:
+            fn: 待执行函数
+            key: UI 目标槽位，同一槽位仅保留最新任务；为 None 时不合并
+        """
         try:
-            while not self.ui_queue.empty():
-                fn = self.ui_queue.get_nowait()
-                try:
-                    fn()
-                except Exception as e:
-                    self.handle_update_error(e)
+            self.ui_dispatcher.post(fn, key=key)
         except Exception:
-            # 避免 UI 队列处理异常影响主循环
             pass
 
-    def check_price_change(self, new_price_info: Dict[str, Any]):
-        """检查价格变化并发送通知"""
-        if not self.config.get("show_price_change_alerts") or not self.last_price:
-            self.last_price = new_price_info.get("price")
-            return
-
-        try:
-            current_price = float(new_price_info.get("price", 0))
-            last_price = float(self.last_price or 0)
-
-            if last_price > 0:
-                change_percent = abs((current_price - last_price) / last_price * 100)
-                threshold = self.config.get("price_change_threshold")
-
-                if change_percent >= threshold:
-                    trend = "上涨" if current_price > last_price else "下跌"
-                    change_amount = abs(current_price - last_price)
-
-                    if self.config.get("show_notifications"):
-                        rumps.notification(
-                            title="金价变化提醒",
-                            subtitle=f"价格{trend} {change_percent:.2f}%",
-                            message=f"当前价格: ¥{current_price:.2f} (变化: ¥{change_amount:.2f})",
-                        )
-
-            self.last_price = current_price
-
-        except (ValueError, TypeError) as e:
-            print(f"价格变化检查失败: {e}")
+    def notify_alerts(self, alerts):
+        """发送价格提醒通知"""
+        for alert in alerts:
+            rumps.notification(
+                title="金价变化提醒",
+                subtitle=alert.subtitle,
+                message=alert.message,
+            )
 
     def handle_update_error(self, error: Exception):
         """处理更新错误"""
@@ -225,18 +440,20 @@ class GoldPriceStatusBarApp(rumps.App):
                 pass
             self.refresh_watchdog = None
 
-        should_retry = self.error_handler.handle_error(error, "金价更新")
+        # 标题已被错误信息覆盖，下一个 tick 需要全量重绘
+        if self.gold_service is not None:
+            self.gold_service.differ.reset()
 
-        if should_retry:
-            if self.error_handler.is_service_healthy():
-                self.title = "⚠️ 获取中..."
-                self.price_detail_item.title = "正在重试获取金价..."
-            else:
-                self.title = "❌ 连接失败"
-                self.price_detail_item.title = "金价服务连接失败，请检查网络"
+        if self.error_handler.handle_error(error, "金价更新"):
+            self.title = "⚠️ 获取中..."
+            self.price_detail_item.title = "正在重试获取金价..."
         else:
-            self.title = "❌ 服务异常"
-            self.price_detail_item.title = "服务异常，已停止自动更新"
+            # 熔断打开：到期前不请求上游，到期后由单个探测请求检查是否恢复
+            self.title = "❌ 连接失败"
+            retry_after = self.error_handler.get_retry_delay()
+            self.price_detail_item.title = (
+                f"金价服务连接失败，请检查网络（{retry_after:.0f}秒后重试）"
+            )
 
         # 尝试展示缓存详情，给用户参考
         self.update_detail_with_cached()
@@ -249,44 +466,41 @@ class GoldPriceStatusBarApp(rumps.App):
             self.error_status_item.title = "服务状态: 正常"
         else:
             error_count = self.error_handler.error_count
-            self.error_status_item.title = f"服务状态: 异常 (错误: {error_count})"
+            self.error_status_item.title = (
+                f"服务状态: 异常 (错误: {error_count}，上游熔断中)"
+            )
 
     def start_background_update(self):
-        """启动后台更新线程"""
+        """在抓取引擎事件循环中启动后台更新任务"""
 
-        def update_loop():
+        async def update_loop():
             while self.is_running:
                 try:
-                    # 使用配置的更新间隔
-                    time.sleep(self.update_interval)
-                    if (
-                        self.is_running
-                        and self.error_handler.is_service_healthy()
-                        and not self.refreshing
-                    ):
-                        self.update_gold_price()
-                    elif not self.error_handler.is_service_healthy():
-                        # 服务不健康时使用更长的重试间隔
-                        retry_delay = self.error_handler.get_retry_delay()
-                        print(f"服务不健康，等待 {retry_delay} 秒后重试")
-                        time.sleep(
-                            max(retry_delay - self.update_interval, 0)
-                        )  # 补充等待时间
-                        if self.is_running and not self.refreshing:
-                            self.update_gold_price()
+                    # 按单调时钟截止时间等待，抓取耗时不会累积为漂移
+                    await self.scheduler.wait()
+                    if not self.is_running:
+                        break
+                    # 与手动刷新并发时由服务层合并为同一个上游请求。
+                    # 轮询节奏由调度器决定，不走缓存新鲜期（否则 1 秒轮询会被
+                    # 缓存 TTL 拉长）；请求失败时才回退到容忍窗口内的缓存
+                    success = await self._fetch_and_schedule(stale_fallback=True)
+                    self.scheduler.complete(success)
                 except Exception as e:
-                    self.error_handler.handle_error(e, "后台更新线程")
-                    time.sleep(5)  # 线程错误时等待5秒再重试
+                    self.error_handler.handle_error(e, "后台更新任务")
+                    self.scheduler.complete(False)
 
-        update_thread = threading.Thread(target=update_loop, daemon=True)
-        update_thread.start()
+        self.update_task = self.fetch_engine.submit(update_loop())
 
     @rumps.clicked("立即刷新")
     def refresh_price(self, sender):
         """手动刷新金价（在主线程调度，避免子线程更新UI导致闪退）"""
+        if not self.services_ready:
+            # 服务尚在加载，加载完成后会立即获取一次
+            return
         self.title = "🔄 刷新中..."
         self.price_detail_item.title = "正在获取最新金价..."
         self.refreshing = True
+        self.gold_service.differ.reset()
 
         # 使用 rumps.Timer 在主线程事件循环中调度一次更新
         def run_update(timer):
@@ -305,6 +519,7 @@ class GoldPriceStatusBarApp(rumps.App):
                 if self.refreshing:
                     from builtins import TimeoutError
 
+                    self.metrics.inc("watchdog_timeouts_total")
                     self.handle_update_error(TimeoutError("刷新超时"))
             except Exception as e:
                 self.handle_update_error(e)
@@ -317,25 +532,44 @@ class GoldPriceStatusBarApp(rumps.App):
         """设置更新间隔"""
         # 验证间隔值
         validated_interval = self.config.validate_update_interval(interval)
-        self.update_interval = validated_interval
+        # 发布新快照；on_config_changed 在事件循环线程中修改调度器，立即按新间隔重新计算截止时间
+        # （服务尚未加载时，调度器创建时会读取已更新的配置）
         self.config.set("update_interval", validated_interval)
+        self.update_interval = validated_interval
 
-        print(f"更新间隔已设置为 {validated_interval} 秒")
+        log.info("更新间隔已设置", interval=validated_interval)
 
         # 显示通知
-        if self.config.get("show_notifications"):
+        if self.config.snapshot().show_notifications:
             rumps.notification(
                 title="设置已更新",
                 subtitle=f"更新间隔: {validated_interval}秒",
-                message="新的更新间隔将在下次更新时生效",
+                message="新的更新间隔已立即生效",
             )
 
     @rumps.clicked("关于")
     def show_about(self, sender):
         """显示关于信息"""
+        if not self.services_ready:
+            rumps.alert(title="关于金价监控", message="金价服务正在启动...", ok="确定")
+            return
         # 获取错误摘要
         error_summary = self.error_handler.get_error_summary()
         service_status = "正常" if self.error_handler.is_service_healthy() else "异常"
+        tick_stats = self.gold_service.differ.stats()
+        ui_stats = self.ui_dispatcher.stats()
+        alert_stats = self.alert_engine.stats()
+        schedule_stats = self.scheduler.stats()
+        breaker_stats = self.gold_service.breaker.snapshot()
+        channel = self.gold_service.channel
+        if channel is None:
+            source = "本进程轮询"
+        elif channel.is_leader:
+            source = (
+                f"本进程轮询并共享给其他进程（已发布 {channel.stats()['published']}）"
+            )
+        else:
+            source = "读取主进程共享的 tick"
 
         about_text = f"""金价监控 v1.0
 
@@ -352,8 +586,14 @@ class GoldPriceStatusBarApp(rumps.App):
 
 当前状态：
 • 服务状态: {service_status}
-• 更新间隔: {self.update_interval}秒
+• 更新间隔: {self.update_interval}秒（当前生效 {schedule_stats["interval"]}秒，{"交易中" if schedule_stats["market_open"] else "休市"}）
+• 调度延迟: 平均 {schedule_stats["mean_lag"] * 1000:.1f}ms，最大 {schedule_stats["max_lag"] * 1000:.1f}ms
 • 通知功能: {"开启" if self.config.get("show_notifications") else "关闭"}
+• 收到 tick: {tick_stats["ticks_total"]}（去重 {tick_stats["ticks_deduplicated"]}，合并请求 {self.gold_service.coalesced_requests}）
+• UI 唤醒: {ui_stats["wakeups"]}（空唤醒 {ui_stats["idle_wakeups"]}，合并 {ui_stats["coalesced"]}，最大积压 {ui_stats["max_depth"]}）
+• 行情来源: {source}
+• 上游熔断: {breaker_stats["state"]}（打开 {breaker_stats["opened"]} 次，拒绝请求 {breaker_stats["rejected"]}，探测 {breaker_stats["probes"]}）
+• 提醒规则: {alert_stats["rules"]} 条（已提醒 {alert_stats["fired"]}，抑制 {alert_stats["suppressed"]}）
 
 错误统计：
 {error_summary}
@@ -362,16 +602,35 @@ class GoldPriceStatusBarApp(rumps.App):
 
         rumps.alert(title="关于金价监控", message=about_text, ok="确定")
 
+    def show_diagnostics(self, sender):
+        """显示各阶段耗时分布与计数器"""
+        rumps.alert(
+            title="金价监控诊断",
+            message=self.metrics.format_diagnostics(),
+            ok="确定",
+        )
+
     def clean_up(self):
         """清理资源"""
         self.is_running = False
-        print("应用正在退出...")
+        if self.config_watcher is not None:
+            self.config_watcher.stop()
+        if self.fetch_engine is not None:
+            self.fetch_engine.stop()
+        if self.gold_service is not None:
+            # 释放主进程身份，其他进程在下一次轮询时接替
+            if self.gold_service.channel is not None:
+                self.gold_service.channel.close()
+            if self.gold_service.store is not None:
+                self.gold_service.store.close()
+        log.info("应用正在退出")
+        get_log_manager().stop()
 
 
 def main():
     """主函数"""
     try:
-        # 创建并运行应用
+        # 创建并运行应用（日志在服务加载时按配置初始化）
         app = GoldPriceStatusBarApp()
 
         print("金价状态栏应用启动成功")
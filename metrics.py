@@ -0,0 +1,237 @@
+"""
+运行指标模块
+按阶段（DNS/建连、TLS、首字节、响应体、解码、格式化、UI 渲染）记录耗时的固定分桶直方图，
+以及请求数、按类型的错误数、去重命中、看门狗超时等计数器。
+可生成“诊断”菜单文本，也可导出为 Prometheus 文本格式。
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from latency import log_buckets
+
+# 所有阶段直方图共用的桶上界（秒）：0.1ms ~ 60s，按 2 倍递增
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(log_buckets(0.0001, 60.0, 2.0))
+
+# 阶段名 → 诊断菜单中的中文名（决定展示顺序）
+STAGE_LABELS: Dict[str, str] = {
+    "connect": "DNS+建连",
+    "tls": "TLS 握手",
+    "ttfb": "上游首字节",
+    "body": "响应体读取",
+    "decode": "JSON 解码",
+    "fetch": "抓取总耗时",
+    "format": "标题格式化",
+    "apply": "UI 渲染",
+    "publish": "SSE 广播",
+}
+
+# 计数器说明（同时用作 Prometheus HELP）
+COUNTER_HELP: Dict[str, str] = {
+    "requests_total": "上游请求数",
+    "responses_total": "上游响应数（按状态码）",
+    "errors_total": "抓取错误数（按异常类型）",
+    "dedup_hits_total": "上游 tick 未变化而跳过渲染的次数",
+    "coalesced_requests_total": "被合并到进行中请求的抓取次数",
+    "stale_hits_total": "直接使用缓存的抓取次数",
+    "revalidations_total": "缓存过期后触发的后台刷新次数",
+    "watchdog_timeouts_total": "手动刷新看门狗超时次数",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """固定分桶直方图：记录为 O(log 桶数)，分位数取所在桶的上界"""
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """返回分位数所在桶的上界，无样本时返回 None"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(math.ceil(q * self.count), 1)
+            seen = 0
+            for index, bucket in enumerate(self.buckets):
+                seen += bucket
+                if seen >= rank:
+                    return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class StageTimer:
+    """阶段计时上下文管理器"""
+
+    __slots__ = ("histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class MetricsRegistry:
+    """阶段直方图与带标签计数器的注册表"""
+
+    def __init__(
+        self, prefix: str = "gold", bounds: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.prefix = prefix
+        self.bounds = bounds
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[LabelKey, int]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, Histogram(self.bounds))
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        """记录一个阶段耗时（秒）"""
+        self.histogram(stage).observe(seconds)
+
+    def timer(self, stage: str) -> StageTimer:
+        """with metrics.timer("decode"): ..."""
+        return StageTimer(self.histogram(stage))
+
+    def inc(self, name: str, value: int = 1, **labels):
+        """计数器加一（可带标签，如 errors_total type=ReadTimeout）"""
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def count(self, name: str, **labels) -> int:
+        """读取计数器；不带标签时返回所有标签之和"""
+        series = self.counters.get(name, {})
+        if labels:
+            return series.get(tuple(sorted(labels.items())), 0)
+        return sum(series.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            counters = {
+                name: {
+                    ",".join(f"{k}={v}" for k, v in key) or "total": value
+                    for key, value in series.items()
+                }
+                for name, series in self.counters.items()
+            }
+        return {
+            "stages": {name: h.snapshot() for name, h in self.stages.items()},
+            "counters": counters,
+        }
+
+    def format_diagnostics(self) -> str:
+        """诊断菜单文本：各阶段 p50/p95/p99 与计数器"""
+        lines: List[str] = ["阶段耗时 (p50 / p95 / p99):"]
+        for stage, label in STAGE_LABELS.items():
+            histogram = self.stages.get(stage)
+            if histogram is None or not histogram.count:
+                continue
+            p50, p95, p99 = (histogram.quantile(q) for q in (0.5, 0.95, 0.99))
+            lines.append(
+                f"• {label}: {p50 * 1000:.1f} / {p95 * 1000:.1f} / "
+                f"{p99 * 1000:.1f} ms（{histogram.count} 次）"
+            )
+        if len(lines) == 1:
+            lines.append("• 暂无数据")
+
+        lines.append("")
+        lines.append("计数:")
+        for name, help_text in COUNTER_HELP.items():
+            series = self.counters.get(name)
+            if not series:
+                continue
+            detail = ", ".join(
+                f"{'/'.join(v for _, v in key)}: {value}"
+                for key, value in sorted(series.items())
+                if key
+            )
+            total = sum(series.values())
+            lines.append(
+                f"• {help_text}: {total}" + (f"（{detail}）" if detail else "")
+            )
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式（0.0.4）"""
+        out: List[str] = []
+        name = f"{self.prefix}_stage_seconds"
+        out.append(f"# HELP {name} 各处理阶段耗时")
+        out.append(f"# TYPE {name} histogram")
+        for stage, histogram in sorted(self.stages.items()):
+            with histogram._lock:
+                buckets = list(histogram.buckets)
+                count, total = histogram.count, histogram.sum
+            cumulative = 0
+            for bound, bucket in zip(self.bounds, buckets):
+                cumulative += bucket
+                out.append(
+                    f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            out.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            out.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            out.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        with self._lock:
+            counters = {n: dict(s) for n, s in self.counters.items()}
+        for counter, series in sorted(counters.items()):
+            full_name = f"{self.prefix}_{counter}"
+            out.append(f"# HELP {full_name} {COUNTER_HELP.get(counter, counter)}")
+            out.append(f"# TYPE {full_name} counter")
+            for key, value in sorted(series.items()):
+                labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                out.append(
+                    f"{full_name}{{{labels}}} {value}"
+                    if labels
+                    else f"{full_name} {value}"
+                )
+        return "\n".join(out) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    return metrics
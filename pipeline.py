@@ -0,0 +1,108 @@
+"""
+tick 变更检测模块
+将新 tick 与上一次发布的 tick 比较，只输出发生变化的字段；
+process_tick 为状态栏应用与回放共用的逐 tick 处理步骤（走势图 → 变更检测 → 提醒）
+"""
+
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from tick import PriceTick
+
+# 参与比较的上游字段（receive_ms 为本地接收时间，每次都会变化，不参与比较）
+DIFF_FIELDS: Tuple[str, ...] = PriceTick._fields[:6]
+
+
+class TickDiffer:
+    """变更检测器"""
+
+    def __init__(self):
+        self.fields = DIFF_FIELDS
+        self._width = len(DIFF_FIELDS)
+        self.last_published: Optional[PriceTick] = None
+        self.ticks_total = 0
+        self.ticks_published = 0
+        self.ticks_deduplicated = 0
+        self._lock = threading.Lock()
+
+    def diff(self, tick: PriceTick) -> Optional[Dict[str, Any]]:
+        """
+        比较并发布新 tick
+
+        Args:
+            tick: 新的金价 tick
+
+        Returns:
+            Dict: 发生变化的字段及新值；与上次发布完全相同时返回 None
+        """
+        width = self._width
+        with self._lock:
+            self.ticks_total += 1
+            last = self.last_published
+            if last is None:
+                changes = dict(zip(self.fields, tick[:width]))
+            elif tick[:width] == last[:width]:
+                changes = None
+            else:
+                changes = {
+                    field: tick[i]
+                    for i, field in enumerate(self.fields)
+                    if tick[i] != last[i]
+                }
+
+            if not changes:
+                self.ticks_deduplicated += 1
+                return None
+
+            self.last_published = tick
+            self.ticks_published += 1
+            return changes
+
+    def would_change(self, tick: PriceTick) -> bool:
+        """tick 与上次发布的是否不同（只比较，不发布、不计数）"""
+        width = self._width
+        with self._lock:
+            last = self.last_published
+        return last is None or tick[:width] != last[:width]
+
+    def reset(self):
+        """清空上次发布的 tick，下一次比较将视为全量变化"""
+        with self._lock:
+            self.last_published = None
+
+    def stats(self) -> Dict[str, int]:
+        """获取去重计数"""
+        return {
+            "ticks_total": self.ticks_total,
+            "ticks_published": self.ticks_published,
+            "ticks_deduplicated": self.ticks_deduplicated,
+        }
+
+
+class TickUpdate(NamedTuple):
+    """一个 tick 经过处理后的结果"""
+
+    changes: Optional[Dict[str, Any]]  # 变化的字段；与上次发布相同时为 None
+    alerts: List[Any]  # 本次需要发出的提醒
+    charts: Optional[Any]  # 新渲染的走势图；没有新 K 线时为 None
+
+
+def process_tick(tick: PriceTick, service, alert_engine, charts=None) -> TickUpdate:
+    """
+    在抓取线程上处理一个新 tick（状态栏应用与回放共用，保证两者的处理顺序一致）
+
+    先按 K 线更新走势图，再做变更检测；价格变化时评估提醒规则。
+    标题与详情的格式化由调用方负责（应用在主线程，回放直接计算）。
+
+    Args:
+        tick: 新抓取的 tick（已写入 service 的历史/指标/K 线）
+        service: GoldPriceService
+        alert_engine: AlertEngine
+        charts: 日内走势图渲染器，未启用时为 None
+    """
+    images = charts.update(service.candles) if charts is not None else None
+    changes = service.diff_tick(tick)
+    alerts = []
+    if changes is not None and "price_cents" in changes:
+        alerts = alert_engine.evaluate(tick)
+    return TickUpdate(changes, alerts, images)
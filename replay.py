@@ -0,0 +1,314 @@
+"""
+tick 回放模块
+把录制的 tick（tick 存储文件）当作上游数据源，按 1 倍、100 倍或最快速度送入实时流水线：
+GoldPriceService（历史/指标/K 线/变更检测）→ 提醒引擎 → 标题与详情格式化。
+
+回放使用虚拟时钟：接收时间、缓存年龄、熔断与提醒冷却都按录制时的时间计算，
+同一份录制与配置每次得到相同的提醒序列，可用于调整提醒阈值，也可作为离线压测的负载。
+
+用法:
+    python -m replay --store ~/.gold-panel/ticks.dat --speed 100 --threshold 0.3
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from alerts import create_alert_engine
+from client import CircuitBreaker, HedgedPriceFetcher, PriceProvider
+from config import ConfigSnapshot, get_app_config
+from log import get_logger
+from pipeline import process_tick
+from service import GoldPriceService
+from store import Record, TickStore
+
+log = get_logger("replay")
+
+
+class VirtualClock:
+    """
+    回放时钟（epoch 秒）
+
+    Args:
+        start: 起始时间
+        speed: 回放倍速；为 None 时不等待，以最快速度回放
+        max_gap: 按倍速等待时单个间隔的上限（秒），跳过休市等长时间空档
+    """
+
+    def __init__(
+        self, start: float = 0.0, speed: Optional[float] = None, max_gap: float = 60.0
+    ):
+        self.now = float(start)
+        self.speed = speed if speed and speed > 0 else None
+        self.max_gap = max_gap
+        self.slept = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep_until(self, t: float):
+        """推进到时间 t；设置了倍速时按比例真实等待"""
+        delay = t - self.now
+        if delay <= 0:
+            return
+        if self.speed is not None:
+            wait = min(delay, self.max_gap) / self.speed
+            self.slept += wait
+            await asyncio.sleep(wait)
+        self.now = t
+
+
+def record_to_data(record: Record) -> SimpleNamespace:
+    """将存储记录还原为与上游 datas 字段相同的对象"""
+    upstream_time, price, yesterday, change, _ = record
+    rate = change * 100 / yesterday if yesterday else 0.0
+    return SimpleNamespace(
+        price=f"{price:.2f}",
+        yesterdayPrice=f"{yesterday:.2f}",
+        upAndDownAmt=f"{change:.2f}",
+        upAndDownRate=f"{rate:.2f}%",
+        time=str(int(upstream_time)),
+        productSku="",
+    )
+
+
+class ReplayProvider(PriceProvider):
+    """
+    回放数据源，替代上游接口
+
+    由回放器调用 advance() 取出下一条记录，fetch() 返回当前记录；录制结束后 fetch 抛出 EOFError。
+    """
+
+    name = "replay"
+
+    def __init__(self, records: Iterable[Record]):
+        super().__init__()
+        self._records = iter(records)
+        self.current: Optional[Record] = None
+
+    def advance(self) -> Optional[Record]:
+        self.current = next(self._records, None)
+        return self.current
+
+    async def fetch(self):
+        if self.current is None:
+            raise EOFError("回放已结束")
+        return record_to_data(self.current)
+
+
+class TickReplayer:
+    """
+    回放器：逐条推进虚拟时钟，并按与状态栏应用相同的顺序处理每个 tick
+
+    Args:
+        records: 按上游时间排序的存储记录
+        config: 配置；回放时关闭 tick 存储写入与共享内存发布，避免影响正在运行的实例
+        speed: 回放倍速，None 为最快
+        max_gap: 见 VirtualClock
+        on_alert: 每条提醒的回调 on_alert(alert)
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Record],
+        config=None,
+        speed: Optional[float] = None,
+        max_gap: float = 60.0,
+        on_alert: Optional[Callable[[Any], None]] = None,
+    ):
+        if config is None:
+            config = get_app_config().snapshot()
+        data = dict(config)
+        data["enable_tick_store"] = False
+        data["shared_tick"] = False
+        self.config = ConfigSnapshot(data, source="replay")
+        self.clock = VirtualClock(speed=speed, max_gap=max_gap)
+        self.provider = ReplayProvider(records)
+        breaker = CircuitBreaker(
+            failure_threshold=int(self.config.get("max_error_count") or 3),
+            reset_timeout=float(self.config.get("error_retry_delay") or 0),
+            clock=self.clock,
+        )
+        self.service = GoldPriceService(
+            self.config,
+            clock=self.clock,
+            price_fetcher=HedgedPriceFetcher([self.provider], breaker=breaker),
+        )
+        self.alert_engine = create_alert_engine(self.config, clock=self.clock)
+        self.on_alert = on_alert
+
+        self.ticks = 0
+        self.published = 0
+        self.failed = 0
+        self.alerts: List[Dict[str, Any]] = []
+        self.stage_seconds = {"fetch": 0.0, "alerts": 0.0, "format": 0.0}
+        self._digest = hashlib.sha256()
+
+    async def _step(self, record: Record):
+        perf = time.perf_counter
+        await self.clock.sleep_until(record[4])
+        self.ticks += 1
+
+        start = perf()
+        tick = await self.service.get_latest_gold_price()
+        fetched = perf()
+        self.stage_seconds["fetch"] += fetched - start
+        if tick is None:
+            self.failed += 1
+            return
+        # 与状态栏应用相同的处理步骤（回放不渲染走势图）
+        update = process_tick(tick, self.service, self.alert_engine)
+        evaluated = perf()
+        self.stage_seconds["alerts"] += evaluated - fetched
+        if update.changes is None:
+            return
+        self.published += 1
+
+        for alert in update.alerts:
+            self.alerts.append(
+                {
+                    "time_ms": tick.receive_ms,
+                    "rule": alert.rule.id,
+                    "value": round(alert.value, 4),
+                    "message": alert.subtitle,
+                }
+            )
+            if self.on_alert is not None:
+                self.on_alert(alert)
+
+        start = perf()
+        title = self.service.format_price_display(tick)
+        detail = self.service.get_detailed_info(tick)
+        self.stage_seconds["format"] += perf() - start
+        self._digest.update(f"{title}\0{detail}\0".encode())
+
+    async def run(self) -> Dict[str, Any]:
+        """回放全部记录并返回报告"""
+        begin = time.perf_counter()
+        first = None
+        try:
+            while True:
+                record = self.provider.advance()
+                if record is None:
+                    break
+                if first is None:
+                    first = record[4]
+                    self.clock.now = first
+                await self._step(record)
+        finally:
+            await self.service.price_fetcher.aclose()
+        return self.report(time.perf_counter() - begin, first)
+
+    def report(self, wall_seconds: float, first: Optional[float]) -> Dict[str, Any]:
+        ticks = self.ticks or 1
+        for alert in self.alerts:
+            self._digest.update(f"{alert['time_ms']}:{alert['rule']}\0".encode())
+        return {
+            "ticks": self.ticks,
+            "published": self.published,
+            "failed": self.failed,
+            "alerts": len(self.alerts),
+            "alerts_by_rule": self._alerts_by_rule(),
+            "recorded_seconds": 0.0 if first is None else self.clock.now - first,
+            "wall_seconds": wall_seconds,
+            "ticks_per_second": self.ticks / wall_seconds if wall_seconds else None,
+            "us_per_tick": {
+                stage: seconds / ticks * 1e6
+                for stage, seconds in self.stage_seconds.items()
+            },
+            "digest": self._digest.hexdigest(),
+        }
+
+    def _alerts_by_rule(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for alert in self.alerts:
+            counts[alert["rule"]] = counts.get(alert["rule"], 0) + 1
+        return counts
+
+
+def load_records(
+    path: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+) -> List[Record]:
+    """从 tick 存储文件读取 [start_ms, end_ms) 区间内的记录"""
+    path = os.path.expanduser(path)
+    # 只读打开：不创建文件、不写入文件头、不启动刷盘线程，不影响正在写入的实例
+    store = TickStore(path, readonly=True)
+    try:
+        if start_ms is None and end_ms is None:
+            return list(store.iter_records())
+        return store.range(start_ms or 0, end_ms or 2**62)
+    finally:
+        store.close()
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """'1' / '100' / '100x' / 'max'"""
+    value = value.strip().lower()
+    if value in ("max", "0", ""):
+        return None
+    value = value.rstrip("x×")
+    speed = float(value)
+    if speed <= 0:
+        raise ValueError(f"无效的回放倍速: {value}")
+    return speed
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from datetime import datetime
+
+    from log import get_log_manager
+
+    def parse_time(value: str) -> int:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+    parser = argparse.ArgumentParser(description="回放录制的 tick")
+    parser.add_argument(
+        "--store", default=None, help="tick 存储文件，默认使用配置中的路径"
+    )
+    parser.add_argument("--speed", default="max", help="回放倍速：1、100 或 max")
+    parser.add_argument("--start", type=parse_time, help="起始时间（ISO 格式）")
+    parser.add_argument("--end", type=parse_time, help="结束时间（ISO 格式）")
+    parser.add_argument(
+        "--threshold", type=float, help="覆盖 price_change_threshold（%）"
+    )
+    parser.add_argument("--max-gap", type=float, default=60.0)
+    parser.add_argument("--quiet", action="store_true", help="不逐条打印提醒")
+    parser.add_argument("--output", help="报告 JSON 写入路径")
+    args = parser.parse_args()
+
+    get_log_manager().configure()
+    app_config = get_app_config()
+    config = app_config.snapshot().to_dict()
+    if args.threshold is not None:
+        config["price_change_threshold"] = args.threshold
+        config["show_price_change_alerts"] = True
+    try:
+        records = load_records(
+            args.store or app_config.get("tick_store_path"), args.start, args.end
+        )
+    except (OSError, ValueError) as e:
+        parser.error(f"无法读取 tick 存储: {e}")
+
+    def print_alert(alert):
+        if not args.quiet:
+            stamp = datetime.fromtimestamp(alert.tick.receive_ms / 1000)
+            print(f"[{stamp:%m-%d %H:%M:%S}] {alert.subtitle} {alert.message}")
+
+    replayer = TickReplayer(
+        records,
+        config=config,
+        speed=parse_speed(args.speed),
+        max_gap=args.max_gap,
+        on_alert=print_alert,
+    )
+    report = asyncio.run(replayer.run())
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,240 @@
+"""
+轮询调度模块
+基于单调时钟截止时间的无漂移调度，结合交易时段、指数退避与每分钟请求预算
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    ZoneInfo = None
+
+
+def _parse_session(text: str) -> Tuple[dtime, dtime]:
+    """解析 "HH:MM-HH:MM" 格式的交易时段"""
+    start, end = text.split("-")
+    return dtime.fromisoformat(start.strip()), dtime.fromisoformat(end.strip())
+
+
+class TradingCalendar:
+    """
+    交易日历
+
+    时段按开盘所在日期归属：例如周五 20:00-02:30 的夜盘延续到周六凌晨，
+    周一凌晨则不属于任何时段。
+    """
+
+    def __init__(
+        self,
+        sessions: Iterable[str] = ("09:00-11:30", "13:30-15:30", "20:00-02:30"),
+        weekdays: Iterable[int] = (0, 1, 2, 3, 4),
+        holidays: Iterable[str] = (),
+        timezone: str = "Asia/Shanghai",
+    ):
+        self.sessions: List[Tuple[dtime, dtime]] = [_parse_session(s) for s in sessions]
+        self.weekdays = set(weekdays)
+        self.holidays = {date.fromisoformat(d) for d in holidays}
+        self.tz = ZoneInfo(timezone) if ZoneInfo and timezone else None
+
+    def _is_trading_day(self, day: date) -> bool:
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """判断给定时刻是否处于交易时段"""
+        if not self.sessions:
+            return True
+        if now is None:
+            now = datetime.now(self.tz)
+        elif self.tz is not None and now.tzinfo is not None:
+            now = now.astimezone(self.tz)
+
+        today = now.date()
+        current = now.time()
+        for start, end in self.sessions:
+            if start <= end:
+                if start <= current < end and self._is_trading_day(today):
+                    return True
+            else:
+                # 跨午夜时段：当天开盘后，或前一天开盘的延续部分
+                if current >= start and self._is_trading_day(today):
+                    return True
+                if current < end and self._is_trading_day(today - timedelta(days=1)):
+                    return True
+        return False
+
+
+class RequestBudget:
+    """每分钟请求预算（令牌桶）"""
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(int(per_minute), 1)
+        self.rate = self.capacity / 60.0
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """距离下一个可用令牌的秒数"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class PollScheduler:
+    """
+    无漂移轮询调度器
+
+    截止时间按 deadline += interval 推进，与抓取耗时无关；
+    落后超过一个周期时跳过错过的时段而不是突发补发。
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        closed_interval: float = 300,
+        calendar: Optional[TradingCalendar] = None,
+        requests_per_minute: int = 60,
+        backoff_max: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.closed_interval = closed_interval
+        self.calendar = calendar
+        self.budget = (
+            RequestBudget(requests_per_minute, clock) if requests_per_minute else None
+        )
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.random = random.Random()
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.consecutive_errors = 0
+        self.deadline = clock() + interval
+
+        # 统计
+        self.ticks = 0
+        self.skipped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+
+    def set_interval(self, interval: float):
+        """修改更新间隔，从当前时刻重新计算截止时间（需在事件循环线程调用）"""
+        self.interval = interval
+        self.deadline = self.clock() + self.current_interval()
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def market_open(self) -> bool:
+        return self.calendar is None or self.calendar.is_open()
+
+    def current_interval(self) -> float:
+        """当前生效的轮询间隔（休市时降频）"""
+        if self.market_open():
+            return self.interval
+        return max(self.interval, self.closed_interval)
+
+    def backoff_delay(self) -> float:
+        """指数退避加抖动：以当前间隔为基数翻倍，在 [d/2, d] 内随机取值"""
+        exponent = min(self.consecutive_errors - 1, 10)
+        delay = min(max(self.current_interval(), 1) * (2**exponent), self.backoff_max)
+        return delay / 2 + self.random.uniform(0, delay / 2)
+
+    async def wait(self) -> float:
+        """
+        等待下一个截止时间
+
+        Returns:
+            float: 本次实际触发时刻相对计划时刻的延迟（秒）
+        """
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while True:
+            scheduled = self.deadline
+            delay = scheduled - self.clock()
+            if delay <= 0:
+                break
+            # 截止时间被 set_interval 修改时提前唤醒并重新计算
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+        if self.budget is not None:
+            budget_wait = self.budget.wait_time()
+            if budget_wait > 0:
+                await asyncio.sleep(budget_wait)
+            self.budget.consume()
+
+        lag = max(self.clock() - scheduled, 0.0)
+        self.ticks += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._lag_total += lag
+        return lag
+
+    def complete(self, success: bool):
+        """一次抓取结束后推进截止时间"""
+        now = self.clock()
+        if success:
+            self.consecutive_errors = 0
+        else:
+            self.consecutive_errors += 1
+
+        if self.consecutive_errors:
+            self.deadline = now + self.backoff_delay()
+            return
+
+        interval = self.current_interval()
+        self.deadline += interval
+        if self.deadline <= now:
+            # 落后于计划：对齐到下一个未来时段
+            missed = int((now - self.deadline) // interval) + 1
+            self.skipped += missed
+            self.deadline += missed * interval
+
+    def stats(self) -> Dict[str, float]:
+        """调度延迟统计（秒）"""
+        return {
+            "ticks": self.ticks,
+            "skipped": self.skipped,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "mean_lag": self._lag_total / self.ticks if self.ticks else 0.0,
+            "consecutive_errors": self.consecutive_errors,
+            "market_open": self.market_open(),
+            "interval": self.current_interval(),
+        }
+
+
+def create_poll_scheduler(config) -> PollScheduler:
+    """根据应用配置创建轮询调度器"""
+    calendar = TradingCalendar(
+        sessions=config.get("trading_sessions") or (),
+        weekdays=config.get("trading_weekdays") or (0, 1, 2, 3, 4),
+        holidays=config.get("trading_holidays") or (),
+        timezone=config.get("trading_timezone"),
+    )
+    return PollScheduler(
+        interval=config.get("update_interval"),
+        closed_interval=config.get("closed_update_interval") or 0,
+        calendar=calendar,
+        requests_per_minute=config.get("max_requests_per_minute") or 0,
+        backoff_max=config.get("max_backoff_delay") or 60,
+    )
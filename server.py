@@ -0,0 +1,315 @@
+"""
+无界面守护进程模块
+在不依赖 rumps 的情况下运行轮询循环，并通过本地 HTTP 向任意数量的订阅者分发 tick：
+    GET /snapshot  最新 tick（JSON，带缓存年龄；过期时后台刷新）
+    GET /events    Server-Sent Events 推送流
+    GET /health    轮询与订阅统计
+    GET /metrics   Prometheus 文本格式指标
+    GET /candles   K 线（?resolution=60&start=&end=，时间为 epoch 秒）
+    GET /series    降采样后的价格序列（?start=&end=&points=120）
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Set
+from urllib.parse import parse_qs
+
+from config import LOG_KEYS, ConfigWatcher
+from log import get_log_manager, get_logger
+from metrics import metrics
+from scheduler import PollScheduler, create_poll_scheduler
+
+log = get_logger("server")
+
+SSE_HEARTBEAT = 15  # 心跳间隔（秒），用于发现已断开的订阅者
+
+
+class Subscriber:
+    """单个 SSE 订阅者，持有有界缓冲区"""
+
+    def __init__(self, writer, buffer_size: int):
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+    def drop(self):
+        """断开慢消费者：中止连接使其阻塞中的 drain() 立即失败"""
+        self.dropped = True
+        self.queue.get_nowait()
+        self.queue.put_nowait(None)
+        self.writer.transport.abort()
+
+
+class TickBroadcaster:
+    """
+    tick 分发器
+
+    每个 tick 只编码一次，put_nowait 到各订阅者的有界队列。
+    队列已满说明订阅者消费过慢，直接将其断开，轮询循环永远不会因订阅者阻塞。
+    """
+
+    def __init__(self, buffer_size: int = 32):
+        self.buffer_size = buffer_size
+        self.subscribers: Set[Subscriber] = set()
+        self.latest: Optional[Dict[str, Any]] = None
+        self.latest_event: Optional[bytes] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, writer) -> Subscriber:
+        subscriber = Subscriber(writer, self.buffer_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, tick: Dict[str, Any]):
+        """向所有订阅者广播 tick"""
+        self.latest = tick
+        data = json.dumps(tick, ensure_ascii=False, separators=(",", ":"))
+        self.latest_event = f"event: tick\ndata: {data}\n\n".encode()
+        self.published += 1
+
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(self.latest_event)
+            except asyncio.QueueFull:
+                # 慢消费者：丢弃并通知其写协程退出
+                self.dropped += 1
+                self.subscribers.discard(subscriber)
+                subscriber.drop()
+
+
+class TickServer:
+    """守护进程：一个上游轮询循环 + 本地 HTTP 分发"""
+
+    def __init__(
+        self,
+        service,
+        scheduler: PollScheduler,
+        host: str = "127.0.0.1",
+        port: int = 8686,
+        buffer_size: int = 32,
+    ):
+        self.service = service
+        self.scheduler = scheduler
+        self.host = host
+        self.port = port
+        self.broadcaster = TickBroadcaster(buffer_size)
+        self.started_at = time.time()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def poll_loop(self):
+        """上游轮询循环：只有 tick 发生变化时才广播"""
+        while True:
+            await self.scheduler.wait()
+            success = False
+            try:
+                tick = await self.service.get_latest_gold_price()
+                if tick:
+                    success = True
+                    changes = self.service.diff_tick(tick)
+                    if changes is not None:
+                        with metrics.timer("publish"):
+                            payload = tick.to_dict()
+                            payload["changed"] = list(changes)
+                            self.broadcaster.publish(payload)
+            except Exception as e:
+                log.error("轮询失败", error=e, type=type(e).__name__)
+            self.scheduler.complete(success)
+
+    async def _write_response(self, writer, status: str, body: bytes, content_type):
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Access-Control-Allow-Origin: *\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+
+    async def _write_json(self, writer, payload, status="200 OK"):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        await self._write_response(
+            writer, status, body, "application/json; charset=utf-8"
+        )
+
+    async def _stream_events(self, writer):
+        """向单个订阅者推送 SSE 流"""
+        subscriber = self.broadcaster.subscribe(writer)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Access-Control-Allow-Origin: *\r\n"
+                b"Connection: keep-alive\r\n\r\n"
+            )
+            if self.broadcaster.latest_event is not None:
+                writer.write(self.broadcaster.latest_event)
+            await writer.drain()
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), SSE_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    event = b": ping\n\n"
+                if event is None:
+                    break
+                writer.write(event)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.broadcaster.unsubscribe(subscriber)
+
+    def _query_candles(self, path: str, query: Dict[str, list]) -> Dict[str, Any]:
+        """K 线与降采样查询（参数错误时抛出 ValueError）"""
+
+        def number(name, default=None):
+            values = query.get(name)
+            return float(values[0]) if values else default
+
+        start = number("start")
+        end = number("end")
+        candles = self.service.candles
+        if path == "/candles":
+            resolution = int(number("resolution", candles.resolutions[0]))
+            return {
+                "resolution": resolution,
+                "candles": [
+                    c.to_dict() for c in candles.candles(resolution, start, end)
+                ],
+            }
+        points = int(number("points", 120))
+        if points < 2:
+            raise ValueError("points 至少为 2")
+        resolution, series = candles.downsample(start, end, points)
+        return {"resolution": resolution, "points": series}
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "uptime": time.time() - self.started_at,
+            "subscribers": len(self.broadcaster.subscribers),
+            "published": self.broadcaster.published,
+            "dropped_subscribers": self.broadcaster.dropped,
+            "scheduler": self.scheduler.stats(),
+            "ticks": self.service.differ.stats(),
+            "cache": self.service.cache.stats(),
+            "candles": self.service.candles.stats(),
+            "providers": self.service.price_fetcher.stats(),
+            "circuit": self.service.breaker.snapshot(),
+            "shared_tick": self.service.channel.stats()
+            if self.service.channel is not None
+            else None,
+        }
+
+    async def handle_client(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            # 读取并丢弃请求头
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self._write_json(
+                    writer, {"error": "method not allowed"}, "405 Method Not Allowed"
+                )
+                return
+            path, _, query_string = parts[1].partition("?")
+
+            if path == "/events":
+                await self._stream_events(writer)
+            elif path == "/snapshot":
+                # stale-while-revalidate：旧值在容忍窗口内直接返回并触发后台刷新
+                cached = await self.service.get_price()
+                if cached is None:
+                    await self._write_json(
+                        writer, {"error": "no data"}, "503 Service Unavailable"
+                    )
+                else:
+                    payload = cached.tick.to_dict()
+                    payload["age"] = round(cached.age, 3)
+                    payload["cache_state"] = cached.state
+                    await self._write_json(writer, payload)
+            elif path in ("/candles", "/series"):
+                try:
+                    payload = self._query_candles(path, parse_qs(query_string))
+                except ValueError as e:
+                    await self._write_json(writer, {"error": str(e)}, "400 Bad Request")
+                else:
+                    await self._write_json(writer, payload)
+            elif path == "/health":
+                await self._write_json(writer, self.health())
+            elif path == "/metrics":
+                await self._write_response(
+                    writer,
+                    "200 OK",
+                    metrics.render_prometheus().encode(),
+                    "text/plain; version=0.0.4; charset=utf-8",
+                )
+            else:
+                await self._write_json(writer, {"error": "not found"}, "404 Not Found")
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """启动 HTTP 服务与轮询循环，直到被取消"""
+        self._server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, backlog=1024
+        )
+        log.info("守护进程已启动", url=f"http://{self.host}:{self.port}/events")
+        async with self._server:
+            await asyncio.gather(self._server.serve_forever(), self.poll_loop())
+
+
+def run_server(service, config, host: Optional[str] = None, port: Optional[int] = None):
+    """以无界面模式运行守护进程（阻塞）"""
+    server = TickServer(
+        service,
+        create_poll_scheduler(config),
+        host=host or config.get("serve_host"),
+        port=port or config.get("serve_port"),
+        buffer_size=int(config.get("subscriber_buffer") or 32),
+    )
+    watcher = ConfigWatcher(
+        config, interval=float(config.get("config_watch_interval") or 0)
+    )
+
+    async def main():
+        loop = asyncio.get_running_loop()
+
+        def on_config_changed(old, new, changed):
+            # 在监视线程中调用：调度器只在事件循环中修改
+            if "update_interval" in changed:
+                loop.call_soon_threadsafe(
+                    server.scheduler.set_interval, new.update_interval
+                )
+            if changed & LOG_KEYS:
+                get_log_manager().configure(new)
+
+        config.subscribe(on_config_changed)
+        watcher.start()
+        try:
+            await server.serve()
+        finally:
+            watcher.stop()
+            if service.channel is not None:
+                service.channel.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n守护进程已停止")
@@ -3,184 +3,424 @@
 集成现有的金价数据源，为状态栏应用提供数据支持
 """
 
-from typing import Optional, Dict, Any
+import asyncio
+import os
+import time
+from typing import Callable, Optional, Dict, Any
 from datetime import datetime
 
-from client import client
+from cache import EXPIRED, CachedTick, PriceCache
+from candles import create_candle_aggregator
+from client import (
+    BASE_URL,
+    CLOSED,
+    CircuitBreaker,
+    CircuitOpenError,
+    create_price_fetcher,
+)
 from config import get_app_config
+from history import TickHistory
+from indicators import create_indicator_set
+from log import get_log_manager, get_logger
+from metrics import metrics
+from pipeline import TickDiffer
+from shm import SharedTickChannel, create_shared_channel
+from store import TickStore
+from tick import PriceTick, format_cents
+
+
+log = get_logger("service")
 
 
 class GoldPriceService:
-    """金价服务类"""
+    """
+    金价服务类
 
-    def __init__(self):
+    Args:
+        config: 配置（AppConfig 或快照），默认读取全局配置
+        clock: 虚拟时钟（返回 epoch 秒），回放时替代系统时钟；为 None 时使用系统时钟
+        price_fetcher: 替代上游的数据源（如回放），默认按配置创建对冲抓取器
+    """
+
+    def __init__(
+        self,
+        config=None,
+        clock: Optional[Callable[[], float]] = None,
+        price_fetcher=None,
+    ):
+        self.clock = clock or time.time
         self.last_price = None
         self.last_update_time = None
-        self.error_count = 0
-        self.max_error_count = 3
-        # 读取网络超时/重试配置并应用到 JD 客户端
-        try:
+        self.timeout = 10
+        self.retries = 1
+        self.retry_delay = 0.5
+        # singleflight：正在进行的上游请求
+        self._inflight: Optional[asyncio.Future] = None
+        self.coalesced_requests = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+        if config is None:
             config = get_app_config()
-            client.api_client.timeout = int(config.get("network_timeout") or 10)
+        # stale-while-revalidate 缓存：新鲜期内不请求，容忍窗口内返回旧值并后台刷新
+        self.cache = PriceCache(
+            ttl=float(config.get("cache_ttl") or 0),
+            stale_window=float(config.get("cache_stale_window") or 0),
+            clock=clock or time.monotonic,
+        )
+        self.history = TickHistory(
+            capacity=int(config.get("history_capacity") or 86400),
+            windows=config.get("rolling_windows") or (),
+        )
+        self.indicators = create_indicator_set(config)
+        self.candles = create_candle_aggregator(config)
+        self.differ = TickDiffer()
+        self.store = self._open_store(config)
+        self._replay_store()
+        # 本机多进程共享最新 tick：只有选举出的主进程请求上游，其余进程读共享内存
+        self.channel: Optional[SharedTickChannel] = create_shared_channel(config)
+        self.shared_max_age = float(config.get("shared_tick_max_age") or 0)
+        self._leading: Optional[bool] = None
+        self._shared_seq = None
+        # 读取网络超时/重试配置
+        try:
+            self.timeout = int(config.get("network_timeout") or 10)
+            self.retries = max(int(config.get("fetch_retries") or 0), 0)
+            self.retry_delay = float(config.get("fetch_retry_delay") or 0)
         except Exception:
             pass
-
-    def _format_price_to_decimal(self, price_str: str) -> str:
+        if price_fetcher is not None:
+            self.price_fetcher = price_fetcher
+            self.breaker = price_fetcher.breaker
+            return
+        # 上游健康状态只由熔断器维护：连续失败后直接拒绝请求，到期后单个请求探测恢复
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(config.get("max_error_count") or 3),
+            reset_timeout=float(config.get("error_retry_delay") or 0),
+            max_reset_timeout=float(config.get("circuit_max_reset_timeout") or 0),
+        )
+        # 每个网关按实际延迟自适应超时，network_timeout 作为上限
+        self.price_fetcher = create_price_fetcher(
+            config.get("price_provider_urls") or [BASE_URL],
+            timeout=self.timeout,
+            adaptive_timeout=bool(config.get("adaptive_timeout")),
+            fast_decode=bool(config.get("fast_decode")),
+            default_hedge_delay=float(config.get("hedge_delay") or 0.3),
+            breaker=self.breaker,
+        )
+
+    async def _fetch_with_retry(self):
+        """在事件循环中抓取金价，超时与重试均以任务方式执行；熔断打开时不再重试"""
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.price_fetcher.fetch(timeout=self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except CircuitOpenError:
+                # 重试途中熔断打开：报告导致熔断的那次错误
+                if last_error is None:
+                    raise
+                break
+            except Exception as e:
+                last_error = e
+                if attempt < self.retries and self.retry_delay > 0:
+                    await asyncio.sleep(self.retry_delay)
+        raise last_error
+
+    async def get_latest_gold_price(
+        self, max_staleness_ms: Optional[float] = None
+    ) -> Optional[PriceTick]:
         """
-        将价格字符串格式化为2位小数
+        获取最新金价信息（需在抓取引擎的事件循环中 await）
+
+        并发调用会合并为同一个上游请求（singleflight），所有调用方拿到同一个结果。
 
         Args:
-            price_str: 价格字符串
+            max_staleness_ms: 可接受的缓存最大年龄（毫秒）；最近一次成功抓取
+                在该时间内时直接返回缓存，不发起请求。为 None 时总是请求
 
         Returns:
-            str: 格式化后的价格字符串，保持2位小数
+            PriceTick: 金价 tick，失败时返回 None
         """
-        try:
-            price_float = float(price_str)
-            return f"{price_float:.2f}"
-        except (ValueError, TypeError):
-            return "0.00"
-
-    def get_latest_gold_price(self) -> Optional[Dict[str, Any]]:
+        if max_staleness_ms is not None:
+            cached = self.cache.peek()
+            if cached is not None and cached.age * 1000 <= max_staleness_ms:
+                self.stale_hits += 1
+                metrics.inc("stale_hits_total")
+                return cached.tick
+
+        inflight = self._inflight
+        if inflight is not None and not inflight.done():
+            self.coalesced_requests += 1
+            metrics.inc("coalesced_requests_total")
+        else:
+            inflight = asyncio.ensure_future(self._fetch_latest_gold_price())
+            self._inflight = inflight
+        # shield：单个调用方被取消（如外层超时）不会取消其他调用方共享的请求
+        return await asyncio.shield(inflight)
+
+    async def get_price(self) -> Optional[CachedTick]:
         """
-        获取最新金价信息
+        按 stale-while-revalidate 规则读取金价（需在事件循环中 await）
+
+        新鲜期内直接返回缓存；容忍窗口内返回旧值并触发一次后台刷新；
+        无缓存或超出容忍窗口时等待上游请求，失败返回 None（调用方进入错误状态）。
 
         Returns:
-            Dict: 包含金价信息的字典，失败时返回 None
+            CachedTick: 带年龄与状态的 tick
         """
+        cached = self.cache.lookup()
+        if cached is not None:
+            if not cached.is_fresh:
+                self._revalidate()
+            return cached
+
+        tick = await self.get_latest_gold_price()
+        if tick is None:
+            return None
+        return self.cache.peek()
+
+    def _revalidate(self):
+        """后台刷新缓存；已有进行中的请求时不重复发起"""
+        inflight = self._inflight
+        if inflight is not None and not inflight.done():
+            return
+        self._inflight = asyncio.ensure_future(self._fetch_latest_gold_price())
+        self.revalidations += 1
+        metrics.inc("revalidations_total")
+
+    def _elect(self) -> bool:
+        """本进程是否负责请求上游（未启用共享通道时总是）"""
+        channel = self.channel
+        if channel is None:
+            return True
+        leading = channel.elect()
+        if leading != self._leading:
+            if leading and self._leading is not None and self.store is not None:
+                # 从进程接替：先读入前任主进程追加的记录，再继续写入
+                self.store.refresh()
+            self._leading = leading
+        return leading
+
+    def _read_shared(self) -> Optional[PriceTick]:
+        """
+        从进程：读取主进程发布的最新 tick，新的 tick 同样写入历史/指标/K 线
+
+        缓存年龄从主进程写入时算起，而不是从本进程读到时算起。
+        """
+        shared = self.channel.read()
+        if shared is None:
+            metrics.inc("errors_total", type="SharedTickMissing")
+            return None
+        age = shared.age
+        if self.shared_max_age and age > self.shared_max_age:
+            # 主进程仍持有锁但长时间没有发布（上游故障、进程卡住或休市时轮询间隔较长）
+            metrics.inc("errors_total", type="SharedTickStale")
+            return None
+        tick = shared.tick
+        if shared.seq != self._shared_seq:
+            self._shared_seq = shared.seq
+            self._record_tick(tick)
+        self.last_price = tick
+        self.last_update_time = datetime.fromtimestamp(tick.receive_ms / 1000)
+        self.cache.put(tick, age=age)
+        return tick
+
+    async def _fetch_latest_gold_price(self) -> Optional[PriceTick]:
+        """实际的上游抓取；缓存只在这里修改"""
+        if not self._elect():
+            tick = self._read_shared()
+            if tick is not None:
+                return tick
+            # 共享 tick 缺失或过旧：本次直接请求上游（从进程不发布、不写 tick 存储）
+            log.debug("共享 tick 不可用，直接请求上游")
         try:
-            # 调用现有的金价获取接口
-            gold_data = client.get_latest_gold_price()
+            # 调用异步金价获取接口
+            with metrics.timer("fetch"):
+                gold_data = await self._fetch_with_retry()
 
             if gold_data:
-                price_info = {
-                    "price": str(gold_data.price),
-                    "yesterday_price": str(gold_data.yesterdayPrice),
-                    "up_and_down_rate": str(gold_data.upAndDownRate),
-                    "up_and_down_amt": str(gold_data.upAndDownAmt),
-                    "time": str(gold_data.time),
-                    "product_sku": str(gold_data.productSku),
-                    "update_time": datetime.now().strftime("%H:%M:%S"),
-                }
+                # 上游字段只在这里解析一次
+                now = self.clock()
+                tick = PriceTick.from_data(gold_data, receive_ms=int(now * 1000))
+
+                # 写入历史记录
+                self._record_tick(tick)
 
                 # 更新缓存
-                self.last_price = price_info
-                self.last_update_time = datetime.now()
-                self.error_count = 0  # 重置错误计数
+                self.last_price = tick
+                self.last_update_time = datetime.fromtimestamp(now)
+                self.cache.put(tick)
+                if self.channel is not None:
+                    self.channel.publish(tick)
 
-                return price_info
+                return tick
             else:
-                self.error_count += 1
+                metrics.inc("errors_total", type="EmptyData")
                 return None
 
+        except CircuitOpenError as e:
+            # 熔断期间不请求上游，拒绝次数已计入指标，不逐次记录错误日志
+            log.debug("上游熔断中，跳过抓取", retry_after=round(e.retry_after, 1))
+            return None
         except Exception as e:
-            print(f"获取金价失败: {e}")
-            self.error_count += 1
+            log.error("获取金价失败", error=e, type=type(e).__name__)
+            metrics.inc("errors_total", type=type(e).__name__)
             return None
 
-    def get_cached_price(self) -> Optional[Dict[str, Any]]:
+    def _open_store(self, config) -> Optional[TickStore]:
+        """打开磁盘 tick 存储，失败时降级为仅内存"""
+        if not config.get("enable_tick_store"):
+            return None
+        path = config.get("tick_store_path")
+        if not path:
+            return None
+        try:
+            return TickStore(
+                os.path.expanduser(path),
+                flush_interval=float(config.get("tick_store_flush_interval") or 0),
+            )
+        except Exception as e:
+            log.error("打开 tick 存储失败", path=path, error=e)
+            return None
+
+    def _replay_store(self):
+        """启动时将最近的持久化 tick 回放到内存历史中"""
+        if self.store is None:
+            return
+        try:
+            for upstream_time, price, _, _, receive_time in self.store.tail(
+                self.history.capacity
+            ):
+                self.history.append(price, upstream_time, receive_time)
+                self.candles.update(upstream_time / 1000, price)
+            # 指标只需价格序列，批量重建而不是逐个回放
+            self.indicators.rebuild(self.history.prices())
+        except Exception as e:
+            log.error("回放 tick 存储失败", error=e)
+
+    def _record_tick(self, tick: PriceTick):
+        """将 tick 写入环形历史缓冲区和磁盘存储"""
+        receive_time = tick.receive_ms / 1000
+        price = tick.price
+        self.history.append(price, tick.time_ms, receive_time)
+        self.indicators.update(price)
+        # K 线按上游时间聚合
+        self.candles.update(tick.time_ms / 1000, price)
+
+        # 多个进程共用存储文件时只有主进程写入
+        if self.store is not None and self._leading is not False:
+            try:
+                self.store.append(
+                    tick.time_ms,
+                    price,
+                    tick.yesterday_price,
+                    tick.change_cents / 100,
+                    receive_time,
+                )
+            except Exception as e:
+                log.error("写入 tick 存储失败", error=e)
+
+    def diff_tick(self, tick: PriceTick) -> Optional[Dict[str, Any]]:
+        """
+        与上次发布的 tick 比较
+
+        Returns:
+            Dict: 变化的字段；上游数据未变化时返回 None
+        """
+        changes = self.differ.diff(tick)
+        if changes is None:
+            metrics.inc("dedup_hits_total")
+        return changes
+
+    def get_cached_price(self) -> Optional[CachedTick]:
         """
-        获取缓存的金价信息
+        获取缓存的金价信息（不发起请求）
 
         Returns:
-            Dict: 缓存的金价信息，如果没有缓存则返回 None
+            CachedTick: 带年龄的缓存 tick；没有缓存或已超出容忍窗口时返回 None
         """
-        return self.last_price
+        cached = self.cache.peek()
+        if cached is None or cached.state == EXPIRED:
+            return None
+        return cached
 
     def is_service_healthy(self) -> bool:
         """
-        检查服务是否健康
+        检查服务是否健康（熔断器处于 closed 状态）
 
         Returns:
             bool: 服务是否健康
         """
-        return self.error_count < self.max_error_count
+        return self.breaker.state == CLOSED
 
-    def format_price_display(self, price_info: Dict[str, Any]) -> str:
+    def format_price_display(self, tick: Optional[PriceTick]) -> str:
         """
         格式化金价显示文本
 
         Args:
-            price_info: 金价信息字典
+            tick: 金价 tick
 
         Returns:
             str: 格式化后的显示文本
         """
-        if not price_info:
+        if not tick:
             return "金价获取失败"
 
         try:
-            price = price_info.get("price", "0")
-            rate = price_info.get("up_and_down_rate", "0%")
-            price_info.get("up_and_down_amt", "0")
-
-            # 确保金价保持2位小数
-            formatted_price = self._format_price_to_decimal(price)
-
-            # 判断涨跌
-            if rate.startswith("+") or (
-                rate.replace("%", "").replace(".", "").replace("-", "").isdigit()
-                and float(rate.replace("%", "")) > 0
-            ):
-                trend_icon = "📈"
-            elif rate.startswith("-") or (
-                rate.replace("%", "").replace(".", "").replace("-", "").isdigit()
-                and float(rate.replace("%", "")) < 0
-            ):
-                trend_icon = "📉"
-            else:
-                trend_icon = "➖"
-
-            return f"{trend_icon} {formatted_price}"
+            with metrics.timer("format"):
+                return tick.title_text()
 
         except Exception as e:
-            print(f"格式化金价显示失败: {e}")
+            log.error("格式化金价显示失败", error=e)
             return "金价格式错误"
 
-    def get_detailed_info(self, price_info: Dict[str, Any]) -> str:
+    def get_detailed_info(self, tick: Optional[PriceTick]) -> str:
         """
         获取详细的金价信息
 
         Args:
-            price_info: 金价信息字典
+            tick: 金价 tick
 
         Returns:
             str: 详细信息文本
         """
-        if not price_info:
+        if not tick:
             return "暂无金价数据"
 
         try:
-            price = price_info.get("price", "0")
-            yesterday_price = price_info.get("yesterday_price", "0")
-            rate = price_info.get("up_and_down_rate", "0%")
-            amt = price_info.get("up_and_down_amt", "0")
-            update_time = price_info.get("update_time", "")
-
-            # 确保所有金价相关数值保持2位小数
-            formatted_price = self._format_price_to_decimal(price)
-            formatted_yesterday_price = self._format_price_to_decimal(yesterday_price)
-            formatted_amt = self._format_price_to_decimal(amt)
-
-            detail_text = f"""当前金价: ¥{formatted_price}
-昨日收盘: ¥{formatted_yesterday_price}
-涨跌幅: {rate}
-涨跌额: ¥{formatted_amt}
-更新时间: {update_time}"""
+            detail_text = f"""当前金价: ¥{format_cents(tick.price_cents)}
+昨日收盘: ¥{format_cents(tick.yesterday_cents)}
+涨跌幅: {tick.rate_text()}
+涨跌额: ¥{format_cents(tick.change_cents)}"""
+
+            # 当日最高/最低/振幅由历史缓冲区增量维护，无需额外计算
+            session = self.history.session_stats()
+            if session:
+                detail_text += f"""
+今日最高: ¥{session["high"]:.2f}
+今日最低: ¥{session["low"]:.2f}
+今日振幅: ¥{session["range"]:.2f}"""
+
+            # 均线/布林带/RSI 随 tick 增量维护，这里只读取当前值
+            for line in self.indicators.format_lines():
+                detail_text += f"\n{line}"
+
+            detail_text += f"\n更新时间: {tick.update_time_text()}"
 
             return detail_text
 
         except Exception as e:
-            print(f"获取详细信息失败: {e}")
+            log.error("获取详细信息失败", error=e)
             return "详细信息获取失败"
 
     def reset_error_count(self):
-        """重置错误计数"""
-        self.error_count = 0
+        """重置熔断器，下一次抓取直接请求上游"""
+        self.breaker.reset()
 
 
-# 创建全局服务实例
-gold_price_service = GoldPriceService()
+# 全局服务实例（首次获取时创建：打开 tick 存储并建立 HTTP 连接池）
+gold_price_service: Optional[GoldPriceService] = None
 
 
 def get_gold_price_service() -> GoldPriceService:
@@ -190,18 +430,38 @@ def get_gold_price_service() -> GoldPriceService:
     Returns:
         GoldPriceService: 金价服务实例
     """
+    global gold_price_service
+    if gold_price_service is None:
+        gold_price_service = GoldPriceService()
     return gold_price_service
 
 
 if __name__ == "__main__":
-    # 测试代码
+    import argparse
+
+    parser = argparse.ArgumentParser(description="金价服务")
+    parser.add_argument(
+        "--serve", action="store_true", help="以无界面守护进程运行并通过 HTTP 分发 tick"
+    )
+    parser.add_argument("--host", help="守护进程监听地址")
+    parser.add_argument("--port", type=int, help="守护进程监听端口")
+    args = parser.parse_args()
+
+    get_log_manager().configure()
     service = get_gold_price_service()
-    price_info = service.get_latest_gold_price()
 
-    if price_info:
-        print("金价获取成功:")
-        print(service.format_price_display(price_info))
-        print("\n详细信息:")
-        print(service.get_detailed_info(price_info))
+    if args.serve:
+        from server import run_server
+
+        run_server(service, get_app_config(), host=args.host, port=args.port)
     else:
-        print("金价获取失败")
+        # 测试代码
+        tick = asyncio.run(service.get_latest_gold_price())
+
+        if tick:
+            print("金价获取成功:")
+            print(service.format_price_display(tick))
+            print("\n详细信息:")
+            print(service.get_detailed_info(tick))
+        else:
+            print("金价获取失败")
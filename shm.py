@@ -0,0 +1,408 @@
+"""
+共享内存 tick 通道
+本机多个进程（状态栏应用、终端小组件、交易脚本）共享同一份最新 tick：
+只有主进程轮询上游并把 tick 写入 multiprocessing.shared_memory 段，其余进程直接读取，
+不经过 socket、不做序列化，读取一次只需几微秒。
+
+段布局固定（小端）：
+    0   8s  magic        b"GOLDSHM1"
+    8   I   version
+    12  I   payload 大小
+    16  Q   seq          seqlock 序号，奇数表示正在写入，0 表示尚未发布
+    24  ... payload      PriceTick 字段 + 发布时间 + 主进程 pid + 发布次数
+    ... I   crc32        payload 的校验和
+
+写入方（唯一的主进程）先把 seq 加一变为奇数，写 payload 与校验和，再加一变为偶数；
+读取方取 seq → 复制 payload → 再取 seq，两次相同且为偶数、校验和一致才采用，否则重试。
+Python 无法插入内存屏障，校验和用于在弱内存序的 CPU（如 Apple Silicon）上识别撕裂读取。
+
+主进程选举使用锁文件上的 flock：持有锁的进程负责轮询，进程退出时锁由内核自动释放，
+其余进程在下一次轮询时争抢，先拿到锁的成为新的主进程。
+
+读取库只依赖标准库与 tick 模块，外部脚本可直接使用：
+
+    from shm import SharedTickReader
+    shared = SharedTickReader().read()
+    if shared is not None:
+        print(shared.tick.price, shared.age)
+"""
+
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+
+from log import get_logger
+from tick import PriceTick
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+log = get_logger("shm")
+
+DEFAULT_NAME = "gold_panel_tick"
+DEFAULT_LOCK_PATH = "~/.gold-panel/leader.lock"
+
+MAGIC = b"GOLDSHM1"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+SEQ = struct.Struct("<Q")
+# 价格(分)、昨收(分)、涨跌额(分)、涨跌幅、上游时间(ms)、接收时间(ms)、SKU、
+# 发布时间(epoch 秒)、主进程 pid、发布次数
+PAYLOAD = struct.Struct("<qqqdqq16sdqq")
+CRC = struct.Struct("<I")
+
+SEQ_OFFSET = HEADER.size
+PAYLOAD_OFFSET = SEQ_OFFSET + SEQ.size
+CRC_OFFSET = PAYLOAD_OFFSET + PAYLOAD.size
+SEGMENT_SIZE = CRC_OFFSET + CRC.size
+
+READ_SPINS = 64
+
+
+class SharedTick(NamedTuple):
+    """从共享内存读到的一致快照"""
+
+    tick: PriceTick
+    seq: int
+    published_at: float  # 主进程写入时间（epoch 秒）
+    leader_pid: int
+    published: int  # 主进程累计发布次数
+
+    @property
+    def age(self) -> float:
+        """距主进程写入的秒数"""
+        return max(time.time() - self.published_at, 0.0)
+
+
+def _open_segment(name: str, create: bool):
+    """
+    打开共享内存段，并让它在本进程退出后继续存在
+
+    resource_tracker 会在进程退出时删除登记过的段（3.13 之前连附加的段也会登记），
+    主进程切换时读者与新主进程仍要使用同一个段，因此取消登记。
+    """
+    from multiprocessing import shared_memory
+
+    size = SEGMENT_SIZE if create else 0
+    try:
+        return shared_memory.SharedMemory(name, create=create, size=size, track=False)
+    except TypeError:
+        pass
+    segment = shared_memory.SharedMemory(name, create=create, size=size)
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def unlink_segment(name: str = DEFAULT_NAME) -> bool:
+    """删除共享内存段（所有进程都已退出后清理用）"""
+    from multiprocessing import shared_memory
+
+    # 正常附加（登记到 resource_tracker），unlink 时会同时取消登记
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    segment.unlink()
+    return True
+
+
+class SharedTickWriter:
+    """写入方：同一时刻只能有一个（由 LeaderLock 保证）"""
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        self.name = name
+        try:
+            self.segment = _open_segment(name, create=True)
+            HEADER.pack_into(self.segment.buf, 0, MAGIC, VERSION, PAYLOAD.size)
+            SEQ.pack_into(self.segment.buf, SEQ_OFFSET, 0)
+        except FileExistsError:
+            self.segment = _open_segment(name, create=False)
+            magic, version, size = HEADER.unpack_from(self.segment.buf, 0)
+            if (magic, version, size) != (MAGIC, VERSION, PAYLOAD.size):
+                # 旧版本或被其他程序占用的段：重写头部，读者按新布局读取
+                log.warning("共享内存段布局不匹配，重新初始化", name=name)
+                HEADER.pack_into(self.segment.buf, 0, MAGIC, VERSION, PAYLOAD.size)
+                SEQ.pack_into(self.segment.buf, SEQ_OFFSET, 0)
+        self.buf = self.segment.buf
+        # 接替的主进程可能在写入中途退出，序号停在奇数：从下一个偶数继续
+        seq = SEQ.unpack_from(self.buf, SEQ_OFFSET)[0]
+        self.seq = seq + (seq & 1)
+        self.pid = os.getpid()
+        self.published = 0
+
+    def publish(self, tick: PriceTick):
+        buf = self.buf
+        seq = self.seq + 1
+        SEQ.pack_into(buf, SEQ_OFFSET, seq)
+        self.published += 1
+        PAYLOAD.pack_into(
+            buf,
+            PAYLOAD_OFFSET,
+            tick.price_cents,
+            tick.yesterday_cents,
+            tick.change_cents,
+            tick.rate,
+            tick.time_ms,
+            tick.receive_ms,
+            tick.product_sku.encode()[:16],
+            time.time(),
+            self.pid,
+            self.published,
+        )
+        CRC.pack_into(buf, CRC_OFFSET, zlib.crc32(buf[PAYLOAD_OFFSET:CRC_OFFSET]))
+        self.seq = seq + 1
+        SEQ.pack_into(buf, SEQ_OFFSET, self.seq)
+
+    def close(self):
+        """只关闭本进程的映射，不删除段"""
+        self.buf = None
+        self.segment.close()
+
+
+class SharedTickReader:
+    """
+    读取方（可在任意进程中使用）
+
+    段尚不存在时 read() 返回 None，下次调用时重新尝试附加。
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME):
+        self.name = name
+        self.segment = None
+        self.retries = 0
+
+    def _attach(self) -> bool:
+        if self.segment is not None:
+            return True
+        try:
+            segment = _open_segment(self.name, create=False)
+        except FileNotFoundError:
+            return False
+        if len(segment.buf) < SEGMENT_SIZE:
+            segment.close()
+            return False
+        self.segment = segment
+        return True
+
+    def read(self) -> Optional[SharedTick]:
+        """
+        读取最新 tick 的一致快照
+
+        Returns:
+            SharedTick: 尚未发布、段不存在或持续读到撕裂数据时返回 None
+        """
+        if not self._attach():
+            return None
+        buf = self.segment.buf
+        for _ in range(READ_SPINS):
+            seq = SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if seq == 0:
+                return None
+            if seq & 1:
+                self.retries += 1
+                continue
+            magic, version, size = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC or version != VERSION or size != PAYLOAD.size:
+                return None
+            data = bytes(buf[PAYLOAD_OFFSET:SEGMENT_SIZE])
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] != seq:
+                self.retries += 1
+                continue
+            if CRC.unpack_from(data, PAYLOAD.size)[0] != zlib.crc32(
+                data[: PAYLOAD.size]
+            ):
+                self.retries += 1
+                continue
+            (
+                price,
+                yesterday,
+                change,
+                rate,
+                time_ms,
+                receive_ms,
+                sku,
+                published_at,
+                pid,
+                published,
+            ) = PAYLOAD.unpack_from(data)
+            tick = PriceTick(
+                price,
+                yesterday,
+                change,
+                rate,
+                time_ms,
+                sku.rstrip(b"\0").decode(errors="replace"),
+                receive_ms,
+            )
+            return SharedTick(tick, seq, published_at, pid, published)
+        return None
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+
+class LeaderLock:
+    """
+    基于 flock 的主进程选举
+
+    锁随打开的文件描述符存在，持有者退出（包括崩溃）时由内核释放。
+    没有 fcntl 的平台（Windows）上总是成为主进程，即每个进程各自轮询。
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCK_PATH):
+        self.path = os.path.expanduser(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """非阻塞地尝试获取锁，已持有时直接返回 True"""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # 记录 pid，便于排查是哪个进程在轮询
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None or fd < 0:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class SharedTickChannel:
+    """
+    服务使用的共享 tick 通道：选举、发布与读取
+
+    Args:
+        name: 共享内存段名称
+        lock_path: 选举锁文件路径
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME, lock_path: str = DEFAULT_LOCK_PATH):
+        self.name = name
+        self.lock = LeaderLock(lock_path)
+        self.reader = SharedTickReader(name)
+        self.writer: Optional[SharedTickWriter] = None
+        self.elections = 0
+
+    @property
+    def is_leader(self) -> bool:
+        return self.writer is not None
+
+    def elect(self) -> bool:
+        """
+        每次轮询前调用：本进程是否负责请求上游
+
+        非主进程每次都尝试获取锁（一次非阻塞系统调用），主进程退出后由最先轮询的进程接替。
+        """
+        if self.writer is not None:
+            return True
+        if not self.lock.acquire():
+            return False
+        try:
+            self.writer = SharedTickWriter(self.name)
+        except Exception as e:
+            # 无法创建共享内存时仍作为主进程轮询，只是不向其他进程发布
+            log.error("打开共享内存失败", name=self.name, error=e)
+            return True
+        self.elections += 1
+        log.info("成为主进程，开始轮询上游", pid=os.getpid())
+        return True
+
+    def publish(self, tick: PriceTick):
+        if self.writer is not None:
+            self.writer.publish(tick)
+
+    def read(self) -> Optional[SharedTick]:
+        return self.reader.read()
+
+    def close(self):
+        """退出前释放主进程身份，其他进程可立即接替"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.reader.close()
+        self.lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leader": self.lock.held,
+            "elections": self.elections,
+            "published": self.writer.published if self.writer is not None else 0,
+            "read_retries": self.reader.retries,
+        }
+
+
+def create_shared_channel(config) -> Optional[SharedTickChannel]:
+    """根据配置创建共享 tick 通道；shared_tick 关闭时返回 None（每个进程各自轮询）"""
+    if not config.get("shared_tick"):
+        return None
+    return SharedTickChannel(
+        name=config.get("shared_tick_name") or DEFAULT_NAME,
+        lock_path=config.get("leader_lock_path") or DEFAULT_LOCK_PATH,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="读取共享内存中的最新金价")
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--watch", action="store_true", help="持续打印新的 tick")
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    reader = SharedTickReader(args.name)
+    last_seq = None
+    try:
+        while True:
+            shared = reader.read()
+            if shared is None:
+                if not args.watch:
+                    print("共享内存中没有 tick（主进程未运行或尚未获取到金价）")
+                    raise SystemExit(1)
+            elif shared.seq != last_seq:
+                last_seq = shared.seq
+                payload = shared.tick.to_dict()
+                payload.update(
+                    age=round(shared.age, 3),
+                    leader_pid=shared.leader_pid,
+                    seq=shared.seq,
+                )
+                print(json.dumps(payload, ensure_ascii=False))
+            if not args.watch:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
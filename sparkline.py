@@ -0,0 +1,339 @@
+"""
+走势图渲染模块
+状态栏的日内迷你走势图与下拉菜单中的大图。图像绘制在可复用的 RGBA 像素缓冲区中，
+用标准库 zlib 编码为 PNG，不依赖 AppKit，可在 Linux 上无界面运行并按字节比较输出。
+
+走势图只使用已收盘的 1 分钟 K 线：正在形成的 K 线不参与绘制，因此只有新 K 线收盘
+（或当日切换）时才需要重新取数；取数后数值范围与内容都未变化时复用上一次的图像。
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from candles import DAY, MINUTE, CandleAggregator, lttb
+
+Color = Tuple[int, int, int, int]
+
+UP_COLOR: Color = (52, 199, 89, 255)  # 绿色：高于当日首个价格
+DOWN_COLOR: Color = (255, 59, 48, 255)  # 红色：低于当日首个价格
+FLAT_COLOR: Color = (142, 142, 147, 255)
+FILL_ALPHA = 56  # 曲线下方填充的不透明度
+
+
+def pack_color(color: Color) -> int:
+    """RGBA 打包为小端 32 位整数，按字节写出即为 R、G、B、A 顺序"""
+    r, g, b, a = color
+    return r | g << 8 | b << 16 | a << 24
+
+
+class PixelBuffer:
+    """
+    RGBA 像素缓冲区（每个像素一个 32 位整数）
+
+    创建时一次性分配，clear() 原地清空，重复绘制不产生新的缓冲区。
+    纵向填充用步长为宽度的切片赋值完成，一列只需一次操作。
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels = array("I", bytes(4 * width * height))
+        self._blank = array("I", bytes(4 * width * height))
+        # 纵向填充用的常量列，按颜色缓存
+        self._columns: Dict[int, array] = {}
+
+    def clear(self):
+        self.pixels[:] = self._blank
+
+    def set(self, x: int, y: int, value: int):
+        """写入一个已打包的像素（越界忽略）"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.pixels[y * self.width + x] = value
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: Color, width: int = 1):
+        """Bresenham 直线，width > 1 时纵向加粗"""
+        value = pack_color(color)
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            for k in range(width):
+                self.set(x0, y0 + k, value)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    def fill_column(self, x: int, y0: int, color: Color):
+        """将第 x 列从 y0 到底部填充为 color（覆盖写入）"""
+        if not 0 <= x < self.width:
+            return
+        y0 = max(y0, 0)
+        count = self.height - y0
+        if count <= 0:
+            return
+        value = pack_color(color)
+        column = self._columns.get(value)
+        if column is None:
+            column = self._columns[value] = array("I", [value]) * self.height
+        self.pixels[y0 * self.width + x :: self.width] = column[:count]
+
+    def to_png(self) -> bytes:
+        """编码为 PNG（8 位 RGBA，无滤波）；相同像素得到相同字节"""
+        data = self.pixels
+        if sys.byteorder != "little":
+            data = array("I", data)
+            data.byteswap()
+        pixels = data.tobytes()
+        stride = self.width * 4
+        raw = b"".join(
+            b"\x00" + pixels[y * stride : (y + 1) * stride] for y in range(self.height)
+        )
+
+        def chunk(kind: bytes, body: bytes) -> bytes:
+            return (
+                struct.pack(">I", len(body))
+                + kind
+                + body
+                + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+            )
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b"")
+        )
+
+
+class ChartStyle(NamedTuple):
+    """图像尺寸（逻辑点）与绘制参数"""
+
+    width: int
+    height: int
+    scale: int = 2  # Retina 屏按 2 倍像素绘制
+    line_width: int = 1
+    fill: bool = True
+    padding: int = 1
+
+
+SPARKLINE_STYLE = ChartStyle(width=40, height=16, line_width=2, fill=False)
+CHART_STYLE = ChartStyle(width=240, height=80, line_width=2, fill=True, padding=2)
+
+
+class ChartRenderer:
+    """在同一个像素缓冲区上反复绘制折线走势图"""
+
+    def __init__(self, style: ChartStyle):
+        self.style = style
+        self.buffer = PixelBuffer(style.width * style.scale, style.height * style.scale)
+        self.renders = 0
+
+    @property
+    def points(self) -> int:
+        """折线点数上限（每个像素列一个点）"""
+        return self.buffer.width
+
+    def render(self, values: Sequence[float], low: float, high: float) -> bytes:
+        """
+        绘制走势图并返回 PNG 字节
+
+        Args:
+            values: 按时间顺序的价格，横向均匀分布
+            low: 纵轴下限
+            high: 纵轴上限
+        """
+        buf = self.buffer
+        style = self.style
+        buf.clear()
+        self.renders += 1
+        if not values:
+            return buf.to_png()
+
+        first, last = values[0], values[-1]
+        color = UP_COLOR if last > first else DOWN_COLOR if last < first else FLAT_COLOR
+        fill = color[:3] + (FILL_ALPHA,)
+
+        pad = style.padding * style.scale
+        lw = style.line_width
+        w = buf.width - 1
+        h = buf.height - 1 - 2 * pad - (lw - 1)
+        span = (high - low) or 1.0
+        n = len(values)
+
+        def xy(i, v):
+            x = round(i * w / (n - 1)) if n > 1 else w // 2
+            y = pad + round((high - v) * h / span)
+            return x, y
+
+        prev = xy(0, values[0])
+        if n == 1:
+            buf.line(0, prev[1], w, prev[1], color, lw)
+            return buf.to_png()
+        for i in range(1, n):
+            cur = xy(i, values[i])
+            if style.fill:
+                # 曲线下方的半透明填充（先于折线绘制，折线覆盖在其上）
+                for x in range(prev[0], cur[0]):
+                    t = (x - prev[0]) / (cur[0] - prev[0])
+                    y = round(prev[1] + (cur[1] - prev[1]) * t) + lw
+                    buf.fill_column(x, y, fill)
+            buf.line(prev[0], prev[1], cur[0], cur[1], color, lw)
+            prev = cur
+        if style.fill:
+            buf.fill_column(prev[0], prev[1] + lw, fill)
+        return buf.to_png()
+
+
+class ChartImage(NamedTuple):
+    """一次渲染结果"""
+
+    png: bytes
+    path: Optional[str]  # 写入磁盘的路径（未配置目录时为 None）
+    size: Tuple[int, int]  # 逻辑尺寸（点），供状态栏/菜单缩放
+
+
+class ChartCache:
+    """
+    每个图表只保留最近一次的渲染结果，按内容复用
+
+    键为 (数值范围, 点数, 数值摘要)（价格按分取整）：内容与上次相同时不重绘、不写文件。
+    每个图表对应一个固定的 PNG 文件，新图像原子替换旧文件，目录中不会堆积历史图像。
+
+    Args:
+        directory: PNG 写入目录；rumps 的图标从文件加载，为 None 时只保存在内存中
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = os.path.expanduser(directory) if directory else None
+        self._entries: Dict[str, Tuple[tuple, ChartImage]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get_or_render(
+        self, name: str, renderer: ChartRenderer, values: Sequence[float]
+    ) -> ChartImage:
+        cents = array("q", [round(v * 100) for v in values])
+        low, high = (min(cents), max(cents)) if cents else (0, 0)
+        key = (low, high, len(cents), hashlib.sha1(cents.tobytes()).digest())
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        png = renderer.render(values, low / 100, high / 100)
+        path = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{name}.png")
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(png)
+            os.replace(tmp, path)
+            self.writes += 1
+        style = renderer.style
+        image = ChartImage(png, path, (style.width, style.height))
+        self._entries[name] = (key, image)
+        return image
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+
+class IntradayCharts:
+    """
+    由日内 1 分钟 K 线生成状态栏迷你图与菜单大图
+
+    update() 每个 tick 调用一次；只比较当前 K 线与当日的起始时间，未变化时直接返回 None，
+    不取数、不渲染。
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        sparkline_style: ChartStyle = SPARKLINE_STYLE,
+        chart_style: ChartStyle = CHART_STYLE,
+        resolution: int = MINUTE,
+    ):
+        self.resolution = resolution
+        self.sparkline = ChartRenderer(sparkline_style)
+        self.chart = ChartRenderer(chart_style)
+        self.cache = ChartCache(directory)
+        self._bucket: Optional[Tuple[float, float]] = None
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def _closed_closes(
+        self, candles: CandleAggregator, bucket: float, session: float
+    ) -> List[float]:
+        """当日已收盘 K 线的收盘价"""
+        closed = candles.candles(self.resolution, session, bucket)
+        return [c.close for c in closed]
+
+    def update(
+        self, candles: CandleAggregator
+    ) -> Optional[Tuple[ChartImage, ChartImage]]:
+        """
+        Returns:
+            (迷你图, 大图)；时间桶未变化或数据不足时返回 None
+        """
+        series = candles.series.get(self.resolution)
+        if series is None:
+            return None
+        current = series.last()
+        if current is None:
+            return None
+        bucket = current.start
+        # 当日起点取日 K 线的起始时间；未聚合日 K 线时取最近 24 小时
+        daily = candles.series.get(DAY)
+        today = daily.last() if daily is not None else None
+        session = today.start if today is not None else bucket - DAY
+
+        with self._lock:
+            if self._bucket == (bucket, session):
+                self.skipped += 1
+                return None
+            self._bucket = (bucket, session)
+
+            closes = self._closed_closes(candles, bucket, session)
+            if len(closes) < 2:
+                return None
+            xs = list(range(len(closes)))
+            spark_values = [y for _, y in lttb(xs, closes, self.sparkline.points)]
+            chart_values = [y for _, y in lttb(xs, closes, self.chart.points)]
+            return (
+                self.cache.get_or_render("sparkline", self.sparkline, spark_values),
+                self.cache.get_or_render("chart", self.chart, chart_values),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.cache.stats()
+        stats["renders"] = self.sparkline.renders + self.chart.renders
+        stats["skipped"] = self.skipped
+        return stats
+
+
+def create_intraday_charts(config) -> Optional[IntradayCharts]:
+    """根据配置创建走势图；show_sparkline 关闭时返回 None"""
+    if not config.get("show_sparkline"):
+        return None
+    return IntradayCharts(directory=config.get("chart_cache_dir"))
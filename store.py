@@ -0,0 +1,274 @@
+"""
+金价 tick 持久化存储模块
+定长二进制记录追加写入内存映射文件，按上游时间二分查找区间
+"""
+
+import mmap
+import os
+import struct
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from log import get_logger
+
+log = get_logger("store")
+
+MAGIC = b"GOLDTICK"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ")  # magic, version, record_size, count
+HEADER_SIZE = 64
+# 上游时间(ms)、价格、昨日收盘、涨跌额、接收时间(s)
+RECORD = struct.Struct("<qdddd")
+RECORD_SIZE = RECORD.size
+
+INITIAL_RECORDS = 4096
+MAX_GROW_RECORDS = 1 << 20
+
+Record = Tuple[int, float, float, float, float]
+
+
+class TickStore:
+    """
+    追加写入的 tick 存储
+
+    写入只修改内存映射页，由后台线程按间隔 msync，抓取路径上不会发生 fsync 阻塞。
+    记录按上游时间单调递增写入（时间不前进的重复 tick 会被忽略），
+    因此区间查询可以直接在时间列上二分。
+
+    readonly=True 时以只读方式映射已有文件（回放、离线分析）：不创建文件、
+    不写文件头、不启动刷盘线程，append 抛出 ValueError；可用 refresh 读取写入方的新记录。
+    """
+
+    def __init__(self, path: str, flush_interval: float = 30.0, readonly: bool = False):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._count = 0
+        self._last_time: Optional[int] = None
+        self._dirty = False
+
+        if readonly:
+            self._fd = os.open(path, os.O_RDONLY)
+            size = os.fstat(self._fd).st_size
+            if size < HEADER_SIZE:
+                os.close(self._fd)
+                raise ValueError(f"无法识别的 tick 存储文件: {path}")
+            self._map = self._mmap(size)
+            try:
+                self._read_header()
+            except ValueError:
+                self._map.close()
+                os.close(self._fd)
+                raise
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            size = os.fstat(self._fd).st_size
+            if size < HEADER_SIZE:
+                size = HEADER_SIZE + INITIAL_RECORDS * RECORD_SIZE
+                os.ftruncate(self._fd, size)
+                self._map = self._mmap(size)
+                self._write_header()
+            else:
+                self._map = self._mmap(size)
+                self._read_header()
+
+        self._stop = threading.Event()
+        self._flusher = None
+        if not readonly and flush_interval and flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="tick-store-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def _mmap(self, size: int) -> mmap.mmap:
+        access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        return mmap.mmap(self._fd, size, access=access)
+
+    def _write_header(self):
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD_SIZE, self._count)
+
+    def _read_header(self):
+        magic, version, record_size, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"无法识别的 tick 存储文件: {self.path}")
+        # 防御文件被截断：记录数不能超过文件容量
+        capacity = (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+        self._count = min(count, capacity)
+        if self._count:
+            self._last_time = self._time_at(self._count - 1)
+
+    def _capacity(self) -> int:
+        return (len(self._map) - HEADER_SIZE) // RECORD_SIZE
+
+    def _grow(self):
+        """扩容文件并重新映射"""
+        grow = min(max(self._capacity(), INITIAL_RECORDS), MAX_GROW_RECORDS)
+        size = len(self._map) + grow * RECORD_SIZE
+        self._map.flush()
+        self._map.close()
+        os.ftruncate(self._fd, size)
+        self._map = self._mmap(size)
+
+    def _time_at(self, index: int) -> int:
+        return struct.unpack_from("<q", self._map, HEADER_SIZE + index * RECORD_SIZE)[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_time(self) -> Optional[int]:
+        """最后一条记录的上游时间（毫秒）"""
+        return self._last_time
+
+    def append(
+        self,
+        upstream_time: int,
+        price: float,
+        yesterday_price: float,
+        change_amount: float,
+        receive_time: float,
+    ) -> bool:
+        """
+        追加一条记录
+
+        Returns:
+            bool: 是否写入（上游时间未前进时返回 False）
+        """
+        if self.readonly:
+            raise ValueError(f"tick 存储以只读方式打开: {self.path}")
+        upstream_time = int(upstream_time)
+        with self._lock:
+            if self._last_time is not None and upstream_time <= self._last_time:
+                return False
+            if self._count >= self._capacity():
+                self._grow()
+            RECORD.pack_into(
+                self._map,
+                HEADER_SIZE + self._count * RECORD_SIZE,
+                upstream_time,
+                price,
+                yesterday_price,
+                change_amount,
+                receive_time,
+            )
+            # 先写记录再发布计数，读者不会看到半条记录
+            self._count += 1
+            self._last_time = upstream_time
+            HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD_SIZE, self._count)
+            self._dirty = True
+            return True
+
+    def _bisect(self, upstream_time: int) -> int:
+        """返回第一条上游时间 >= upstream_time 的记录下标"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time_at(mid) < upstream_time:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def iter_records(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Record]:
+        """
+        按下标区间迭代记录
+
+        直接在映射内存上解包，不会复制整段数据。迭代期间持有锁，调用方应尽快消费。
+        """
+        with self._lock:
+            stop = self._count if stop is None else min(stop, self._count)
+            start = max(start, 0)
+            if start >= stop:
+                return
+            view = memoryview(self._map)[
+                HEADER_SIZE + start * RECORD_SIZE : HEADER_SIZE + stop * RECORD_SIZE
+            ]
+            try:
+                yield from RECORD.iter_unpack(view)
+            finally:
+                view.release()
+
+    def range(self, start_time: int, end_time: int) -> List[Record]:
+        """查询上游时间在 [start_time, end_time) 区间内的记录（毫秒）"""
+        with self._lock:
+            lo = self._bisect(int(start_time))
+            hi = self._bisect(int(end_time))
+        return list(self.iter_records(lo, hi))
+
+    def tail(self, n: int) -> Iterator[Record]:
+        """迭代最近 n 条记录"""
+        return self.iter_records(self._count - n)
+
+    def flush(self):
+        """将脏页同步到磁盘（msync 在锁外执行，不阻塞并发写入）"""
+        with self._lock:
+            if not self._dirty or self._map.closed:
+                return
+            mapped = self._map
+            self._dirty = False
+        try:
+            mapped.flush()
+        except ValueError:
+            # 扩容时旧映射已在关闭前刷盘
+            pass
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                log.error("tick 存储刷盘失败", path=self.path, error=e)
+
+    def refresh(self):
+        """
+        重新读取其他进程追加的记录（文件已扩容时重新映射）
+
+        多个进程共享同一个存储文件时只有主进程写入；从进程接替写入前需先调用，
+        否则会从过期的记录数开始覆盖。
+        """
+        with self._lock:
+            size = os.fstat(self._fd).st_size
+            if size != len(self._map):
+                self._map.close()
+                self._map = self._mmap(size)
+            self._read_header()
+
+    def close(self):
+        """刷盘并关闭文件"""
+        self._stop.set()
+        with self._lock:
+            if self._map.closed:
+                return
+            if not self.readonly:
+                self._map.flush()
+            self._map.close()
+            os.close(self._fd)
+
+
+def read_last_record(path: str) -> Optional[Record]:
+    """
+    只读地取出存储文件中的最后一条记录（用于启动时立即显示上次价格）
+
+    不创建文件、不建立内存映射、不启动刷盘线程；文件不存在或无法识别时返回 None。
+    """
+    try:
+        with open(path, "rb") as f:
+            magic, version, record_size, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+                return None
+            if not count:
+                return None
+            f.seek(HEADER_SIZE + (count - 1) * RECORD_SIZE)
+            data = f.read(RECORD_SIZE)
+    except (OSError, struct.error):
+        return None
+    if len(data) < RECORD_SIZE:
+        return None
+    return RECORD.unpack(data)
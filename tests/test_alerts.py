@@ -0,0 +1,238 @@
+"""
+提醒引擎测试：回滞锁定与复位、首个值不算穿越、冷却期与每 tick 上限不丢提醒、
+逐 tick 规则连续触发、sigma 以不含当前价格的窗口计算、重新加载配置时保留规则状态
+
+用法:
+    python -m unittest discover tests
+"""
+
+import statistics
+import unittest
+
+from alerts import DOWN, UP, AlertEngine, AlertRule, create_alert_engine
+from tick import PriceTick
+
+START = 1_700_000_000.0
+
+
+def make_tick(price_cents, t):
+    receive_ms = int(t * 1000)
+    change = price_cents - 76000
+    rate = round(change * 100 / 76000, 2)
+    return PriceTick(price_cents, 76000, change, rate, receive_ms, "AU", receive_ms)
+
+
+class EngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = START
+        self.engine = AlertEngine(clock=lambda: self.now)
+
+    def feed(self, price_cents, dt=1.0):
+        """推进时钟并评估一个 tick，返回触发的规则 id"""
+        self.now += dt
+        alerts = self.engine.evaluate(make_tick(price_cents, self.now))
+        return [alert.rule.id for alert in alerts]
+
+
+class LatchTest(EngineTestCase):
+    def test_hysteresis_rearm(self):
+        self.engine.add_rule(
+            AlertRule("cross", 780, UP, hysteresis=0.5, rule_id="above")
+        )
+        self.assertEqual(self.feed(77900), [])
+        self.assertEqual(self.feed(78100), ["above"])
+        # 锁定期间持续在阈值之上不再触发
+        self.assertEqual(self.feed(78200), [])
+        # 回落未超过回滞量：仍锁定
+        self.assertEqual(self.feed(77960), [])
+        self.assertEqual(self.feed(78010), [])
+        # 回落超过回滞量后复位，再次突破时触发
+        self.assertEqual(self.feed(77940), [])
+        self.assertEqual(self.feed(78010), ["above"])
+
+    def test_down_rule(self):
+        self.engine.add_rule(AlertRule("cross", 770, DOWN, rule_id="below"))
+        self.assertEqual(self.feed(77100), [])
+        self.assertEqual(self.feed(76990), ["below"])
+        self.assertEqual(self.feed(76900), [])
+
+    def test_first_value_is_not_a_cross(self):
+        self.engine.add_rule(AlertRule("cross", 780, UP, rule_id="above"))
+        self.assertEqual(self.feed(78500), [])
+        self.assertEqual(self.feed(78600), [])
+        self.assertEqual(self.feed(77900), [])
+        self.assertEqual(self.feed(78100), ["above"])
+
+    def test_rule_added_above_threshold_waits_for_rearm(self):
+        self.engine.add_rule(AlertRule("cross", 700, UP, rule_id="low"))
+        self.feed(78000)
+        self.engine.add_rule(AlertRule("cross", 780, UP, rule_id="above"))
+        self.assertEqual(self.feed(78100), [])
+        self.assertEqual(self.feed(77900), [])
+        self.assertEqual(self.feed(78100), ["above"])
+
+
+class SuppressionTest(EngineTestCase):
+    def test_cooldown_does_not_lose_alert(self):
+        rule = self.engine.add_rule(
+            AlertRule("cross", 780, UP, cooldown=60, rule_id="above")
+        )
+        self.feed(77900)
+        self.assertEqual(self.feed(78100), ["above"])
+        self.assertEqual(self.feed(77900), [])
+        # 冷却期内再次突破：不发出，但保持生效
+        self.assertEqual(self.feed(78100, dt=10), [])
+        self.assertEqual(self.feed(78150, dt=20), [])
+        self.assertEqual(rule.suppressed, 2)
+        # 冷却结束时仍在阈值之上：补发
+        self.assertEqual(self.feed(78120, dt=30), ["above"])
+        self.assertEqual(self.feed(78130, dt=100), [])
+        self.assertEqual(rule.fired, 2)
+
+    def test_cooldown_expires_below_threshold(self):
+        self.engine.add_rule(AlertRule("cross", 780, UP, cooldown=60, rule_id="above"))
+        self.feed(77900)
+        self.feed(78100)
+        self.feed(77900)
+        self.assertEqual(self.feed(78100, dt=10), [])
+        # 冷却期内已回落：之后重新突破按正常穿越触发
+        self.assertEqual(self.feed(77900, dt=60), [])
+        self.assertEqual(self.feed(78100), ["above"])
+
+    def test_per_tick_limit_defers_remaining_rules(self):
+        for i in range(5):
+            self.engine.add_rule(AlertRule("cross", 780 + i * 0.1, UP, rule_id=f"r{i}"))
+        self.feed(77900)
+        first = self.feed(78100)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(self.engine.suppressed, 2)
+        second = self.feed(78100)
+        self.assertEqual(sorted(first + second), [f"r{i}" for i in range(5)])
+        self.assertEqual(self.feed(78100), [])
+
+
+class TickRuleTest(EngineTestCase):
+    def setUp(self):
+        super().setUp()
+        for direction in (UP, DOWN):
+            self.engine.add_rule(
+                AlertRule("tick", 0.1, direction, rule_id=f"tick-{direction}")
+            )
+
+    def test_every_large_move_fires(self):
+        self.assertEqual(self.feed(76800), [])
+        self.assertEqual(self.feed(76900), ["tick-up"])
+        self.assertEqual(self.feed(77000), ["tick-up"])
+        self.assertEqual(self.feed(77010), [])
+        self.assertEqual(self.feed(76900), ["tick-down"])
+
+    def test_cooldown_limits_repeats(self):
+        self.engine.rules["tick-up"].cooldown = 5
+        self.feed(76800)
+        self.assertEqual(self.feed(76900), ["tick-up"])
+        self.assertEqual(self.feed(77000), [])
+        self.assertEqual(self.feed(77100, dt=5), ["tick-up"])
+
+
+class WindowTest(EngineTestCase):
+    def test_sigma_uses_window_before_current_price(self):
+        self.engine.sigma_min_samples = 30
+        self.engine.add_rule(AlertRule("sigma", 3, UP, window=3600, rule_id="spike"))
+        # 前 30 个 tick 样本不足；第 31 个 tick 是首个指标值，只用于确定初始状态
+        history = [76800 + (i % 5) for i in range(31)]
+        for price in history:
+            self.assertEqual(self.feed(price), [])
+
+        self.now += 1
+        alerts = self.engine.evaluate(make_tick(76815, self.now))
+        self.assertEqual([a.rule.id for a in alerts], ["spike"])
+        expected = (76815 - statistics.fmean(history)) / statistics.pstdev(history)
+        self.assertAlmostEqual(alerts[0].value, expected, places=6)
+        # 评估后当前价格才进入窗口
+        self.assertEqual(self.engine.windows[3600.0].count, 32)
+
+    def test_sigma_needs_min_samples(self):
+        self.engine.sigma_min_samples = 30
+        self.engine.add_rule(AlertRule("sigma", 1, UP, window=3600, rule_id="spike"))
+        for i in range(29):
+            self.feed(76800 + i % 2)
+        # 之前只有 29 个样本：不评估
+        self.assertEqual(self.feed(77000), [])
+
+    def test_window_move(self):
+        self.engine.add_rule(AlertRule("window", 0.5, UP, window=60, rule_id="rally"))
+        self.feed(76800)
+        self.feed(76900)
+        self.assertEqual(self.feed(77200), ["rally"])
+        # 低点移出窗口后以窗口内新的最低价计算
+        self.assertEqual(self.feed(77100, dt=60), [])
+
+
+class ReloadTest(EngineTestCase):
+    def config(self, rules, **overrides):
+        config = {"alert_rules": rules, "max_alerts_per_tick": 3}
+        config.update(overrides)
+        return config
+
+    def test_default_ids_are_stable(self):
+        spec = {"kind": "sigma", "threshold": 3, "window": 300}
+        self.assertEqual(AlertRule.from_dict(spec).id, "sigma-up-3-300")
+        self.assertEqual(AlertRule.from_dict(spec).id, AlertRule.from_dict(spec).id)
+        self.assertEqual(AlertRule.from_dict(dict(spec, id="mine")).id, "mine")
+
+    def test_unchanged_rule_keeps_latch(self):
+        rules = [{"kind": "cross", "threshold": 780}]
+        self.engine = create_alert_engine(self.config(rules), clock=lambda: self.now)
+        self.feed(77900)
+        self.assertEqual(self.feed(78100), ["cross-up-780"])
+        rule = self.engine.rules["cross-up-780"]
+
+        self.engine.configure(self.config(rules, max_alerts_per_tick=5))
+        self.assertIs(self.engine.rules["cross-up-780"], rule)
+        self.assertEqual(self.engine.max_alerts_per_tick, 5)
+        # 仍处于锁定状态：重新加载不会重复提醒
+        self.assertEqual(self.feed(78200), [])
+
+    def test_changed_rule_keeps_cooldown(self):
+        spec = {"kind": "cross", "threshold": 780, "cooldown": 60, "id": "a"}
+        self.engine.configure(self.config([spec]))
+        self.feed(77900)
+        self.assertEqual(self.feed(78100), ["a"])
+
+        self.engine.configure(self.config([dict(spec, threshold=782)]))
+        rule = self.engine.rules["a"]
+        self.assertEqual(rule.threshold, 782)
+        self.assertEqual(rule.fired, 1)
+        self.assertEqual(self.feed(78300, dt=10), [])
+        self.assertEqual(self.feed(78300, dt=60), ["a"])
+
+    def test_changed_rule_already_above_waits_for_cross(self):
+        spec = {"kind": "cross", "threshold": 790, "id": "a"}
+        self.engine.configure(self.config([spec]))
+        self.feed(78000)
+        self.engine.configure(self.config([dict(spec, threshold=779)]))
+        self.assertEqual(self.feed(78100), [])
+        self.assertEqual(self.feed(77800), [])
+        self.assertEqual(self.feed(78000), ["a"])
+
+    def test_removed_rules_and_windows(self):
+        window = {"kind": "window", "threshold": 1, "window": 60}
+        cross = {"kind": "cross", "threshold": 780}
+        self.engine.configure(self.config([window, cross]))
+        self.assertIn(60.0, self.engine.windows)
+        self.engine.configure(self.config([cross]))
+        self.assertEqual(list(self.engine.rules), ["cross-up-780"])
+        self.assertEqual(self.engine.windows, {})
+
+    def test_price_change_rules(self):
+        config = self.config(
+            [], show_price_change_alerts=True, price_change_threshold=0.1
+        )
+        self.engine.configure(config)
+        self.assertEqual(sorted(self.engine.rules), ["tick-down", "tick-up"])
+        self.engine.configure(self.config([]))
+        self.assertEqual(self.engine.rules, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+熔断器测试：closed → open → half_open 状态迁移、单个探测请求、探测失败等待时间加倍、
+经熔断器抓取时拒绝与记录结果，以及错误历史环形缓冲区
+
+用法:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from client import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgedPriceFetcher,
+    PriceProvider,
+)
+from config import AppConfig, ConfigSnapshot, ErrorHandler
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class BreakerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=3, reset_timeout=5, max_reset_timeout=20, clock=self.clock
+        )
+
+    def trip(self):
+        for _ in range(self.breaker.failure_threshold):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+
+
+class StateTest(BreakerTestCase):
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.opened, 1)
+
+    def test_success_resets_failure_count(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.consecutive_failures, 1)
+
+    def test_open_rejects_until_reset_timeout(self):
+        self.trip()
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_after(), 5)
+        self.clock.now += 4
+        self.assertFalse(self.breaker.allow())
+        self.assertAlmostEqual(self.breaker.retry_after(), 1)
+        self.assertEqual(self.breaker.rejected, 2)
+        self.clock.now += 1
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertEqual(self.breaker.retry_after(), 0)
+
+    def test_half_open_allows_single_probe(self):
+        self.trip()
+        self.clock.now += 5
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.probes, 1)
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_probe_doubles_timeout_up_to_cap(self):
+        self.trip()
+        for expected in (10, 20, 20):
+            self.clock.now += self.breaker.retry_after()
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record_failure()
+            self.assertEqual(self.breaker.state, OPEN)
+            self.assertEqual(self.breaker.retry_after(), expected)
+        # 探测成功后等待时间恢复为初始值
+        self.clock.now += 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.trip()
+        self.assertEqual(self.breaker.retry_after(), 5)
+
+    def test_release_returns_probe(self):
+        self.trip()
+        self.clock.now += 5
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+
+    def test_snapshot_and_reset(self):
+        self.trip()
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["state"], OPEN)
+        self.assertEqual(snapshot["consecutive_failures"], 3)
+        self.assertEqual(snapshot["retry_after"], 5)
+        self.breaker.reset()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+
+class ScriptedProvider(PriceProvider):
+    """按顺序返回价格；为异常时抛出"""
+
+    name = "scripted"
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = list(results)
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return SimpleNamespace(price=result)
+
+
+class FetcherTest(BreakerTestCase):
+    def fetch(self, fetcher):
+        return asyncio.run(fetcher.fetch(timeout=1))
+
+    def test_fetch_through_breaker(self):
+        provider = ScriptedProvider([OSError("down")] * 3 + ["768.00"])
+        fetcher = HedgedPriceFetcher([provider], breaker=self.breaker)
+        for _ in range(3):
+            with self.assertRaises(OSError):
+                self.fetch(fetcher)
+        # 熔断打开：不再请求上游
+        with self.assertRaises(CircuitOpenError) as ctx:
+            self.fetch(fetcher)
+        self.assertEqual(ctx.exception.retry_after, 5)
+        self.assertEqual(provider.calls, 3)
+
+        self.clock.now += 5
+        self.assertEqual(self.fetch(fetcher).price, "768.00")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_invalid_data_counts_as_failure(self):
+        provider = ScriptedProvider(["0"] * 3)
+        fetcher = HedgedPriceFetcher([provider], breaker=self.breaker)
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.fetch(fetcher)
+        self.assertEqual(self.breaker.state, OPEN)
+
+
+class ErrorHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = ErrorHandler(ConfigSnapshot(dict(AppConfig.DEFAULT_CONFIG)))
+
+    def test_history_is_bounded(self):
+        for i in range(ErrorHandler.HISTORY_SIZE + 10):
+            self.handler.handle_error(ValueError(f"e{i}"), "test")
+        history = self.handler.error_history
+        self.assertEqual(len(history), ErrorHandler.HISTORY_SIZE)
+        self.assertEqual(history[0]["error"], "e10")
+        self.assertEqual(self.handler.total_errors, ErrorHandler.HISTORY_SIZE + 10)
+        self.assertEqual(self.handler.error_types["ValueError"], 110)
+        summary = self.handler.get_error_summary()
+        self.assertIn("e109", summary)
+        self.assertNotIn("e104", summary)
+
+    def test_health_follows_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, clock=FakeClock())
+        self.handler.attach_breaker(breaker)
+        self.assertTrue(self.handler.handle_error(ValueError("x")))
+        breaker.record_failure()
+        self.assertFalse(self.handler.is_service_healthy())
+        self.assertEqual(self.handler.get_retry_delay(), 5)
+        self.handler.reset_error_count()
+        self.assertEqual(self.handler.error_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
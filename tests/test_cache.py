@@ -0,0 +1,203 @@
+"""
+stale-while-revalidate 缓存测试：FRESH → STALE → EXPIRED 状态迁移、命中统计、年龄格式化，
+以及服务层 get_price 的后台刷新与只比较不发布的变更检测
+
+用法:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from cache import EXPIRED, FRESH, STALE, PriceCache, format_age
+from config import AppConfig, ConfigSnapshot
+from pipeline import TickDiffer
+from service import GoldPriceService
+from tick import PriceTick
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_tick(price_cents=76800, time_ms=1_700_000_000_000):
+    return PriceTick(price_cents, 76000, price_cents - 76000, 1.05, time_ms, "AU", 0)
+
+
+class PriceCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = PriceCache(ttl=2.0, stale_window=60.0, clock=self.clock)
+
+    def test_empty(self):
+        self.assertIsNone(self.cache.peek())
+        self.assertIsNone(self.cache.lookup())
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_state_transitions(self):
+        tick = make_tick()
+        self.cache.put(tick)
+        cases = [
+            (0.0, FRESH),
+            (2.0, FRESH),
+            (2.5, STALE),
+            (62.0, STALE),
+            (62.5, EXPIRED),
+        ]
+        for age, state in cases:
+            with self.subTest(age=age):
+                self.clock.now = 1000.0 + age
+                cached = self.cache.peek()
+                self.assertEqual(cached.state, state)
+                self.assertEqual(cached.age, age)
+                self.assertIs(cached.tick, tick)
+
+    def test_lookup_counts_and_hides_expired(self):
+        self.cache.put(make_tick())
+        self.assertTrue(self.cache.lookup().is_fresh)
+        self.clock.now += 10
+        self.assertEqual(self.cache.lookup().state, STALE)
+        self.clock.now += 100
+        self.assertIsNone(self.cache.lookup())
+        self.assertEqual(
+            (self.cache.fresh_hits, self.cache.stale_hits, self.cache.misses),
+            (1, 1, 1),
+        )
+        stats = self.cache.stats()
+        self.assertEqual(stats["state"], EXPIRED)
+
+    def test_put_resets_age(self):
+        self.cache.put(make_tick())
+        self.clock.now += 30
+        self.cache.put(make_tick(76810))
+        cached = self.cache.peek()
+        self.assertEqual(cached.state, FRESH)
+        self.assertEqual(cached.tick.price_cents, 76810)
+
+    def test_clear(self):
+        self.cache.put(make_tick())
+        self.cache.clear()
+        self.assertIsNone(self.cache.peek())
+
+
+class FormatAgeTest(unittest.TestCase):
+    def test_format_age(self):
+        cases = [
+            (0.4, "刚刚"),
+            (1, "1秒前"),
+            (59.9, "59秒前"),
+            (60, "1分钟前"),
+            (3599, "59分钟前"),
+            (7200, "2小时前"),
+        ]
+        for seconds, text in cases:
+            with self.subTest(seconds=seconds):
+                self.assertEqual(format_age(seconds), text)
+
+
+class WouldChangeTest(unittest.TestCase):
+    def test_compares_without_publishing(self):
+        differ = TickDiffer()
+        tick = make_tick()
+        self.assertTrue(differ.would_change(tick))
+        self.assertEqual(differ.stats()["ticks_total"], 0)
+
+        differ.diff(tick)
+        # 仅接收时间不同不算变化
+        self.assertFalse(differ.would_change(tick._replace(receive_ms=5)))
+        self.assertTrue(differ.would_change(make_tick(76810)))
+        self.assertIs(differ.last_published, tick)
+        self.assertEqual(
+            differ.stats(),
+            {"ticks_total": 1, "ticks_published": 1, "ticks_deduplicated": 0},
+        )
+
+
+class FakeFetcher:
+    """按顺序返回上游数据；为异常时抛出"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.breaker = None
+        self.calls = 0
+
+    async def fetch(self, timeout=None):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return SimpleNamespace(
+            price=result,
+            yesterdayPrice="760.00",
+            upAndDownAmt="8.00",
+            upAndDownRate="+1.05%",
+            time=str(1_700_000_000_000 + self.calls),
+            productSku="AU",
+        )
+
+
+class GetPriceTest(unittest.IsolatedAsyncioTestCase):
+    def make_service(self, results):
+        data = dict(AppConfig.DEFAULT_CONFIG)
+        data.update(
+            enable_tick_store=False,
+            shared_tick=False,
+            cache_ttl=2.0,
+            cache_stale_window=60.0,
+            fetch_retries=0,
+        )
+        self.clock = FakeClock(1_700_000_000.0)
+        self.fetcher = FakeFetcher(results)
+        return GoldPriceService(
+            ConfigSnapshot(data), clock=self.clock, price_fetcher=self.fetcher
+        )
+
+    async def test_fresh_served_without_request(self):
+        service = self.make_service(["768.00"])
+        first = await service.get_price()
+        self.assertEqual(first.tick.price_cents, 76800)
+        self.clock.now += 1
+        cached = await service.get_price()
+        self.assertEqual(cached.state, FRESH)
+        self.assertEqual(self.fetcher.calls, 1)
+
+    async def test_stale_returned_and_revalidated_in_background(self):
+        service = self.make_service(["768.00", "769.00"])
+        await service.get_price()
+        self.clock.now += 10
+        cached = await service.get_price()
+        self.assertEqual(cached.state, STALE)
+        self.assertEqual(cached.tick.price_cents, 76800)
+        self.assertEqual(service.revalidations, 1)
+        await service._inflight
+        refreshed = await service.get_price()
+        self.assertEqual(refreshed.state, FRESH)
+        self.assertEqual(refreshed.tick.price_cents, 76900)
+        self.assertEqual(self.fetcher.calls, 2)
+
+    async def test_expired_waits_for_upstream(self):
+        service = self.make_service(["768.00", RuntimeError("down")])
+        await service.get_price()
+        self.clock.now += 100
+        self.assertIsNone(await service.get_price())
+        # 超出容忍窗口的缓存也不能作为失败时的回退值
+        self.assertIsNone(service.get_cached_price())
+
+    async def test_failed_revalidation_keeps_stale_value(self):
+        service = self.make_service(["768.00", RuntimeError("down")])
+        await service.get_price()
+        self.clock.now += 10
+        await service.get_price()
+        await asyncio.shield(service._inflight)
+        cached = service.get_cached_price()
+        self.assertEqual(cached.state, STALE)
+        self.assertEqual(cached.tick.price_cents, 76800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+技术指标测试：增量 update 与定义式参考实现、NumPy 批量计算、IndicatorSet.rebuild 的结果一致
+
+未安装 NumPy 时批量函数相关用例跳过，rebuild 用例仍覆盖逐个回放路径。
+
+用法:
+    python -m unittest discover tests
+"""
+
+import math
+import random
+import statistics
+import unittest
+from unittest import mock
+
+import indicators
+from indicators import (
+    EMA,
+    HAS_NUMPY,
+    RSI,
+    SMA,
+    Bollinger,
+    IndicatorSet,
+    bollinger_batch,
+    ema_batch,
+    rsi_batch,
+    sma_batch,
+)
+
+PERIOD = 20
+RSI_PERIOD = 14
+# 覆盖：空历史、短于窗口、恰好等于窗口、窗口 + 1（RSI 首个值）与长历史
+LENGTHS = (0, 1, 5, RSI_PERIOD, RSI_PERIOD + 1, PERIOD - 1, PERIOD, PERIOD + 1, 600)
+
+
+def random_walk(count, seed=7, price=768.0):
+    rng = random.Random(seed)
+    prices = []
+    for _ in range(count):
+        price = max(1.0, price + rng.gauss(0, 0.15))
+        prices.append(round(price, 2))
+    return prices
+
+
+def reference_sma(prices, period):
+    return [
+        statistics.fmean(prices[i + 1 - period : i + 1]) if i + 1 >= period else None
+        for i in range(len(prices))
+    ]
+
+
+def reference_ema(prices, period):
+    alpha = 2.0 / (period + 1)
+    out, value = [], None
+    for i, x in enumerate(prices):
+        if i + 1 == period:
+            value = statistics.fmean(prices[:period])
+        elif value is not None:
+            value = alpha * x + (1 - alpha) * value
+        out.append(value)
+    return out
+
+
+def reference_bollinger(prices, period, k=2.0):
+    out = []
+    for i in range(len(prices)):
+        if i + 1 < period:
+            out.append(None)
+            continue
+        window = prices[i + 1 - period : i + 1]
+        mean = statistics.fmean(window)
+        width = k * statistics.pstdev(window)
+        out.append((mean, mean + width, mean - width))
+    return out
+
+
+def reference_rsi(prices, period):
+    out = [None] * len(prices)
+    changes = [b - a for a, b in zip(prices, prices[1:])]
+    if len(changes) < period:
+        return out
+    gains = [max(c, 0.0) for c in changes]
+    losses = [max(-c, 0.0) for c in changes]
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for i in range(period, len(changes) + 1):
+        if i > period:
+            avg_gain = (avg_gain * (period - 1) + gains[i - 1]) / period
+            avg_loss = (avg_loss * (period - 1) + losses[i - 1]) / period
+        if avg_loss == 0:
+            out[i] = 50.0 if avg_gain == 0 else 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+def incremental(indicator, prices):
+    return [indicator.update(x) for x in prices]
+
+
+class ApproxMixin:
+    def assertClose(self, actual, expected, tol=1e-7, msg=None):
+        if expected is None or (isinstance(expected, float) and math.isnan(expected)):
+            self.assertTrue(
+                actual is None or (isinstance(actual, float) and math.isnan(actual)),
+                msg or f"期望未就绪，实际为 {actual}",
+            )
+            return
+        self.assertIsNotNone(actual, msg or f"期望 {expected}，实际未就绪")
+        self.assertTrue(
+            math.isclose(actual, expected, rel_tol=tol, abs_tol=tol),
+            msg or f"{actual} != {expected}",
+        )
+
+    def assertSeriesClose(self, actual, expected, tol=1e-7):
+        self.assertEqual(len(actual), len(expected))
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            self.assertClose(a, e, tol, msg=f"第 {i} 个值: {a} != {e}")
+
+
+class IncrementalTest(ApproxMixin, unittest.TestCase):
+    """增量 update 与按定义逐窗口计算的参考实现一致"""
+
+    def setUp(self):
+        self.prices = random_walk(600)
+
+    def test_sma(self):
+        self.assertSeriesClose(
+            incremental(SMA(PERIOD), self.prices),
+            reference_sma(self.prices, PERIOD),
+        )
+
+    def test_ema(self):
+        self.assertSeriesClose(
+            incremental(EMA(PERIOD), self.prices),
+            reference_ema(self.prices, PERIOD),
+        )
+
+    def test_bollinger(self):
+        actual = incremental(Bollinger(PERIOD), self.prices)
+        expected = reference_bollinger(self.prices, PERIOD)
+        for band in range(3):
+            self.assertSeriesClose(
+                [v[band] if v else None for v in actual],
+                [v[band] if v else None for v in expected],
+            )
+
+    def test_rsi(self):
+        self.assertSeriesClose(
+            incremental(RSI(RSI_PERIOD), self.prices),
+            reference_rsi(self.prices, RSI_PERIOD),
+        )
+
+    def test_rsi_flat_prices(self):
+        self.assertEqual(incremental(RSI(3), [768.0] * 5)[-1], 50.0)
+        self.assertEqual(incremental(RSI(3), [1.0, 2.0, 3.0, 4.0])[-1], 100.0)
+
+    def test_short_history_not_ready(self):
+        prices = self.prices[: PERIOD - 1]
+        for indicator in (SMA(PERIOD), EMA(PERIOD), Bollinger(PERIOD)):
+            self.assertEqual(incremental(indicator, prices), [None] * len(prices))
+        self.assertIsNone(incremental(RSI(RSI_PERIOD), self.prices[:RSI_PERIOD])[-1])
+
+
+@unittest.skipUnless(HAS_NUMPY, "需要 numpy")
+class BatchTest(ApproxMixin, unittest.TestCase):
+    """NumPy 批量计算与逐个 update 的序列一致（未就绪处为 NaN）"""
+
+    def test_batch_matches_incremental(self):
+        for length in LENGTHS + (5000,):
+            prices = random_walk(length, seed=length)
+            with self.subTest(length=length):
+                self.assertSeriesClose(
+                    list(sma_batch(prices, PERIOD)), incremental(SMA(PERIOD), prices)
+                )
+                self.assertSeriesClose(
+                    list(ema_batch(prices, PERIOD)), incremental(EMA(PERIOD), prices)
+                )
+                self.assertSeriesClose(
+                    list(rsi_batch(prices, RSI_PERIOD)),
+                    incremental(RSI(RSI_PERIOD), prices),
+                )
+                bands = bollinger_batch(prices, PERIOD)
+                expected = incremental(Bollinger(PERIOD), prices)
+                for band in range(3):
+                    self.assertSeriesClose(
+                        list(bands[band]), [v[band] if v else None for v in expected]
+                    )
+
+    def test_ema_long_history_stays_accurate(self):
+        # 分块递推不应随长度累积误差
+        prices = random_walk(86400, seed=1)
+        self.assertClose(
+            float(ema_batch(prices, 5)[-1]), incremental(EMA(5), prices)[-1], tol=1e-9
+        )
+
+
+class RebuildTest(ApproxMixin, unittest.TestCase):
+    """rebuild(历史) 之后的状态与逐个 update 相同，并能继续增量更新"""
+
+    def make(self):
+        return IndicatorSet(
+            sma_periods=(5, PERIOD),
+            ema_periods=(12, PERIOD),
+            bollinger_period=PERIOD,
+            rsi_period=RSI_PERIOD,
+        )
+
+    def check_rebuild(self):
+        for length in LENGTHS:
+            prices = random_walk(length + 50, seed=length)
+            history, more = prices[:length], prices[length:]
+            with self.subTest(length=length):
+                rebuilt = self.make()
+                rebuilt.rebuild(history)
+                updated = self.make()
+                for price in history:
+                    updated.update(price)
+                self.assertSnapshotClose(rebuilt.snapshot(), updated.snapshot())
+
+                # 重建后的内部状态同样正确：继续追加 tick 后仍一致
+                for price in more:
+                    rebuilt.update(price)
+                    updated.update(price)
+                self.assertSnapshotClose(rebuilt.snapshot(), updated.snapshot())
+
+    def assertSnapshotClose(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for name, value in expected.items():
+            self.assertClose(
+                actual[name], value, msg=f"{name}: {actual[name]} != {value}"
+            )
+
+    @unittest.skipUnless(HAS_NUMPY, "需要 numpy")
+    def test_rebuild_numpy(self):
+        self.check_rebuild()
+
+    def test_rebuild_without_numpy(self):
+        with mock.patch.object(indicators, "HAS_NUMPY", False):
+            self.check_rebuild()
+
+    def test_rebuild_replaces_previous_state(self):
+        indicator_set = self.make()
+        for price in random_walk(100, seed=3):
+            indicator_set.update(price)
+        indicator_set.rebuild([])
+        self.assertTrue(all(v is None for v in indicator_set.snapshot().values()))
+        self.assertEqual(indicator_set.format_lines(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
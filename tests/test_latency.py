@@ -0,0 +1,97 @@
+"""
+延迟统计测试：对数分桶、分位数、分代轮换与自适应超时的推导和上下限
+
+用法:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from latency import AdaptiveTimeout, LatencyHistogram, log_buckets
+
+
+class LogBucketsTest(unittest.TestCase):
+    def test_bounds_grow_geometrically_and_end_at_max(self):
+        bounds = log_buckets(0.001, 1.0, 2.0)
+        self.assertEqual(bounds[0], 0.001)
+        self.assertEqual(bounds[-1], 1.0)
+        self.assertEqual(bounds, sorted(bounds))
+        for a, b in zip(bounds, bounds[1:-1]):
+            self.assertAlmostEqual(b / a, 2.0)
+
+
+class HistogramTest(unittest.TestCase):
+    def test_empty_has_no_quantile(self):
+        self.assertIsNone(LatencyHistogram().quantile(0.99))
+
+    def test_quantile_returns_bucket_upper_bound(self):
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(0.010)
+        histogram.record(2.0)
+        p50 = histogram.quantile(0.5)
+        self.assertGreaterEqual(p50, 0.010)
+        self.assertLess(p50, 0.010 * 1.15 + 1e-12)
+        self.assertLess(histogram.quantile(0.99), 0.02)
+        self.assertGreaterEqual(histogram.quantile(1.0), 2.0)
+
+    def test_overflow_clamps_to_max(self):
+        histogram = LatencyHistogram(max_value=5.0)
+        histogram.record(100.0)
+        self.assertEqual(histogram.quantile(0.99), 5.0)
+
+    def test_rotation_ages_out_old_samples(self):
+        histogram = LatencyHistogram(rotate_every=10)
+        for _ in range(10):
+            histogram.record(3.0)
+        self.assertEqual(histogram.count, 10)
+        # 第一次轮换后旧样本仍在上一代
+        for _ in range(5):
+            histogram.record(0.01)
+        self.assertEqual(histogram.count, 15)
+        self.assertGreaterEqual(histogram.quantile(0.99), 3.0)
+        # 再次轮换后慢样本被淘汰
+        for _ in range(5):
+            histogram.record(0.01)
+        self.assertEqual(histogram.count, 10)
+        self.assertLess(histogram.quantile(0.99), 0.02)
+
+
+class AdaptiveTimeoutTest(unittest.TestCase):
+    def test_uses_max_until_enough_samples(self):
+        timeout = AdaptiveTimeout(max_timeout=10.0, min_samples=20)
+        for _ in range(19):
+            timeout.connect.record(0.05)
+            timeout.read.record(0.1)
+        self.assertEqual(timeout.timeouts(), (10.0, 10.0))
+
+    def test_derives_from_p99_with_floor(self):
+        timeout = AdaptiveTimeout(
+            max_timeout=10.0, min_connect=1.0, min_read=1.0, margin=0.5, min_samples=20
+        )
+        for _ in range(50):
+            timeout.connect.record(0.01)
+            timeout.read.record(2.0)
+        connect, read = timeout.timeouts()
+        # 建连很快：p99 * 1.5 + 0.5 低于下限时取下限
+        self.assertEqual(connect, 1.0)
+        p99 = timeout.read.quantile(0.99)
+        self.assertAlmostEqual(read, p99 * 1.5 + 0.5)
+        self.assertGreater(read, 2.0 * 1.5)
+
+    def test_capped_at_max(self):
+        timeout = AdaptiveTimeout(max_timeout=3.0, min_samples=1)
+        timeout.read.record(30.0)
+        self.assertEqual(timeout.timeouts()[1], 3.0)
+
+    def test_snapshot(self):
+        timeout = AdaptiveTimeout(min_samples=1)
+        timeout.read.record(0.2)
+        snapshot = timeout.snapshot()
+        self.assertEqual(snapshot["samples"], 1)
+        self.assertIsNone(snapshot["connect_p99"])
+        self.assertEqual(snapshot["read_timeout"], timeout.timeouts()[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+守护进程分发测试：tick 只编码一次广播、慢订阅者被断开、轮询循环只在变化时广播、/snapshot 响应
+
+用法:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import unittest
+
+from cache import CachedTick
+from pipeline import TickDiffer
+from server import TickBroadcaster, TickServer
+from tick import PriceTick
+
+
+def make_tick(price_cents, time_ms=1_700_000_000_000):
+    return PriceTick(price_cents, 76000, price_cents - 76000, 1.0, time_ms, "AU", 0)
+
+
+class FakeTransport:
+    def __init__(self):
+        self.aborted = False
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeScheduler:
+    """放行固定次数后取消轮询循环"""
+
+    def __init__(self, rounds):
+        self.rounds = rounds
+        self.results = []
+
+    async def wait(self):
+        if not self.rounds:
+            raise asyncio.CancelledError
+        self.rounds -= 1
+        return 0.0
+
+    def complete(self, success):
+        self.results.append(success)
+
+
+class FakeService:
+    def __init__(self, ticks):
+        self.ticks = list(ticks)
+        self.differ = TickDiffer()
+
+    async def get_latest_gold_price(self, max_staleness_ms=None):
+        tick = self.ticks.pop(0)
+        if isinstance(tick, Exception):
+            raise tick
+        return tick
+
+    def diff_tick(self, tick):
+        return self.differ.diff(tick)
+
+    async def get_price(self):
+        if not self.ticks:
+            return None
+        return CachedTick(self.ticks[0], 1.23456, "stale")
+
+
+class BroadcasterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_publish_fans_out_one_encoded_event(self):
+        broadcaster = TickBroadcaster(buffer_size=4)
+        subscribers = [broadcaster.subscribe(FakeWriter()) for _ in range(3)]
+        broadcaster.publish({"price": "768.00"})
+        events = [s.queue.get_nowait() for s in subscribers]
+        self.assertEqual(events[0], b'event: tick\ndata: {"price":"768.00"}\n\n')
+        # 所有订阅者共享同一个编码结果
+        self.assertTrue(all(e is events[0] for e in events))
+        self.assertEqual(broadcaster.latest, {"price": "768.00"})
+        self.assertEqual(broadcaster.published, 1)
+
+    async def test_slow_subscriber_dropped(self):
+        broadcaster = TickBroadcaster(buffer_size=2)
+        fast = broadcaster.subscribe(FakeWriter())
+        slow = broadcaster.subscribe(FakeWriter())
+        for i in range(2):
+            broadcaster.publish({"i": i})
+            fast.queue.get_nowait()
+        broadcaster.publish({"i": 2})
+
+        self.assertNotIn(slow, broadcaster.subscribers)
+        self.assertIn(fast, broadcaster.subscribers)
+        self.assertEqual(broadcaster.dropped, 1)
+        self.assertTrue(slow.dropped)
+        self.assertTrue(slow.writer.transport.aborted)
+        # 写协程读到的最后一项为结束标记
+        last = None
+        while not slow.queue.empty():
+            last = slow.queue.get_nowait()
+        self.assertIsNone(last)
+
+    async def test_unsubscribe(self):
+        broadcaster = TickBroadcaster()
+        subscriber = broadcaster.subscribe(FakeWriter())
+        broadcaster.unsubscribe(subscriber)
+        broadcaster.publish({"i": 0})
+        self.assertTrue(subscriber.queue.empty())
+
+
+class PollLoopTest(unittest.IsolatedAsyncioTestCase):
+    async def test_only_changed_ticks_published(self):
+        ticks = [
+            make_tick(76800),
+            make_tick(76800),
+            RuntimeError("boom"),
+            make_tick(76810, 1_700_000_001_000),
+        ]
+        scheduler = FakeScheduler(len(ticks))
+        server = TickServer(FakeService(ticks), scheduler)
+        subscriber = server.broadcaster.subscribe(FakeWriter())
+
+        with self.assertRaises(asyncio.CancelledError):
+            await server.poll_loop()
+
+        self.assertEqual(scheduler.results, [True, True, False, True])
+        self.assertEqual(server.broadcaster.published, 2)
+        first = json.loads(subscriber.queue.get_nowait().split(b"data: ")[1])
+        second = json.loads(subscriber.queue.get_nowait().split(b"data: ")[1])
+        self.assertEqual(first["price"], "768.00")
+        self.assertEqual(second["price"], "768.10")
+        self.assertEqual(
+            sorted(second["changed"]), ["change_cents", "price_cents", "time_ms"]
+        )
+
+
+class SnapshotTest(unittest.IsolatedAsyncioTestCase):
+    async def request(self, service, path):
+        server = TickServer(service, FakeScheduler(0))
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        reader.feed_eof()
+        writer = FakeWriter()
+        await server.handle_client(reader, writer)
+        self.assertTrue(writer.closed)
+        head, _, body = writer.data.partition(b"\r\n\r\n")
+        return head.split(b"\r\n")[0].decode(), json.loads(body)
+
+    async def test_snapshot_includes_cache_age(self):
+        status, payload = await self.request(
+            FakeService([make_tick(76800)]), "/snapshot"
+        )
+        self.assertEqual(status, "HTTP/1.1 200 OK")
+        self.assertEqual(payload["price"], "768.00")
+        self.assertEqual(payload["age"], 1.235)
+        self.assertEqual(payload["cache_state"], "stale")
+
+    async def test_snapshot_without_data(self):
+        status, payload = await self.request(FakeService([]), "/snapshot")
+        self.assertEqual(status, "HTTP/1.1 503 Service Unavailable")
+        self.assertEqual(payload, {"error": "no data"})
+
+    async def test_unknown_path(self):
+        status, _ = await self.request(FakeService([]), "/nope")
+        self.assertEqual(status, "HTTP/1.1 404 Not Found")
+
+
+if __name__ == "__main__":
+    unittest.main()
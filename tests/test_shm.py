@@ -0,0 +1,237 @@
+"""
+共享内存 tick 通道测试：写入/读取往返、未发布、seqlock 奇数序号与校验和不一致时的撕裂读取处理、
+写入方接替、主进程锁互斥，以及从进程按主进程写入时间计算缓存年龄
+
+用法:
+    python -m unittest discover tests
+"""
+
+import itertools
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import shm
+from config import AppConfig, ConfigSnapshot
+from service import GoldPriceService
+from shm import (
+    CRC_OFFSET,
+    PAYLOAD_OFFSET,
+    READ_SPINS,
+    SEQ,
+    SEQ_OFFSET,
+    LeaderLock,
+    SharedTickReader,
+    SharedTickWriter,
+    unlink_segment,
+)
+from tick import PriceTick
+
+_names = itertools.count()
+
+
+def make_tick(price_cents=76852, time_ms=1_700_000_000_000):
+    return PriceTick(price_cents, 76500, price_cents - 76500, 0.46, time_ms, "AU", 5)
+
+
+class ShmTestCase(unittest.TestCase):
+    def setUp(self):
+        # 每个用例使用独立的段名与锁文件，不影响正在运行的应用
+        self.name = f"gold_test_{os.getpid()}_{next(_names)}"
+        self.dir = tempfile.mkdtemp(prefix="gold-shm-")
+        self.lock_path = os.path.join(self.dir, "leader.lock")
+        self.cleanup = []
+
+    def tearDown(self):
+        for close in reversed(self.cleanup):
+            close()
+        unlink_segment(self.name)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def writer(self):
+        writer = SharedTickWriter(self.name)
+        self.cleanup.append(writer.close)
+        return writer
+
+    def reader(self):
+        reader = SharedTickReader(self.name)
+        self.cleanup.append(reader.close)
+        return reader
+
+    def lock(self):
+        lock = LeaderLock(self.lock_path)
+        self.cleanup.append(lock.release)
+        return lock
+
+
+class SeqlockTest(ShmTestCase):
+    def test_missing_segment(self):
+        self.assertIsNone(self.reader().read())
+
+    def test_read_before_publish(self):
+        self.writer()
+        self.assertIsNone(self.reader().read())
+
+    def test_round_trip(self):
+        writer = self.writer()
+        reader = self.reader()
+        tick = make_tick()
+        writer.publish(tick)
+        shared = reader.read()
+        self.assertEqual(shared.tick, tick)
+        self.assertEqual(shared.seq, 2)
+        self.assertEqual(shared.leader_pid, os.getpid())
+        self.assertEqual(shared.published, 1)
+        self.assertLess(shared.age, 5)
+
+        writer.publish(make_tick(76900))
+        shared = reader.read()
+        self.assertEqual(shared.tick.price_cents, 76900)
+        self.assertEqual((shared.seq, shared.published), (4, 2))
+        self.assertEqual(reader.retries, 0)
+
+    def test_long_sku_truncated(self):
+        writer = self.writer()
+        writer.publish(make_tick()._replace(product_sku="X" * 40))
+        self.assertEqual(self.reader().read().tick.product_sku, "X" * 16)
+
+    def test_write_in_progress_gives_up(self):
+        writer = self.writer()
+        reader = self.reader()
+        writer.publish(make_tick())
+        # 写入方在写入中途（序号为奇数）
+        SEQ.pack_into(writer.buf, SEQ_OFFSET, writer.seq + 1)
+        self.assertIsNone(reader.read())
+        self.assertEqual(reader.retries, READ_SPINS)
+
+    def test_crc_mismatch_rejected(self):
+        writer = self.writer()
+        reader = self.reader()
+        writer.publish(make_tick())
+        # 序号一致但 payload 被改写：只能由校验和发现
+        struct.pack_into("<q", writer.buf, PAYLOAD_OFFSET, 1)
+        self.assertIsNone(reader.read())
+        self.assertEqual(reader.retries, READ_SPINS)
+        # 下一次完整发布后恢复
+        writer.publish(make_tick(76900))
+        self.assertEqual(reader.read().tick.price_cents, 76900)
+
+    def test_crc_covers_whole_payload(self):
+        writer = self.writer()
+        writer.publish(make_tick())
+        for offset in (PAYLOAD_OFFSET, CRC_OFFSET - 1):
+            with self.subTest(offset=offset):
+                original = writer.buf[offset]
+                writer.buf[offset] = original ^ 0xFF
+                self.assertIsNone(self.reader().read())
+                writer.buf[offset] = original
+
+    def test_takeover_after_crash_mid_write(self):
+        writer = self.writer()
+        writer.publish(make_tick())
+        SEQ.pack_into(writer.buf, SEQ_OFFSET, 3)
+        writer.close()
+        self.cleanup.remove(writer.close)
+
+        successor = self.writer()
+        self.assertEqual(successor.seq, 4)
+        successor.publish(make_tick(76900))
+        shared = self.reader().read()
+        self.assertEqual(shared.seq, 6)
+        self.assertEqual(shared.tick.price_cents, 76900)
+
+    def test_layout_mismatch_reinitialized(self):
+        writer = self.writer()
+        writer.publish(make_tick())
+        writer.buf[0:8] = b"OTHERAPP"
+        self.assertIsNone(self.reader().read())
+        successor = self.writer()
+        self.assertIsNone(self.reader().read())
+        successor.publish(make_tick())
+        self.assertEqual(self.reader().read().tick, make_tick())
+
+
+class LeaderLockTest(ShmTestCase):
+    @unittest.skipIf(shm.fcntl is None, "需要 fcntl")
+    def test_exclusive_until_released(self):
+        first = self.lock()
+        second = self.lock()
+        self.assertTrue(first.acquire())
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertFalse(second.held)
+        with open(self.lock_path) as f:
+            self.assertEqual(f.read().strip(), str(os.getpid()))
+        first.release()
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.acquire())
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.breaker = None
+        self.calls = 0
+
+    async def fetch(self, timeout=None):
+        self.calls += 1
+        return SimpleNamespace(
+            price="770.00",
+            yesterdayPrice="765.00",
+            upAndDownAmt="5.00",
+            upAndDownRate="+0.65%",
+            time="1700000100000",
+            productSku="AU",
+        )
+
+
+@unittest.skipIf(shm.fcntl is None, "需要 fcntl")
+class FollowerTest(ShmTestCase, unittest.IsolatedAsyncioTestCase):
+    """另一个实例持有主进程锁时，服务读取共享 tick"""
+
+    def setUp(self):
+        super().setUp()
+        self.leader = self.lock()
+        self.assertTrue(self.leader.acquire())
+        self.leader_writer = self.writer()
+        data = dict(AppConfig.DEFAULT_CONFIG)
+        data.update(
+            enable_tick_store=False,
+            shared_tick=True,
+            shared_tick_name=self.name,
+            leader_lock_path=self.lock_path,
+            shared_tick_max_age=30.0,
+            fetch_retries=0,
+        )
+        self.fetcher = FakeFetcher()
+        self.service = GoldPriceService(
+            ConfigSnapshot(data), price_fetcher=self.fetcher
+        )
+        self.cleanup.append(self.service.channel.close)
+
+    def publish_aged(self, tick, age):
+        with mock.patch.object(shm.time, "time", return_value=shm.time.time() - age):
+            self.leader_writer.publish(tick)
+
+    async def test_cache_age_counts_from_leader_publish(self):
+        self.publish_aged(make_tick(), 5)
+        tick = await self.service.get_latest_gold_price()
+        self.assertEqual(tick, make_tick())
+        self.assertEqual(self.fetcher.calls, 0)
+        self.assertFalse(self.service.channel.is_leader)
+        self.assertAlmostEqual(self.service.cache.peek().age, 5, delta=1)
+
+    async def test_stale_shared_tick_falls_back_to_upstream(self):
+        self.publish_aged(make_tick(), 120)
+        tick = await self.service.get_latest_gold_price()
+        self.assertEqual(tick.price_cents, 77000)
+        self.assertEqual(self.fetcher.calls, 1)
+        # 从进程直接请求的结果不发布到共享内存
+        self.assertEqual(self.reader().read().tick, make_tick())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+tick 存储测试：单调追加、区间二分边界、扩容、重开恢复、只读模式与只读取最后一条记录
+
+用法:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import store
+from store import HEADER_SIZE, INITIAL_RECORDS, RECORD_SIZE, TickStore, read_last_record
+
+BASE_TIME = 1_700_000_000_000
+
+
+def record(i):
+    """第 i 条测试记录：上游时间每条前进 1 秒"""
+    return (BASE_TIME + i * 1000, 768.0 + i * 0.01, 760.0, 8.0 + i * 0.01, 1.7e9 + i)
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="gold-store-")
+        self.path = os.path.join(self.dir, "ticks.bin")
+        self.stores = []
+
+    def tearDown(self):
+        for s in self.stores:
+            s.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def open(self, path=None, readonly=False):
+        s = TickStore(path or self.path, flush_interval=0, readonly=readonly)
+        self.stores.append(s)
+        return s
+
+    def fill(self, s, count, start=0):
+        for i in range(start, start + count):
+            self.assertTrue(s.append(*record(i)))
+
+
+class AppendTest(StoreTestCase):
+    """追加只接受上游时间前进的记录"""
+
+    def test_append_and_tail(self):
+        s = self.open()
+        self.fill(s, 10)
+        self.assertEqual(len(s), 10)
+        self.assertEqual(s.last_time, record(9)[0])
+        self.assertEqual(list(s.tail(3)), [record(i) for i in range(7, 10)])
+
+    def test_duplicate_or_backward_time_ignored(self):
+        s = self.open()
+        self.fill(s, 3)
+        self.assertFalse(s.append(*record(2)))
+        self.assertFalse(s.append(*record(0)))
+        self.assertEqual(len(s), 3)
+        self.assertEqual(s.last_time, record(2)[0])
+
+    def test_grows_past_initial_capacity(self):
+        s = self.open()
+        count = INITIAL_RECORDS + 10
+        self.fill(s, count)
+        self.assertEqual(len(s), count)
+        self.assertGreaterEqual(
+            os.path.getsize(self.path), HEADER_SIZE + count * RECORD_SIZE
+        )
+        self.assertEqual(list(s.tail(1)), [record(count - 1)])
+        self.assertEqual(list(s.iter_records(0, 1)), [record(0)])
+
+
+class RangeTest(StoreTestCase):
+    """区间查询为 [start, end)，边界落在记录之间或之外时同样正确"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = self.open()
+        self.fill(self.store, 100)
+
+    def times(self, records):
+        return [r[0] for r in records]
+
+    def test_exact_bounds(self):
+        got = self.store.range(record(10)[0], record(20)[0])
+        self.assertEqual(self.times(got), [record(i)[0] for i in range(10, 20)])
+
+    def test_bounds_between_records(self):
+        got = self.store.range(record(10)[0] + 1, record(20)[0] + 1)
+        self.assertEqual(self.times(got), [record(i)[0] for i in range(11, 21)])
+
+    def test_bounds_outside_data(self):
+        self.assertEqual(len(self.store.range(0, BASE_TIME * 2)), 100)
+        self.assertEqual(self.store.range(0, BASE_TIME), [])
+        self.assertEqual(self.store.range(record(99)[0] + 1, BASE_TIME * 2), [])
+        self.assertEqual(self.store.range(record(50)[0], record(50)[0]), [])
+
+    def test_bisect(self):
+        self.assertEqual(self.store._bisect(0), 0)
+        self.assertEqual(self.store._bisect(record(0)[0]), 0)
+        self.assertEqual(self.store._bisect(record(42)[0]), 42)
+        self.assertEqual(self.store._bisect(record(42)[0] + 1), 43)
+        self.assertEqual(self.store._bisect(record(99)[0] + 1), 100)
+
+
+class RecoveryTest(StoreTestCase):
+    """重开文件后恢复记录数与最后时间，损坏文件被拒绝或截断到容量"""
+
+    def test_reopen_restores_count(self):
+        s = self.open()
+        self.fill(s, 25)
+        s.close()
+        reopened = self.open()
+        self.assertEqual(len(reopened), 25)
+        self.assertEqual(reopened.last_time, record(24)[0])
+        self.assertFalse(reopened.append(*record(24)))
+        self.assertTrue(reopened.append(*record(25)))
+
+    def test_truncated_file_clamps_count(self):
+        s = self.open()
+        self.fill(s, 25)
+        s.close()
+        os.truncate(self.path, HEADER_SIZE + 10 * RECORD_SIZE)
+        reopened = self.open()
+        self.assertEqual(len(reopened), 10)
+        self.assertEqual(reopened.last_time, record(9)[0])
+
+    def test_bad_magic_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b"NOTGOLD!" + b"\0" * (HEADER_SIZE + RECORD_SIZE))
+        with self.assertRaises(ValueError):
+            TickStore(self.path, flush_interval=0)
+
+    def test_refresh_sees_other_writer(self):
+        writer = self.open()
+        reader = self.open()
+        self.fill(writer, INITIAL_RECORDS + 5)
+        self.assertEqual(len(reader), 0)
+        reader.refresh()
+        self.assertEqual(len(reader), INITIAL_RECORDS + 5)
+        self.assertEqual(list(reader.tail(1)), [record(INITIAL_RECORDS + 4)])
+
+
+class ReadOnlyTest(StoreTestCase):
+    """只读模式不创建、不修改文件，也不启动刷盘线程"""
+
+    def test_reads_without_modifying(self):
+        writer = self.open()
+        self.fill(writer, 20)
+        writer.close()
+        with open(self.path, "rb") as f:
+            before = f.read()
+
+        reader = TickStore(self.path, flush_interval=30, readonly=True)
+        self.stores.append(reader)
+        self.assertIsNone(reader._flusher)
+        self.assertEqual(len(reader), 20)
+        self.assertEqual(
+            reader.range(record(5)[0], record(8)[0]), [record(i) for i in (5, 6, 7)]
+        )
+        with self.assertRaises(ValueError):
+            reader.append(*record(20))
+        reader.close()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+    def test_missing_or_empty_file(self):
+        with self.assertRaises(FileNotFoundError):
+            TickStore(self.path, readonly=True)
+        self.assertFalse(os.path.exists(self.path))
+        open(self.path, "wb").close()
+        with self.assertRaises(ValueError):
+            TickStore(self.path, readonly=True)
+
+    def test_refresh_follows_writer(self):
+        writer = self.open()
+        self.fill(writer, 3)
+        reader = self.open(readonly=True)
+        self.fill(writer, INITIAL_RECORDS, start=3)
+        reader.refresh()
+        self.assertEqual(len(reader), INITIAL_RECORDS + 3)
+        self.assertEqual(list(reader.tail(1)), [record(INITIAL_RECORDS + 2)])
+
+
+class ReadLastRecordTest(StoreTestCase):
+    def test_last_record(self):
+        s = self.open()
+        self.fill(s, 5)
+        s.flush()
+        self.assertEqual(read_last_record(self.path), record(4))
+
+    def test_missing_empty_or_foreign_file(self):
+        self.assertIsNone(read_last_record(self.path))
+        self.open()
+        self.assertIsNone(read_last_record(self.path))
+        other = os.path.join(self.dir, "other.bin")
+        with open(other, "wb") as f:
+            f.write(store.HEADER.pack(b"NOTGOLD!", 1, RECORD_SIZE, 1))
+        self.assertIsNone(read_last_record(other))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+tick 数据类型测试：分值解析与格式化、涨跌幅解析、从上游数据和存储记录构造、导出字典
+
+用法:
+    python -m unittest discover tests
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from tick import PriceTick, format_cents, parse_cents, parse_rate
+
+
+def upstream(**overrides):
+    data = {
+        "price": "768.52",
+        "yesterdayPrice": "765.00",
+        "upAndDownAmt": "3.52",
+        "upAndDownRate": "+0.46%",
+        "time": "1700000000000",
+        "productSku": 1961543816,
+    }
+    data.update(overrides)
+    return SimpleNamespace(**data)
+
+
+class ParseTest(unittest.TestCase):
+    def test_parse_cents(self):
+        cases = [
+            ("768.52", 76852),
+            (" 768.5 ", 76850),
+            (768, 76800),
+            (768.52, 76852),
+            ("0.005", 1),  # 四舍五入而非银行家舍入
+            ("-0.005", -1),
+            ("-3.52", -352),
+            ("768.524", 76852),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(parse_cents(value), expected)
+
+    def test_parse_cents_invalid(self):
+        for value in (None, "", "abc", "--", "nan", "inf", "1e999999999999"):
+            with self.subTest(value=value):
+                self.assertEqual(parse_cents(value), 0)
+
+    def test_parse_rate(self):
+        cases = [
+            ("+0.45%", 0.45),
+            ("-0.45", -0.45),
+            (" 1.2% ", 1.2),
+            (0.45, 0.45),
+            (2, 2.0),
+            (None, 0.0),
+            ("n/a", 0.0),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(parse_rate(value), expected)
+
+    def test_format_cents(self):
+        cases = [
+            (76852, "768.52"),
+            (5, "0.05"),
+            (0, "0.00"),
+            (-352, "-3.52"),
+            (-5, "-0.05"),
+        ]
+        for cents, expected in cases:
+            with self.subTest(cents=cents):
+                self.assertEqual(format_cents(cents), expected)
+
+
+class PriceTickTest(unittest.TestCase):
+    def test_from_data(self):
+        tick = PriceTick.from_data(upstream(), receive_ms=1_700_000_000_500)
+        self.assertEqual(
+            tick,
+            PriceTick(
+                76852,
+                76500,
+                352,
+                0.46,
+                1_700_000_000_000,
+                "1961543816",
+                1_700_000_000_500,
+            ),
+        )
+        self.assertEqual(tick.trend, 1)
+        self.assertEqual(tick.title_text(), "📈 768.52")
+
+    def test_from_data_missing_fields(self):
+        tick = PriceTick.from_data(
+            upstream(time=None, productSku=None, upAndDownRate="-0.10%"),
+            receive_ms=42,
+        )
+        # 上游时间缺失时回退为接收时间
+        self.assertEqual(tick.time_ms, 42)
+        self.assertEqual(tick.product_sku, "")
+        self.assertEqual(tick.trend, -1)
+
+    def test_from_data_defaults_receive_time(self):
+        tick = PriceTick.from_data(upstream(time="bad"))
+        self.assertGreater(tick.receive_ms, 1_600_000_000_000)
+        self.assertEqual(tick.time_ms, tick.receive_ms)
+
+    def test_from_record_round_trip(self):
+        record = (1_700_000_000_000, 768.52, 765.0, 3.52, 1_700_000_000.5)
+        tick = PriceTick.from_record(record)
+        self.assertEqual(tick.price_cents, 76852)
+        self.assertEqual(tick.yesterday_cents, 76500)
+        self.assertEqual(tick.change_cents, 352)
+        self.assertEqual(tick.rate, 0.46)
+        self.assertEqual(tick.time_ms, 1_700_000_000_000)
+        self.assertEqual(tick.receive_ms, 1_700_000_000_500)
+
+    def test_from_record_zero_yesterday(self):
+        self.assertEqual(PriceTick.from_record((1, 1.0, 0.0, 0.0, 0.0)).rate, 0.0)
+
+    def test_to_dict(self):
+        tick = PriceTick(76852, 76500, -352, -0.46, 1_700_000_000_000, "AU", 0)
+        payload = tick.to_dict()
+        self.assertEqual(payload["price"], "768.52")
+        self.assertEqual(payload["yesterday_price"], "765.00")
+        self.assertEqual(payload["up_and_down_amt"], "-3.52")
+        self.assertEqual(payload["up_and_down_rate"], "-0.46%")
+        self.assertEqual(payload["time"], "1700000000000")
+        self.assertEqual(payload["price_cents"], 76852)
+        self.assertEqual(tick.trend, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+金价 tick 数据类型
+上游字段只在构造时解析一次，价格以整数“分”保存，便于精确计算与直接格式化
+"""
+
+import time
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, DecimalException
+from typing import Any, Dict, NamedTuple, Optional
+
+_CENT = Decimal(1)
+
+# 涨跌方向对应的状态栏图标
+TREND_ICONS = {1: "📈", -1: "📉", 0: "➖"}
+
+
+def parse_cents(value: Any) -> int:
+    """将 "768.52" / 768.52 / 768 解析为整数分（四舍五入），无法解析时返回 0"""
+    if value is None:
+        return 0
+    try:
+        return int((Decimal(str(value).strip()) * 100).quantize(_CENT, ROUND_HALF_UP))
+    except (DecimalException, ValueError):
+        return 0
+
+
+def parse_rate(value: Any) -> float:
+    """将 "+0.45%" / "-0.45" / 0.45 解析为百分比数值"""
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except ValueError:
+        return 0.0
+
+
+def format_cents(cents: int) -> str:
+    """整数分格式化为两位小数字符串，不经过浮点数"""
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+class PriceTick(NamedTuple):
+    """
+    金价 tick
+
+    前六个字段来自上游，用于变更检测；receive_ms 为本地接收时间。
+    """
+
+    price_cents: int
+    yesterday_cents: int
+    change_cents: int
+    rate: float  # 涨跌幅（百分比）
+    time_ms: int  # 上游时间（epoch 毫秒）
+    product_sku: str
+    receive_ms: int  # 本地接收时间（epoch 毫秒）
+
+    @classmethod
+    def from_data(cls, data: Any, receive_ms: Optional[int] = None) -> "PriceTick":
+        """从上游 datas 对象（快速解码结果或 AdDict）构造 tick"""
+        if receive_ms is None:
+            receive_ms = int(time.time() * 1000)
+        try:
+            time_ms = int(float(data.time))
+        except (TypeError, ValueError):
+            time_ms = receive_ms
+        sku = data.productSku
+        return cls(
+            parse_cents(data.price),
+            parse_cents(data.yesterdayPrice),
+            parse_cents(data.upAndDownAmt),
+            parse_rate(data.upAndDownRate),
+            time_ms,
+            "" if sku is None else str(sku),
+            receive_ms,
+        )
+
+    @classmethod
+    def from_record(cls, record) -> "PriceTick":
+        """从 tick 存储记录（上游时间, 价格, 昨收, 涨跌额, 接收时间）还原 tick"""
+        upstream_time, price, yesterday, change, receive_time = record
+        yesterday_cents = round(yesterday * 100)
+        change_cents = round(change * 100)
+        rate = change_cents * 100 / yesterday_cents if yesterday_cents else 0.0
+        return cls(
+            round(price * 100),
+            yesterday_cents,
+            change_cents,
+            round(rate, 2),
+            int(upstream_time),
+            "",
+            int(receive_time * 1000),
+        )
+
+    @property
+    def price(self) -> float:
+        return self.price_cents / 100
+
+    @property
+    def yesterday_price(self) -> float:
+        return self.yesterday_cents / 100
+
+    @property
+    def trend(self) -> int:
+        """涨跌方向：1 上涨，-1 下跌，0 持平"""
+        if self.rate > 0:
+            return 1
+        if self.rate < 0:
+            return -1
+        return 0
+
+    def price_text(self) -> str:
+        return format_cents(self.price_cents)
+
+    def title_text(self) -> str:
+        """状态栏标题：涨跌图标 + 价格"""
+        return f"{TREND_ICONS[self.trend]} {format_cents(self.price_cents)}"
+
+    def rate_text(self) -> str:
+        return f"{self.rate:+.2f}%"
+
+    def update_time_text(self) -> str:
+        return datetime.fromtimestamp(self.receive_ms / 1000).strftime("%H:%M:%S")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为旧版字符串字段格式（供守护进程等外部消费者使用）"""
+        return {
+            "price": format_cents(self.price_cents),
+            "yesterday_price": format_cents(self.yesterday_cents),
+            "up_and_down_rate": self.rate_text(),
+            "up_and_down_amt": format_cents(self.change_cents),
+            "time": str(self.time_ms),
+            "product_sku": self.product_sku,
+            "update_time": self.update_time_text(),
+            "price_cents": self.price_cents,
+            "receive_ms": self.receive_ms,
+        }